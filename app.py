@@ -1,8 +1,14 @@
 # -*- coding: utf-8 -*-
+import time
 import streamlit as st
 from datetime import datetime
-from src.data_loader import cargar_datos
-from src.filtros import crear_sidebar_filtros
+from src.data_loader import cargar_datos, firma_fuentes
+from src.filtros import crear_sidebar_filtros, obtener_indice_filtros
+from src.cache_filtros import estado_filtros_activo, memorizar_agregado, mostrar_estadisticas_cache
+from src.cubo_olap import construir_cubo, filtrar_cubo, obtener_cubo
+from src.perfilado import escribir_traza, etapa, iniciar_traza, mostrar_panel_rendimiento
+from src.exportacion import boton_exportacion
+from src.graficos import mostrar_estadisticas_figuras
 from src.paginas.resumen_ejecutivo import mostrar_resumen_ejecutivo
 from src.paginas.fuga_capital import mostrar_fuga_capital
 from src.paginas.crisis_logistica import mostrar_crisis_logistica
@@ -21,12 +27,18 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Perfilado por etapa (TECHLOG_PERFILADO=1 o ?perfilado=1); apagado no agrega costo
+iniciar_traza()
+
 # -----------------------------
 # 2. Carga de datos centralizada
 # -----------------------------
 try:
-    # Capturamos df, health_scores (antes/despues) y metricas_calidad (detalles)
-    df_dss, health_scores, metricas_calidad = cargar_datos()
+    # Capturamos df, health_scores (antes/despues), metricas_calidad (detalles) y el reporte de memoria
+    version_datos = firma_fuentes()
+    with etapa("cargar_datos") as registro:
+        df_dss, health_scores, metricas_calidad, reporte_memoria = cargar_datos(version_datos)
+        registro["filas_salida"] = len(df_dss)
 except Exception as e:
     st.error(f"❌ Error al cargar los datos: {e}")
     st.stop()
@@ -34,23 +46,29 @@ except Exception as e:
 # -----------------------------
 # 3. Sidebar y Filtros Globales
 # -----------------------------
-df_filtrado = crear_sidebar_filtros(df_dss)
+indice_filtros = obtener_indice_filtros(df_dss, version_datos)
+df_filtrado = crear_sidebar_filtros(df_dss, indice_filtros)
+
+# Cubo OLAP compartido: se arma una vez por versión de datos y cada página enrolla
+# la porción filtrada en lugar de volver a recorrer las transacciones (las filas
+# solo se leen para los meses que el rango de fechas corta)
+cubo = obtener_cubo(df_dss, version_datos)
+estado_filtros = estado_filtros_activo()
+if estado_filtros is None:
+    cubo_filtrado = construir_cubo(df_filtrado)
+else:
+    cubo_filtrado = memorizar_agregado("cubo", "filtrado", lambda: filtrar_cubo(cubo, estado_filtros, lambda: df_filtrado))
 
 st.sidebar.markdown("---")
 st.sidebar.subheader("📥 Exportar Datos Consolidados")
 
-@st.cache_data
-def convertir_df_a_csv(df):
-    return df.to_csv(index=False).encode('utf-8-sig')
-
-csv_master = convertir_df_a_csv(df_filtrado)
-
-st.sidebar.download_button(
-    label="💾 Descargar Tabla Maestra (CSV)",
-    data=csv_master,
-    file_name=f"techlogistics_consolidado_{datetime.now().strftime('%Y%m%d')}.csv",
-    mime="text/csv",
-    help="Descarga los datos con filtros aplicados, uniones de tablas y cálculos de margen."
+# El archivo se genera solo al pedirlo, por bloques, y se reutiliza por estado de filtros
+boton_exportacion(
+    df_filtrado,
+    nombre_archivo=f"techlogistics_consolidado_{datetime.now().strftime('%Y%m%d')}",
+    clave_widget="exportar_maestra",
+    contenedor=st.sidebar,
+    ayuda="Descarga los datos con filtros aplicados, uniones de tablas y cálculos de margen."
 )
 
 # -----------------------------
@@ -61,42 +79,62 @@ st.markdown("### Sistema de Soporte a Decisiones (DSS) - Auditoría de Consultor
 st.info(f"💡 **Base de Datos Actualizada:** Analizando {len(df_filtrado):,} transacciones filtradas.")
 
 # -----------------------------
-# 5. Navegación por Pestañas
+# 5. Navegación por Páginas
 # -----------------------------
-tabs = st.tabs([
-    "📈 Resumen Ejecutivo",
-    "💰 Fuga de Capital",
-    "🚚 Crisis Logística", 
-    "👻 Venta Invisible",
-    "⭐ Diagnóstico Fidelidad",
-    "⚠️ Riesgo Operativo",
-    "📊 Salud de los Datos"
-])
-
-# Ruteo de funciones a cada pestaña
-with tabs[0]:
-    mostrar_resumen_ejecutivo(df_filtrado, health_scores, metricas_calidad)
-
-with tabs[1]:
-    mostrar_fuga_capital(df_filtrado)
+PAGINAS = {
+    "📈 Resumen Ejecutivo": lambda: mostrar_resumen_ejecutivo(df_filtrado, health_scores, metricas_calidad, cubo_filtrado),
+    "💰 Fuga de Capital": lambda: mostrar_fuga_capital(df_filtrado, cubo_filtrado),
+    "🚚 Crisis Logística": lambda: mostrar_crisis_logistica(df_filtrado),
+    "👻 Venta Invisible": lambda: mostrar_venta_invisible(df_filtrado, cubo_filtrado),
+    "⭐ Diagnóstico Fidelidad": lambda: mostrar_diagnostico_fidelidad(df_filtrado, cubo_filtrado),
+    "⚠️ Riesgo Operativo": lambda: mostrar_riesgo_operativo(df_filtrado, cubo_filtrado),
+    "📊 Salud de los Datos": lambda: mostrar_salud_datos(df_filtrado, metricas_calidad, cubo_filtrado, reporte_memoria)
+}
+
+def renderizar_pagina(nombre):
+    # Mide el tiempo de cada página y lo guarda en la sesión (último render conocido)
+    inicio = time.perf_counter()
+    PAGINAS[nombre]()
+    st.session_state.setdefault("tiempos_paginas", {})[nombre] = time.perf_counter() - inicio
 
-with tabs[2]:
-    mostrar_crisis_logistica(df_filtrado)
-
-with tabs[3]:
-    mostrar_venta_invisible(df_filtrado)
-
-with tabs[4]:
-    mostrar_diagnostico_fidelidad(df_filtrado)
-
-with tabs[5]:
-    mostrar_riesgo_operativo(df_filtrado)
+st.sidebar.markdown("---")
+navegacion_diferida = st.sidebar.toggle(
+    "⚡ Navegación diferida", value=True, key="navegacion_diferida",
+    help="Solo se calcula la página seleccionada. Desactívelo para renderizar todas las pestañas en cada interacción."
+)
 
-with tabs[6]:
-    mostrar_salud_datos(df_filtrado, metricas_calidad)
+if navegacion_diferida:
+    # Únicamente la página visible ejecuta sus agregados y figuras
+    pagina_activa = st.radio("Página", list(PAGINAS), horizontal=True, key="pagina_activa", label_visibility="collapsed")
+    paginas_renderizadas = [pagina_activa]
+    renderizar_pagina(pagina_activa)
+else:
+    paginas_renderizadas = list(PAGINAS)
+    for tab, nombre in zip(st.tabs(paginas_renderizadas), paginas_renderizadas):
+        with tab:
+            renderizar_pagina(nombre)
+
+# Tiempo por página: el de las diferidas es su último render conocido (trabajo ahorrado)
+tiempos = st.session_state.get("tiempos_paginas", {})
+with st.sidebar.expander("⏱️ Tiempo de render por página"):
+    ahorro = 0.0
+    for nombre in PAGINAS:
+        if nombre in paginas_renderizadas:
+            st.caption(f"{nombre}: {tiempos[nombre] * 1000:,.0f} ms")
+        elif nombre in tiempos:
+            ahorro += tiempos[nombre]
+            st.caption(f"{nombre}: diferida (último {tiempos[nombre] * 1000:,.0f} ms)")
+        else:
+            st.caption(f"{nombre}: diferida")
+    if navegacion_diferida:
+        st.caption(f"Ahorro estimado en esta interacción: {ahorro * 1000:,.0f} ms")
 
 # -----------------------------
 # Footer
 # -----------------------------
 st.sidebar.markdown("---")
+mostrar_estadisticas_cache()
+mostrar_estadisticas_figuras()
+mostrar_panel_rendimiento()
+escribir_traza()
 st.sidebar.caption("© 2024 TechLogistics SAS - Dashboard de Auditoría Técnica")
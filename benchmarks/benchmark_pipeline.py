@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark del pipeline carga → limpieza → consolidación → render.
+
+Genera datasets con el esquema y la suciedad de los CSV de `data/` al tamaño
+pedido (número de transacciones, ver src/generador_datos.py), mide cada etapa
+(tiempo y pico de memoria) y escribe un reporte JSON para comparar entre commits.
+
+Uso:
+    python benchmarks/benchmark_pipeline.py                      # 10k, 1M y 10M filas
+    python benchmarks/benchmark_pipeline.py --filas 10000 200000
+    python benchmarks/benchmark_pipeline.py --comparar base.json nuevo.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from src.generador_datos import generar_datos
+
+# -----------------------------
+# Constantes y configuraciones
+# -----------------------------
+
+FILAS_POR_DEFECTO = [10_000, 1_000_000, 10_000_000]
+DIRECTORIO_RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados")
+
+# -----------------------------
+# 1. Medición por etapa
+# -----------------------------
+
+def _filas(resultado):
+    if isinstance(resultado, tuple) and resultado:
+        resultado = resultado[0]
+    return len(resultado) if hasattr(resultado, "__len__") and not isinstance(resultado, (str, bytes)) else None
+
+
+def medir(etapas, nombre, funcion, filas_entrada=None, memoria=False):
+    """
+    Ejecuta `funcion` y registra tiempo de pared y filas; con `memoria=True` registra
+    además el pico de memoria de la etapa (tracemalloc). Retorna el resultado de `funcion`.
+    """
+    gc.collect()
+    if memoria:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+
+    inicio = time.perf_counter()
+    resultado = funcion()
+    segundos = time.perf_counter() - inicio
+
+    etapas.append({
+        "etapa": nombre,
+        "segundos": round(segundos, 4),
+        "pico_mb": round((tracemalloc.get_traced_memory()[1] - base) / 1024 / 1024, 2) if memoria else None,
+        "filas_entrada": filas_entrada,
+        "filas_salida": _filas(resultado)
+    })
+    return resultado
+
+
+def ejecutar_pipeline(rutas, memoria=False):
+    """Corre cada etapa del DSS en modo bare de Streamlit (sin servidor) y devuelve las mediciones."""
+    from src.inventario import procesar_inventario
+    from src.feedback import procesar_feedback
+    from src.transacciones import procesar_transacciones
+    from src.data_loader import construir_health_scores, crear_dataset_consolidado
+    from src.compactacion import compactar_dataset
+    from src.cubo_olap import construir_cubo, construir_cubo_sku
+    from src.filtros import construir_indice_filtros, crear_sidebar_filtros
+    from src import analitica
+    from src.paginas.resumen_ejecutivo import mostrar_resumen_ejecutivo
+    from src.paginas.fuga_capital import mostrar_fuga_capital
+    from src.paginas.crisis_logistica import mostrar_crisis_logistica
+    from src.paginas.venta_invisible import mostrar_venta_invisible
+    from src.paginas.diagnostico_fidelidad import mostrar_diagnostico_fidelidad
+    from src.paginas.riesgo_operativo import mostrar_riesgo_operativo
+    from src.paginas.salud_dato import mostrar_salud_datos
+    import streamlit.config
+    import streamlit.logger
+
+    # Las páginas corren en modo bare de Streamlit: se silencian los avisos de contexto
+    # (la configuración se lee primero para que no restablezca el nivel después)
+    streamlit.config.get_option("logger.level")
+    streamlit.logger.set_log_level("error")
+
+    etapas = []
+    df_inv, met_inv = medir(etapas, "procesar_inventario", lambda: procesar_inventario(rutas["inventario"]), memoria=memoria)
+    df_feed, met_feed = medir(etapas, "procesar_feedback", lambda: procesar_feedback(rutas["feedback"]), memoria=memoria)
+    df_trans, met_trans = medir(
+        etapas, "procesar_transacciones",
+        lambda: procesar_transacciones(rutas["transacciones"], df_inv, df_feed), memoria=memoria
+    )
+    df_dss = medir(
+        etapas, "crear_dataset_consolidado",
+        lambda: crear_dataset_consolidado(df_trans, df_inv, df_feed), len(df_trans), memoria
+    )
+    df_dss, reporte_memoria = medir(etapas, "compactar_dataset", lambda: compactar_dataset(df_dss), len(df_dss), memoria)
+    cubo = medir(etapas, "construir_cubo", lambda: construir_cubo(df_dss), len(df_dss), memoria)
+    indice = medir(etapas, "construir_indice_filtros", lambda: construir_indice_filtros(df_dss), len(df_dss), memoria)
+    df_filtrado = medir(etapas, "crear_sidebar_filtros", lambda: crear_sidebar_filtros(df_dss, indice), len(df_dss), memoria)
+    cubo_sku = medir(etapas, "construir_cubo_sku", lambda: construir_cubo_sku(df_filtrado), len(df_filtrado), memoria)
+
+    metricas_calidad = {"inventario": met_inv, "transacciones": met_trans, "feedback": met_feed}
+    health_scores = construir_health_scores(metricas_calidad)
+    # Cálculos de cada página por separado: el tiempo de una página menos el de su
+    # cálculo es el costo de dibujarla (fuera de la app no hay caché por filtros)
+    fecha_referencia = analitica.fecha_referencia_hoy()
+    calculos = {
+        "calcular_resumen": lambda: analitica.calcular_resumen(cubo),
+        "calcular_fuga_capital": lambda: analitica.calcular_fuga_capital(cubo_sku),
+        "calcular_crisis_logistica": lambda: analitica.calcular_crisis_logistica(df_filtrado),
+        "calcular_venta_invisible": lambda: analitica.calcular_venta_invisible(cubo, cubo_sku),
+        "calcular_fidelidad": lambda: analitica.calcular_fidelidad(cubo),
+        "calcular_riesgo_operativo": lambda: analitica.calcular_riesgo_operativo(cubo, fecha_referencia)
+    }
+    for nombre, calcular in calculos.items():
+        medir(etapas, nombre, calcular, len(df_filtrado), memoria)
+
+    paginas = {
+        "mostrar_resumen_ejecutivo": lambda: mostrar_resumen_ejecutivo(df_filtrado, health_scores, metricas_calidad, cubo),
+        "mostrar_fuga_capital": lambda: mostrar_fuga_capital(df_filtrado, cubo),
+        "mostrar_crisis_logistica": lambda: mostrar_crisis_logistica(df_filtrado),
+        "mostrar_venta_invisible": lambda: mostrar_venta_invisible(df_filtrado, cubo),
+        "mostrar_diagnostico_fidelidad": lambda: mostrar_diagnostico_fidelidad(df_filtrado, cubo),
+        "mostrar_riesgo_operativo": lambda: mostrar_riesgo_operativo(df_filtrado, cubo),
+        "mostrar_salud_datos": lambda: mostrar_salud_datos(df_filtrado, metricas_calidad, cubo, reporte_memoria)
+    }
+    for nombre, mostrar in paginas.items():
+        medir(etapas, nombre, mostrar, len(df_filtrado), memoria)
+
+    return etapas
+
+
+# -----------------------------
+# 2. Reporte y comparación
+# -----------------------------
+
+def _commit_actual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(ruta_base, ruta_nuevo):
+    """Imprime, por tamaño y etapa, el tiempo y pico de memoria de dos reportes y su razón nuevo/base."""
+    with open(ruta_base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(ruta_nuevo, encoding="utf-8") as f:
+        nuevo = json.load(f)
+
+    indice_base = {
+        (r["filas"], e["etapa"]): e for r in base["resultados"] for e in r["etapas"]
+    }
+    print(f"base: {base.get('commit')}  nuevo: {nuevo.get('commit')}")
+    for resultado in nuevo["resultados"]:
+        print(f"\n{resultado['filas']:,} filas")
+        for etapa in resultado["etapas"]:
+            ref = indice_base.get((resultado["filas"], etapa["etapa"]))
+            if ref is None:
+                print(f"  {etapa['etapa']:<32} {etapa['segundos']:>9.3f} s   (sin base)")
+                continue
+            razon = etapa["segundos"] / ref["segundos"] if ref["segundos"] else float("nan")
+            print(f"  {etapa['etapa']:<32} {ref['segundos']:>9.3f} s -> {etapa['segundos']:>9.3f} s  x{razon:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline del DSS TechLogistics")
+    parser.add_argument("--filas", type=int, nargs="+", default=FILAS_POR_DEFECTO,
+                        help="Tamaños a medir (número de transacciones)")
+    parser.add_argument("--salida", help="Ruta del reporte JSON (por defecto benchmarks/resultados/)")
+    parser.add_argument("--directorio-datos", help="Dónde escribir los CSV sintéticos (por defecto un temporal)")
+    parser.add_argument("--sin-memoria", action="store_true",
+                        help="Omitir la pasada de memoria (tracemalloc), que duplica la duración del benchmark")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--comparar", nargs=2, metavar=("BASE", "NUEVO"), help="Comparar dos reportes y salir")
+    args = parser.parse_args()
+
+    if args.comparar:
+        comparar(*args.comparar)
+        return
+
+    memoria = not args.sin_memoria
+    if args.directorio_datos:
+        os.makedirs(args.directorio_datos, exist_ok=True)
+
+    reporte = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_actual(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "plataforma": platform.platform(),
+        "memoria_medida": memoria,
+        "notas": "segundos medidos sin tracemalloc; pico_mb de una segunda pasada con tracemalloc",
+        "resultados": []
+    }
+
+    for n_filas in args.filas:
+        print(f"\n== {n_filas:,} transacciones")
+        with tempfile.TemporaryDirectory(dir=args.directorio_datos) as directorio:
+            inicio = time.perf_counter()
+            archivos = generar_datos(directorio, n_filas, args.semilla)
+            rutas = {nombre: info["ruta"] for nombre, info in archivos.items()}
+            print(f"  (datos generados en {time.perf_counter() - inicio:.1f} s)")
+            # Tiempos sin tracemalloc (su sobrecosto multiplica los tiempos); la memoria
+            # se mide en una segunda pasada y solo se toma de ella el pico por etapa
+            etapas = ejecutar_pipeline(rutas)
+            if memoria:
+                tracemalloc.start()
+                for etapa, con_memoria in zip(etapas, ejecutar_pipeline(rutas, memoria=True)):
+                    etapa["pico_mb"] = con_memoria["pico_mb"]
+                tracemalloc.stop()
+        for etapa in etapas:
+            pico = f"{etapa['pico_mb']:>10.1f} MB" if etapa["pico_mb"] is not None else ""
+            print(f"  {etapa['etapa']:<32} {etapa['segundos']:>9.3f} s {pico}")
+        reporte["resultados"].append({
+            "filas": n_filas,
+            "total_segundos": round(sum(e["segundos"] for e in etapas), 4),
+            "etapas": etapas
+        })
+
+    salida = args.salida or os.path.join(
+        DIRECTORIO_RESULTADOS, f"benchmark_{datetime.now():%Y%m%d_%H%M%S}_{reporte['commit'] or 'local'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(reporte, f, ensure_ascii=False, indent=2)
+    print(f"\nReporte: {salida}")
+
+
+if __name__ == "__main__":
+    main()
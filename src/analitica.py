@@ -0,0 +1,496 @@
+# -*- coding: utf-8 -*-
+"""
+Capa analítica del DSS, sin dependencias de la interfaz.
+
+Cada página tiene una función `calcular_*` (pura: recibe el cubo OLAP o las
+filas filtradas y retorna un resultado tipado) y un acceso `obtener_*` que la
+memoriza por estado de filtros. Las páginas solo dibujan lo que obtienen; el
+PDF, los reportes por lote o un servicio local piden los mismos resultados
+sin volver a calcularlos.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.cache_filtros import memorizar_agregado
+from src.cubo_olap import (
+    CATEGORIAS_NPS, PIVOTE_REVISION, construir_cubo_sku, correlacion, enrollar, media, resolver_cubo
+)
+
+# -----------------------------
+# Constantes y configuraciones
+# -----------------------------
+
+# Semáforo de auditoría: días sin revisión a partir de los cuales la bodega cambia de nivel
+UMBRAL_CRITICO = 60
+UMBRAL_ADVERTENCIA = 30
+
+# -----------------------------
+# Resultados por página
+# -----------------------------
+
+@dataclass
+class ResumenEjecutivo:
+    ingresos_totales: float
+    margen_total: float
+    margen_pct: float
+    ventas_sin_inventario: int
+    n_registros: int
+    margen_negativo: int
+    top_df: pd.DataFrame
+
+    @property
+    def pct_sin_inventario(self):
+        return (self.ventas_sin_inventario / self.n_registros * 100) if self.n_registros > 0 else 0
+
+
+@dataclass
+class FugaCapital:
+    canal_col: str
+    total_fuga: float
+    skus_perdida: int
+    ingresos_totales: float
+    df_sku_risk: pd.DataFrame
+    df_canal: pd.DataFrame
+    fuga_por_canal: Optional[pd.DataFrame]
+    top_fugas: Optional[pd.DataFrame]
+
+    @property
+    def impacto(self):
+        """Fracción de los ingresos que se pierde en márgenes negativos."""
+        return (abs(self.total_fuga) / self.ingresos_totales) if self.ingresos_totales > 0 else 0
+
+    @property
+    def peor_canal(self):
+        if self.df_canal.empty:
+            return None
+        return self.df_canal.loc[self.df_canal["margen_real"].idxmin(), self.canal_col]
+
+
+@dataclass
+class CrisisLogistica:
+    tiempo_avg: float
+    corr_global: float
+    brecha_max: float
+    registros_canal_digital: int
+    df_rutas: pd.DataFrame
+    df_corr_city: Optional[pd.DataFrame]
+
+    @property
+    def ruta_peor(self):
+        """Ruta Bodega ➔ Ciudad con el mayor score de crisis (None sin rutas)."""
+        if self.df_rutas.empty:
+            return None
+        return self.df_rutas.sort_values("score_crisis", ascending=False).iloc[0]
+
+
+@dataclass
+class VentaInvisible:
+    ingreso_riesgo: float
+    pct_ingreso_riesgo: float
+    skus_huerfanos: int
+    transacciones_afectadas: int
+    df_tiempo: pd.DataFrame
+    fuga_ciudad: pd.Series
+    col_ref: str
+    fuga_canal: pd.Series
+    top_huerfanos: pd.DataFrame
+
+
+@dataclass
+class DiagnosticoFidelidad:
+    nps_avg: float
+    casos_paradoja: int
+    rating_prod: float
+    df_cat: pd.DataFrame
+    df_paradoja_resumen: pd.DataFrame
+    conteo_nps: pd.Series
+
+
+@dataclass
+class RiesgoOperativo:
+    promedio_dias: float
+    tasa_soporte: float
+    correlacion: float
+    df_bodega: pd.DataFrame
+    tabla_semaforo: pd.DataFrame
+
+# -----------------------------
+# Utilidades
+# -----------------------------
+
+def nivel_semaforo(dias_sin_revision):
+    if dias_sin_revision > UMBRAL_CRITICO:
+        return "Crítico"
+    if dias_sin_revision > UMBRAL_ADVERTENCIA:
+        return "Advertencia"
+    return "Controlado"
+
+# -----------------------------
+# Cálculos (puros)
+# -----------------------------
+
+def calcular_resumen(cubo):
+    ingresos_totales = cubo["ingreso_total"].sum()
+    margen_total = cubo["margen_real"].sum()
+
+    top_categorias = enrollar(cubo, "Categoria", ["ingreso_total", "margen_real", "n"]).rename(columns={
+        "ingreso_total": "Ingresos",
+        "margen_real": "Margen",
+        "n": "Transacciones"
+    })
+    top_categorias["Margen %"] = (top_categorias["Margen"] / top_categorias["Ingresos"] * 100).round(1)
+
+    return ResumenEjecutivo(
+        ingresos_totales=ingresos_totales,
+        margen_total=margen_total,
+        margen_pct=(margen_total / ingresos_totales * 100) if ingresos_totales != 0 else 0,
+        ventas_sin_inventario=cubo.loc[cubo["venta_sin_inventario"].astype(bool), "n"].sum(),
+        n_registros=cubo["n"].sum(),
+        margen_negativo=cubo.loc[cubo["margen_negativo"], "n"].sum(),
+        top_df=top_categorias.nlargest(5, "Ingresos").reset_index()
+    )
+
+
+def calcular_fuga_capital(cubo):
+    """
+    Fuga de capital en una pasada por nivel: las medidas de pérdida (solo filas con
+    margen negativo) viajan junto a las totales, así SKU y canal se agrupan una vez
+    cada uno y el top 10 sale con nsmallest en lugar de ordenar todos los SKUs.
+    `cubo` es el enrollado por SKU (construir_cubo_sku).
+    """
+    canal_col = "Canal_Venta" if "Canal_Venta" in cubo.columns else "Bodega_Origen"
+    negativo = cubo["margen_negativo"].to_numpy(dtype=bool)
+    base = pd.DataFrame({
+        "SKU_ID": cubo["SKU_ID"],
+        "Categoria": cubo["Categoria"],
+        canal_col: cubo[canal_col],
+        "margen_real": cubo["margen_real"],
+        "ingreso_total": cubo["ingreso_total"],
+        "Cantidad_Vendida": cubo["Cantidad_Vendida"],
+        "perdida_margen": np.where(negativo, cubo["margen_real"], 0.0),
+        "perdida_cantidad": np.where(negativo, cubo["Cantidad_Vendida"], 0.0),
+        "perdida_precio": np.where(negativo, cubo["Precio_Venta_Final"], 0.0),
+        "perdida_n": np.where(negativo, cubo["n"], 0)
+    })
+
+    # Por SKU y categoría (las categorías nulas solo cuentan para la pérdida por SKU)
+    medidas = ["margen_real", "ingreso_total", "Cantidad_Vendida",
+               "perdida_margen", "perdida_cantidad", "perdida_precio", "perdida_n"]
+    por_sku = base.groupby(["SKU_ID", "Categoria"], observed=True, dropna=False)[medidas].sum().reset_index()
+    por_sku = por_sku[por_sku["SKU_ID"].notna()]
+
+    df_sku_risk = por_sku.loc[por_sku["Categoria"].notna(),
+                              ["SKU_ID", "Categoria", "margen_real", "ingreso_total", "Cantidad_Vendida"]]
+    df_sku_risk = df_sku_risk.reset_index(drop=True)
+    df_sku_risk["size_burbuja"] = df_sku_risk["Cantidad_Vendida"].fillna(0).abs() + 0.1
+
+    # Por canal: margen total, ingresos y pérdida en la misma agrupación
+    por_canal = base.groupby(canal_col, observed=True)[medidas].sum().reset_index()
+    df_canal = por_canal[[canal_col, "margen_real", "ingreso_total"]].copy()
+    ingreso = df_canal["ingreso_total"].to_numpy(dtype=np.float64)
+    margen = df_canal["margen_real"].to_numpy(dtype=np.float64)
+    df_canal["%_Margen"] = np.divide(margen * 100, ingreso, out=np.zeros_like(margen), where=ingreso > 0)
+
+    fuga_por_canal = None
+    top_fugas = None
+    sku_perdida = por_sku[por_sku["perdida_n"] > 0]
+    skus_perdida = sku_perdida["SKU_ID"].nunique()
+    if negativo.any():
+        # Solo las pérdidas económicas por canal, en positivo para visualización
+        fuga_por_canal = por_canal.loc[por_canal["perdida_n"] > 0, [canal_col, "perdida_margen"]]
+        fuga_por_canal = fuga_por_canal.rename(columns={"perdida_margen": "margen_real"})
+        fuga_por_canal["margen_real"] = fuga_por_canal["margen_real"].abs()
+        fuga_por_canal = fuga_por_canal.sort_values("margen_real", ascending=False)
+
+        # Un SKU con filas de varias categorías se consolida antes del top 10
+        if sku_perdida["SKU_ID"].duplicated().any():
+            sku_perdida = sku_perdida.groupby("SKU_ID", observed=True, sort=False).agg({
+                "Categoria": "first", "perdida_margen": "sum", "perdida_cantidad": "sum",
+                "perdida_precio": "sum", "perdida_n": "sum"
+            }).reset_index()
+
+        # El precio promedio se reconstruye como suma / conteo de transacciones
+        top_fugas = sku_perdida.nsmallest(10, "perdida_margen").set_index("SKU_ID")
+        top_fugas = pd.DataFrame({
+            "Categoria": top_fugas["Categoria"],
+            "margen_real": top_fugas["perdida_margen"],
+            "Cantidad_Vendida": top_fugas["perdida_cantidad"],
+            "Precio_Venta_Final": media(top_fugas["perdida_precio"], top_fugas["perdida_n"])
+        })
+
+    return FugaCapital(
+        canal_col=canal_col,
+        total_fuga=base["perdida_margen"].sum(),
+        skus_perdida=skus_perdida,
+        ingresos_totales=cubo["ingreso_total"].sum(),
+        df_sku_risk=df_sku_risk,
+        df_canal=df_canal,
+        fuga_por_canal=fuga_por_canal,
+        top_fugas=top_fugas
+    )
+
+
+def _normalizar_ciudades(ciudades):
+    """
+    Ciudad en mayúsculas y sin espacios (nulos como "NAN", igual que astype(str)).
+    Se normalizan los valores distintos y no cada fila: retorna (códigos, nombres).
+    """
+    codigos, unicos = pd.factorize(ciudades)
+    nombres = pd.Index(unicos).astype(str).str.strip().str.upper().append(pd.Index(["NAN"]))
+    # Valores que convergen al normalizarse ("Cali " y "CALI") comparten código
+    codigos_norm, nombres_norm = pd.factorize(nombres)
+    return codigos_norm[codigos], pd.Index(nombres_norm)
+
+
+def estadisticas_rutas(df_analisis):
+    """
+    Motor de rutas: una sola agrupación por (Bodega_Origen, ciudad normalizada) con las
+    sumas suficientes de Tiempo_Entrega (x) y NPS_Numerico (y): n, Σx, Σy, Σx², Σy², Σxy
+    y transacciones con ID. Las medias, correlaciones y el score de cualquier nivel
+    (ruta, ciudad, total) salen de sumar estas filas; el costo es lineal en las filas y
+    no depende de cuántas ciudades o rutas haya.
+    """
+    x = df_analisis["Tiempo_Entrega"].to_numpy(dtype=np.float64)
+    y = df_analisis["NPS_Numerico"].to_numpy(dtype=np.float64)
+    # Centrar en la media global evita la cancelación numérica en n·Σx² - (Σx)²
+    cx = x - x.mean() if len(x) else x
+    cy = y - y.mean() if len(y) else y
+    codigos_ciudad, ciudades = _normalizar_ciudades(df_analisis["Ciudad_Destino"])
+
+    estadisticas = pd.DataFrame({
+        "Bodega_Origen": df_analisis["Bodega_Origen"].to_numpy(),
+        "ciudad": codigos_ciudad,
+        "n": 1,
+        "sx": x, "sy": y,
+        "cx": cx, "cy": cy, "cxx": cx * cx, "cyy": cy * cy, "cxy": cx * cy,
+        "ids": df_analisis["Transaccion_ID"].notna().to_numpy(dtype=np.int64)
+    }).groupby(["Bodega_Origen", "ciudad"], observed=True, dropna=False, sort=False).sum()
+    return estadisticas, ciudades
+
+
+def _resumir(estadisticas):
+    """Medias, correlación y score de crisis de cada fila de sumas suficientes."""
+    e = estadisticas
+    with np.errstate(invalid="ignore"):  # grupos de una fila: varianza 0 por redondeo -> NaN
+        corr = correlacion(e["n"], e["cx"], e["cy"], e["cxx"], e["cyy"], e["cxy"])
+    return pd.DataFrame({
+        "NPS_Numerico": e["sy"] / e["n"],
+        "Tiempo_Entrega": e["sx"] / e["n"],
+        "Transaccion_ID": e["ids"],
+        "Correlacion": corr,
+        "n": e["n"]
+    }, index=e.index)
+
+
+def calcular_crisis_logistica(df_filtrado):
+    # 1. Preparación de Datos (FILTRO INTELIGENTE): solo las columnas del análisis
+    columnas = [c for c in ["Tiempo_Entrega", "NPS_Numerico", "Ciudad_Destino", "Bodega_Origen",
+                            "Transaccion_ID", "brecha_entrega"] if c in df_filtrado.columns]
+    df_log = df_filtrado[columnas].dropna(subset=["Tiempo_Entrega", "NPS_Numerico"])
+
+    # Mantenemos los NPS 5.0 (según solicitud) y solo filtramos outliers de tiempo
+    tiempo = df_log["Tiempo_Entrega"]
+    df_analisis = df_log[(tiempo < 100) & (tiempo > 0)]
+    if df_analisis.empty:
+        df_analisis = df_log[tiempo < 100]
+
+    # 2. Una pasada de sumas suficientes por ruta
+    estadisticas, ciudades = estadisticas_rutas(df_analisis)
+    nombres_ciudad = ciudades[estadisticas.index.get_level_values("ciudad")]
+
+    # Limpieza de Hallazgo: Exclusión estricta de Canal Digital
+    es_digital = np.asarray(nombres_ciudad.str.contains("CANAL DIGITAL|DIGITAL", na=False), dtype=bool)
+    registros_canal_digital = int(estadisticas.loc[es_digital, "n"].sum())
+    geo = estadisticas[~es_digital]
+    ciudad_geo = nombres_ciudad[~es_digital]
+
+    # 3. Rutas físicas: score de crisis por Bodega ➔ Ciudad (sin bodega nula, como el groupby)
+    con_bodega = np.asarray(geo.index.get_level_values("Bodega_Origen").notna(), dtype=bool)
+    df_rutas = _resumir(geo[con_bodega]).reset_index().drop(columns="ciudad")
+    df_rutas.insert(1, "Ciudad_Destino", np.asarray(ciudad_geo[con_bodega], dtype=object))
+    df_rutas = df_rutas.sort_values(["Bodega_Origen", "Ciudad_Destino"]).reset_index(drop=True)
+    df_rutas = df_rutas[["Bodega_Origen", "Ciudad_Destino", "NPS_Numerico", "Tiempo_Entrega", "Transaccion_ID", "Correlacion"]]
+
+    if not df_rutas.empty:
+        # El score de crisis ahora es más sensible a los NPS bajos al incluir los 5.0 en el promedio general
+        df_rutas["score_crisis"] = df_rutas["Tiempo_Entrega"] / (df_rutas["NPS_Numerico"] + 0.1)
+        df_rutas = df_rutas.sort_values("Ciudad_Destino")
+
+    # 4. Correlación por ciudad: roll-up de las rutas (incluye filas sin bodega)
+    por_ciudad = _resumir(geo.groupby(ciudad_geo.rename("Ciudad")).sum())
+    por_ciudad = por_ciudad[(por_ciudad["n"] >= 2) & por_ciudad["Correlacion"].notna()]
+    df_corr_city = None
+    if not por_ciudad.empty:
+        df_corr_city = por_ciudad.reset_index()[["Ciudad", "Correlacion", "Tiempo_Entrega", "NPS_Numerico", "n"]]
+        df_corr_city = df_corr_city.sort_values("Correlacion")
+
+    totales = estadisticas.sum()
+    return CrisisLogistica(
+        tiempo_avg=media(totales["sx"], totales["n"]),
+        corr_global=correlacion(totales["n"], totales["cx"], totales["cy"], totales["cxx"], totales["cyy"], totales["cxy"]),
+        brecha_max=df_analisis["brecha_entrega"].max() if "brecha_entrega" in df_analisis.columns else 0,
+        registros_canal_digital=registros_canal_digital,
+        df_rutas=df_rutas,
+        df_corr_city=df_corr_city
+    )
+
+
+def calcular_venta_invisible(cubo, cubo_sku):
+    cubo_sin_inv = cubo[cubo["venta_sin_inventario"].astype(bool)]
+    sku_sin_inv = cubo_sku[cubo_sku["venta_sin_inventario"].astype(bool)]
+
+    ingreso_riesgo = cubo_sin_inv["ingreso_total"].sum()
+
+    df_tiempo = cubo_sin_inv.groupby(cubo_sin_inv["Fecha_Mes"].dt.to_period("M").rename("Fecha_Venta"))[
+        ["ingreso_total", "n"]
+    ].sum().rename(columns={"n": "Transaccion_ID"}).reset_index()
+    df_tiempo["Fecha_Venta"] = df_tiempo["Fecha_Venta"].astype(str)
+
+    # Usamos Canal_Venta o Bodega_Origen según disponibilidad
+    col_ref = "Canal_Venta" if "Canal_Venta" in cubo_sin_inv.columns else "Bodega_Origen"
+
+    top_huerfanos = enrollar(sku_sin_inv, "SKU_ID", ["Cantidad_Vendida", "ingreso_total", "Precio_Venta_Final", "n"])
+    top_huerfanos["Precio_Venta_Final"] = media(top_huerfanos["Precio_Venta_Final"], top_huerfanos.pop("n"))
+
+    return VentaInvisible(
+        ingreso_riesgo=ingreso_riesgo,
+        pct_ingreso_riesgo=(ingreso_riesgo / cubo["ingreso_total"].sum() * 100) if not cubo.empty else 0,
+        skus_huerfanos=sku_sin_inv["SKU_ID"].nunique(),
+        transacciones_afectadas=cubo_sin_inv["n"].sum(),
+        df_tiempo=df_tiempo,
+        fuga_ciudad=enrollar(cubo_sin_inv, "Ciudad_Destino", ["ingreso_total"])["ingreso_total"].sort_values(ascending=False).head(10),
+        col_ref=col_ref,
+        fuga_canal=enrollar(cubo_sin_inv, col_ref, ["ingreso_total"])["ingreso_total"].sort_values(ascending=False),
+        top_huerfanos=top_huerfanos.sort_values("ingreso_total", ascending=False).head(15)
+    )
+
+
+def calcular_fidelidad(cubo):
+    # Agrupamos por categoría para ver tendencias de sobrecosto
+    por_categoria = enrollar(cubo, "Categoria", [
+        "n", "Precio_Venta_Final", "Rating_Producto", "Rating_Producto_n", "Stock_Actual", "NPS_Numerico"
+    ])
+    df_cat = pd.DataFrame({
+        "Precio_Venta_Final": media(por_categoria["Precio_Venta_Final"], por_categoria["n"]),
+        "Rating_Producto": media(por_categoria["Rating_Producto"], por_categoria["Rating_Producto_n"]),
+        "Stock_Actual": por_categoria["Stock_Actual"],
+        "NPS_Numerico": media(por_categoria["NPS_Numerico"], por_categoria["n"])
+    }).reset_index()
+
+    # Categorías donde los NPS 5.0 están "estancando" el inventario
+    paradoja = enrollar(cubo, "Categoria", ["paradoja_n", "paradoja_stock", "paradoja_nps", "paradoja_ingreso"])
+    paradoja = paradoja[paradoja["paradoja_n"] > 0]
+    df_paradoja_resumen = pd.DataFrame({
+        "Ventas Afectadas": paradoja["paradoja_n"],
+        "Stock_Actual": media(paradoja["paradoja_stock"], paradoja["paradoja_n"]),
+        "NPS_Numerico": media(paradoja["paradoja_nps"], paradoja["paradoja_n"]),
+        "ingreso_total": paradoja["paradoja_ingreso"]
+    }).sort_values("Ventas Afectadas", ascending=False)
+
+    return DiagnosticoFidelidad(
+        nps_avg=media(cubo["NPS_Numerico"].sum(), cubo["n"].sum()),
+        casos_paradoja=cubo["paradoja_n"].sum(),
+        rating_prod=media(cubo["Rating_Producto"].sum(), cubo["Rating_Producto_n"].sum()),
+        df_cat=df_cat,
+        df_paradoja_resumen=df_paradoja_resumen,
+        conteo_nps=pd.Series({categoria: cubo[medida].sum() for categoria, medida in CATEGORIAS_NPS.items()},
+                             name="NPS_Categoria", dtype="int64")
+    )
+
+
+def calcular_riesgo_operativo(cubo, fecha_referencia):
+    # dias_sin_revision = (referencia - pivote) - días acumulados desde el pivote
+    dias_referencia = (fecha_referencia - PIVOTE_REVISION).days
+
+    por_bodega = enrollar(cubo, "Bodega_Origen", [
+        "n", "revision_n", "revision_dias", "Ticket_Soporte", "ingreso_total", "NPS_Numerico"
+    ])
+    df_bodega = pd.DataFrame({
+        "dias_sin_revision": dias_referencia - media(por_bodega["revision_dias"], por_bodega["revision_n"]),
+        "Ticket_Soporte": media(por_bodega["Ticket_Soporte"], por_bodega["n"]) * 100,
+        "ingreso_total": por_bodega["ingreso_total"],
+        "NPS_Numerico": media(por_bodega["NPS_Numerico"], por_bodega["n"]) # NPS promedio por bodega para el hover
+    }).reset_index()
+
+    # Semáforo: bodegas de mayor a menor rezago con su nivel
+    tabla_semaforo = df_bodega.sort_values("dias_sin_revision", ascending=False)[
+        ["Bodega_Origen", "dias_sin_revision", "Ticket_Soporte", "ingreso_total"]
+    ]
+    tabla_semaforo.columns = ["Bodega", "Días Sin Revisión", "% Tickets Soporte", "Ingresos Expuestos"]
+    tabla_semaforo["Nivel"] = tabla_semaforo["Días Sin Revisión"].map(nivel_semaforo)
+
+    totales = cubo.sum(numeric_only=True)
+    return RiesgoOperativo(
+        promedio_dias=dias_referencia - media(totales["revision_dias"], totales["revision_n"]),
+        # Tasa de tickets: Promedio de la columna binaria (0 y 1)
+        tasa_soporte=media(totales["Ticket_Soporte"], totales["n"]) * 100,
+        # Correlación con NPS completo (incluyendo 5.0). Los días sin revisión
+        # son la antigüedad con signo invertido, por eso se niega
+        correlacion=-correlacion(totales["corr_n"], totales["corr_x"], totales["corr_y"],
+                                 totales["corr_xx"], totales["corr_yy"], totales["corr_xy"]),
+        df_bodega=df_bodega,
+        tabla_semaforo=tabla_semaforo
+    )
+
+# -----------------------------
+# Acceso memorizado por estado de filtros
+# -----------------------------
+
+def fecha_referencia_hoy():
+    # El rezago se mide contra hoy: cambia de día aunque los filtros no cambien
+    return pd.to_datetime(datetime.now().date())
+
+
+def obtener_resumen(df_filtrado, cubo=None):
+    return memorizar_agregado("resumen_ejecutivo", "kpis", lambda: calcular_resumen(resolver_cubo(df_filtrado, cubo)))
+
+
+def obtener_cubo_sku(df_filtrado):
+    # Enrollado por SKU: se arma desde las filas una vez por estado de filtros
+    return memorizar_agregado("cubo", "sku", lambda: construir_cubo_sku(df_filtrado))
+
+
+def obtener_fuga_capital(df_filtrado, cubo=None):
+    # Solo usa el enrollado por SKU; `cubo` se acepta por simetría con las demás páginas
+    return memorizar_agregado("fuga_capital", "analisis", lambda: calcular_fuga_capital(obtener_cubo_sku(df_filtrado)))
+
+
+def obtener_crisis_logistica(df_filtrado, cubo=None):
+    # Correlaciones por ciudad y rutas salen de las filas, no del cubo
+    return memorizar_agregado("crisis_logistica", "analisis", lambda: calcular_crisis_logistica(df_filtrado))
+
+
+def obtener_venta_invisible(df_filtrado, cubo=None):
+    return memorizar_agregado(
+        "venta_invisible", "analisis",
+        lambda: calcular_venta_invisible(resolver_cubo(df_filtrado, cubo), obtener_cubo_sku(df_filtrado))
+    )
+
+
+def obtener_fidelidad(df_filtrado, cubo=None):
+    return memorizar_agregado("diagnostico_fidelidad", "analisis", lambda: calcular_fidelidad(resolver_cubo(df_filtrado, cubo)))
+
+
+def obtener_riesgo_operativo(df_filtrado, cubo=None, fecha_referencia=None):
+    fecha_referencia = fecha_referencia_hoy() if fecha_referencia is None else fecha_referencia
+    return memorizar_agregado(
+        "riesgo_operativo", "analisis",
+        lambda: calcular_riesgo_operativo(resolver_cubo(df_filtrado, cubo), fecha_referencia),
+        fecha_referencia.date().isoformat()
+    )
+
+
+def obtener_analisis(df_filtrado, cubo=None):
+    """Los resultados de todas las páginas para el estado de filtros activo."""
+    return {
+        "resumen": obtener_resumen(df_filtrado, cubo),
+        "fuga": obtener_fuga_capital(df_filtrado, cubo),
+        "crisis": obtener_crisis_logistica(df_filtrado, cubo),
+        "invisible": obtener_venta_invisible(df_filtrado, cubo),
+        "fidelidad": obtener_fidelidad(df_filtrado, cubo),
+        "riesgo": obtener_riesgo_operativo(df_filtrado, cubo)
+    }
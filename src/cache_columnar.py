@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+    feather = None
+
+# -----------------------------
+# Constantes y configuraciones
+# -----------------------------
+
+# Subir esta versión cada vez que cambie la lógica de limpieza o consolidación:
+# invalida todas las entradas persistidas aunque los CSV no hayan cambiado.
+VERSION_LIMPIEZA = "2024.4"
+
+DIRECTORIO_CACHE = os.environ.get("TECHLOG_CACHE_DIR", os.path.join(".cache", "dss"))
+
+ARCHIVO_METRICAS = "metricas.json"
+EXTENSION_TABLA = ".arrow"
+
+# -----------------------------
+# Utilidades
+# -----------------------------
+
+def cache_disponible():
+    """Indica si el formato columnar (Arrow IPC) puede usarse en este entorno."""
+    return feather is not None
+
+
+def huella_archivo(ruta, tamano_bloque=1 << 20):
+    """Hash BLAKE2b del contenido de un archivo, leído por bloques."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(tamano_bloque), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def clave_cache(rutas):
+    """
+    Clave de la entrada de caché: hash de los archivos fuente + versión de limpieza.
+    Cualquier cambio en un CSV o en VERSION_LIMPIEZA produce una clave nueva.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(VERSION_LIMPIEZA.encode("utf-8"))
+    for ruta in rutas:
+        h.update(os.path.basename(ruta).encode("utf-8"))
+        h.update(huella_archivo(ruta).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _a_json(valor):
+    """Convierte escalares numpy/pandas a tipos nativos para json.dump."""
+    if isinstance(valor, np.generic):
+        return valor.item()
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+
+# -----------------------------
+# Utilidades de escritura
+# -----------------------------
+
+def _partes_tabla(ruta_entrada):
+    """
+    Agrupa los archivos de tabla por nombre: `dss.arrow` es la base y
+    `dss.0001.arrow`, `dss.0002.arrow`... son lotes anexados en orden.
+    """
+    partes = {}
+    for archivo in os.listdir(ruta_entrada):
+        if archivo.startswith(".") or not archivo.endswith(EXTENSION_TABLA):
+            continue
+        segmentos = archivo[:-len(EXTENSION_TABLA)].split(".")
+        numero = int(segmentos[1]) if len(segmentos) > 1 else 0
+        partes.setdefault(segmentos[0], []).append((numero, os.path.join(ruta_entrada, archivo)))
+    return {nombre: [ruta for _, ruta in sorted(lista)] for nombre, lista in partes.items()}
+
+
+def _escribir_atomico(ruta_destino, escribir):
+    """Escribe en un temporal del mismo directorio y lo renombra sobre el destino."""
+    directorio = os.path.dirname(ruta_destino)
+    fd, ruta_tmp = tempfile.mkstemp(prefix=".", dir=directorio)
+    os.close(fd)
+    try:
+        escribir(ruta_tmp)
+        os.replace(ruta_tmp, ruta_destino)
+    finally:
+        if os.path.exists(ruta_tmp):
+            os.remove(ruta_tmp)
+
+
+# -----------------------------
+# Lectura y escritura
+# -----------------------------
+
+def leer_cache(clave, tablas=None, lotes=None, directorio=DIRECTORIO_CACHE):
+    """
+    Carga los DataFrames y métricas persistidos para `clave`.
+    Las tablas Arrow se abren con memory-map y se convierten a DataFrames de pandas
+    (to_pandas copia las columnas a memoria propia, y pd.concat copia otra vez si hay
+    lotes anexados): un arranque en caliente evita parsear y limpiar CSV, no la copia.
+    `tablas` limita qué DataFrames se leen (por defecto todos); los lotes anexados
+    de una tabla se concatenan en orden. `lotes` limita cuántos lotes se incluyen
+    (los posteriores quedaron de una escritura interrumpida y se ignoran).
+    Retorna (frames, metricas) o None si no hay entrada válida.
+    """
+    if not cache_disponible():
+        return None
+
+    ruta_entrada = os.path.join(directorio, clave)
+    ruta_metricas = os.path.join(ruta_entrada, ARCHIVO_METRICAS)
+    if not os.path.isfile(ruta_metricas):
+        return None
+
+    try:
+        with open(ruta_metricas, encoding="utf-8") as f:
+            metricas = json.load(f)
+
+        frames = {}
+        for nombre, rutas in _partes_tabla(ruta_entrada).items():
+            if tablas is not None and nombre not in tablas:
+                continue
+            if lotes is not None:
+                rutas = rutas[:1 + lotes]
+            tablas_arrow = [feather.read_table(ruta, memory_map=True) for ruta in rutas]
+            if len(tablas_arrow) == 1:
+                frames[nombre] = tablas_arrow[0].to_pandas()
+            else:
+                frames[nombre] = pd.concat([t.to_pandas() for t in tablas_arrow], ignore_index=True)
+    except (OSError, ValueError, pa.ArrowException):
+        # Entrada corrupta o escrita por una versión incompatible: se recalcula
+        return None
+
+    return frames, metricas
+
+
+def guardar_cache(clave, frames, metricas, directorio=DIRECTORIO_CACHE):
+    """
+    Persiste los DataFrames (Arrow IPC sin compresión, apto para memory-map) y las métricas.
+    La escritura es atómica: se arma en un directorio temporal y luego se renombra.
+    Retorna True si la entrada quedó guardada.
+    """
+    if not cache_disponible():
+        return False
+
+    ruta_entrada = os.path.join(directorio, clave)
+    ruta_tmp = None
+    try:
+        os.makedirs(directorio, exist_ok=True)
+        ruta_tmp = tempfile.mkdtemp(prefix=f".{clave}-", dir=directorio)
+
+        for nombre, df in frames.items():
+            feather.write_feather(df, os.path.join(ruta_tmp, nombre + EXTENSION_TABLA), compression="uncompressed")
+
+        with open(os.path.join(ruta_tmp, ARCHIVO_METRICAS), "w", encoding="utf-8") as f:
+            json.dump(metricas, f, ensure_ascii=False, default=_a_json)
+
+        if os.path.isdir(ruta_entrada):
+            shutil.rmtree(ruta_entrada, ignore_errors=True)
+        os.replace(ruta_tmp, ruta_entrada)
+    except (OSError, TypeError, ValueError, pa.ArrowException):
+        if ruta_tmp:
+            shutil.rmtree(ruta_tmp, ignore_errors=True)
+        return False
+
+    return True
+
+
+def anexar_tabla(clave, nombre, df, numero, directorio=DIRECTORIO_CACHE):
+    """
+    Guarda `df` como el lote `numero` (1, 2, ...) de la tabla `nombre` sin reescribir
+    la base ni los lotes anteriores. Retorna True si el lote quedó persistido.
+    """
+    ruta_entrada = os.path.join(directorio, clave)
+    if not cache_disponible() or not os.path.isdir(ruta_entrada):
+        return False
+
+    ruta_parte = os.path.join(ruta_entrada, f"{nombre}.{numero:04d}{EXTENSION_TABLA}")
+    try:
+        _escribir_atomico(ruta_parte, lambda ruta: feather.write_feather(df, ruta, compression="uncompressed"))
+    except (OSError, ValueError, pa.ArrowException):
+        return False
+    return True
+
+
+def leer_json(clave, archivo, directorio=DIRECTORIO_CACHE):
+    """Lee un documento JSON auxiliar de la entrada (métricas, estado de ingesta...)."""
+    try:
+        with open(os.path.join(directorio, clave, archivo), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def guardar_json(clave, archivo, contenido, directorio=DIRECTORIO_CACHE):
+    """Reemplaza atómicamente un documento JSON auxiliar de la entrada."""
+    ruta_entrada = os.path.join(directorio, clave)
+    if not os.path.isdir(ruta_entrada):
+        return False
+
+    def _escribir(ruta):
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(contenido, f, ensure_ascii=False, default=_a_json)
+
+    try:
+        _escribir_atomico(os.path.join(ruta_entrada, archivo), _escribir)
+    except (OSError, TypeError, ValueError):
+        return False
+    return True
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+import dataclasses
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# -----------------------------
+# Constantes y configuraciones
+# -----------------------------
+
+MAX_ENTRADAS = int(os.environ.get("TECHLOG_CACHE_FILTROS_ENTRADAS", 256))
+MAX_BYTES = int(os.environ.get("TECHLOG_CACHE_FILTROS_MB", 256)) * 1024 * 1024
+
+CLAVE_SESION = "clave_filtros"
+
+_AUSENTE = object()
+
+# -----------------------------
+# Utilidades
+# -----------------------------
+
+def estimar_bytes(valor):
+    """Tamaño aproximado en memoria de un resultado cacheado (arrays, DataFrames, contenedores y dataclasses)."""
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        uso = valor.memory_usage(index=True, deep=True)
+        return int(uso.sum()) if isinstance(valor, pd.DataFrame) else int(uso)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(estimar_bytes(v) for v in valor.values())
+    if dataclasses.is_dataclass(valor) and not isinstance(valor, type):
+        return sys.getsizeof(valor) + sum(estimar_bytes(getattr(valor, c.name)) for c in dataclasses.fields(valor))
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(estimar_bytes(v) for v in valor)
+    return sys.getsizeof(valor)
+
+
+def clave_filtros(selecciones, rango_fechas=None, solo_negativos=False):
+    """
+    Forma canónica del estado de filtros: valores ordenados por columna, rango de
+    fechas en ISO y bandera de margen. Dos estados equivalentes producen la misma tupla.
+    """
+    partes = tuple(
+        (col, tuple(sorted(str(v) for v in seleccion)))
+        for col, seleccion in sorted(selecciones.items())
+    )
+    rango = tuple(pd.Timestamp(f).date().isoformat() for f in rango_fechas) if rango_fechas else None
+    return partes, rango, bool(solo_negativos)
+
+
+class CacheLRU:
+    """
+    Caché LRU acotada por número de entradas y por bytes estimados.
+    Es compartida entre sesiones de Streamlit, por eso todas las operaciones toman un lock.
+    """
+
+    def __init__(self, max_entradas=MAX_ENTRADAS, max_bytes=MAX_BYTES):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._datos = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def obtener(self, clave, por_defecto=None):
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave][0]
+            self.fallos += 1
+            return por_defecto
+
+    def guardar(self, clave, valor, tamano=None):
+        tamano = estimar_bytes(valor) if tamano is None else tamano
+        if tamano > self.max_bytes:
+            return  # Un resultado más grande que toda la caché no se guarda
+        with self._lock:
+            if clave in self._datos:
+                self._bytes -= self._datos.pop(clave)[1]
+            self._datos[clave] = (valor, tamano)
+            self._bytes += tamano
+            while self._datos and (len(self._datos) > self.max_entradas or self._bytes > self.max_bytes):
+                _, (_, tamano_viejo) = self._datos.popitem(last=False)
+                self._bytes -= tamano_viejo
+                self.desalojos += 1
+
+    def obtener_o_calcular(self, clave, calcular):
+        valor = self.obtener(clave, _AUSENTE)
+        if valor is _AUSENTE:
+            valor = calcular()
+            self.guardar(clave, valor)
+        return valor
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self._bytes = 0
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": (self.aciertos / consultas * 100) if consultas else 0.0,
+                "entradas": len(self._datos),
+                "bytes": self._bytes,
+                "desalojos": self.desalojos
+            }
+
+
+@st.cache_resource
+def obtener_cache_filtros():
+    """Instancia única por proceso, compartida por todas las sesiones."""
+    return CacheLRU()
+
+
+# -----------------------------
+# Agregados por página
+# -----------------------------
+
+def clave_filtros_activa():
+    """(versión de datos, estado canónico de filtros) de la sesión, o None fuera de la app."""
+    try:
+        return st.session_state.get(CLAVE_SESION)
+    except Exception:
+        return None
+
+
+def memorizar_agregado(pagina, nombre, calcular, *extra_clave):
+    """
+    Devuelve el agregado `nombre` de `pagina` para el estado de filtros activo,
+    calculándolo solo si no está en caché. Fuera de la app (sin clave de filtros
+    en la sesión) se calcula directamente. El resultado se comparte: no mutarlo.
+    """
+    clave_activa = clave_filtros_activa()
+    if clave_activa is None:
+        return calcular()
+
+    return obtener_cache_filtros().obtener_o_calcular(
+        ("agregado", clave_activa, pagina, nombre) + extra_clave, calcular
+    )
+
+
+def estado_filtros_activo():
+    """Estado canónico de filtros de la sesión (ver `clave_filtros`), o None fuera de la app."""
+    clave_activa = clave_filtros_activa()
+    return clave_activa[1] if clave_activa is not None else None
+
+
+def mostrar_estadisticas_cache():
+    """Contadores de la caché de filtros en el sidebar."""
+    stats = obtener_cache_filtros().estadisticas()
+    st.sidebar.caption(
+        f"⚡ Caché de filtros: {stats['aciertos']:,} aciertos / {stats['fallos']:,} fallos "
+        f"({stats['tasa_aciertos']:.0f}%) · {stats['entradas']} entradas · "
+        f"{stats['bytes'] / 1024 / 1024:.1f} MB"
+    )
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+from src.perfilado import perfilar
+
+# -----------------------------
+# Constantes y configuraciones
+# -----------------------------
+
+# Columnas de texto con alta repetición: se guardan como categóricas (códigos enteros + diccionario)
+COLUMNAS_CATEGORICAS = [
+    "SKU_ID", "Categoria", "Ciudad_Destino", "Bodega_Origen", "Estado_Envio",
+    "Canal_Venta", "NPS_Categoria"
+]
+
+ARCHIVO_REPORTE = "compactacion.json"
+
+# Ancho mínimo de los enteros compactados. Las medidas enteras (cantidades, días,
+# tickets) siguen entrando en aritmética elemento a elemento y en int8/int16 un
+# producto desborda sin aviso (int8: 100 * 100 = 16); solo las reducciones suben de tipo.
+ENTERO_MINIMO = np.int32
+
+# -----------------------------
+# Utilidades
+# -----------------------------
+
+def _bytes_columna(serie):
+    return int(serie.memory_usage(index=False, deep=True))
+
+
+def _entero_compacto(serie):
+    """La columna entera en ENTERO_MINIMO si su rango cabe; si no, en int64."""
+    limites = np.iinfo(ENTERO_MINIMO)
+    if serie.empty or (serie.min() >= limites.min and serie.max() <= limites.max):
+        return serie.astype(ENTERO_MINIMO)
+    return serie.astype(np.int64)
+
+
+def _es_entero_sin_nulos(serie):
+    """True si una columna float no tiene nulos y todos sus valores son enteros exactos."""
+    valores = serie.to_numpy()
+    return not np.isnan(valores).any() and np.array_equal(valores, np.trunc(valores))
+
+
+def compactar_columna(serie, categorica=False):
+    """
+    Versión compacta de una columna sin pérdida de información:
+    - texto listado en COLUMNAS_CATEGORICAS -> category
+    - enteros -> ENTERO_MINIMO si el rango cabe (nunca int8/int16)
+    - float sin nulos y con valores enteros -> ENTERO_MINIMO o int64
+    Los float con decimales se dejan en float64: bajar a float32 cambia los
+    resultados de sumas y correlaciones.
+    """
+    if categorica and (serie.dtype == object or pd.api.types.is_string_dtype(serie.dtype)):
+        return serie.astype("category")
+    if pd.api.types.is_bool_dtype(serie.dtype):
+        return serie
+    if pd.api.types.is_integer_dtype(serie.dtype) and not isinstance(serie.dtype, pd.api.extensions.ExtensionDtype):
+        return _entero_compacto(serie)
+    if pd.api.types.is_float_dtype(serie.dtype) and len(serie) > 0 and _es_entero_sin_nulos(serie):
+        return _entero_compacto(serie.astype(np.int64))
+    return serie
+
+
+# -----------------------------
+# Funciones principales
+# -----------------------------
+
+@perfilar
+def compactar_dataset(df):
+    """
+    Aplica compactar_columna a todo el Dataset Maestro.
+    Retorna (df_compacto, reporte) donde el reporte lista, por columna, dtype y bytes antes/después.
+    """
+    df_compacto = df.copy(deep=False)
+    reporte = []
+
+    for col in df.columns:
+        original = df[col]
+        compacta = compactar_columna(original, categorica=col in COLUMNAS_CATEGORICAS)
+        if compacta is not original:
+            df_compacto[col] = compacta
+        reporte.append({
+            "columna": col,
+            "dtype_antes": str(original.dtype),
+            "dtype_despues": str(compacta.dtype),
+            "bytes_antes": _bytes_columna(original),
+            "bytes_despues": _bytes_columna(compacta)
+        })
+
+    return df_compacto, reporte
+
+
+def resumen_compactacion(reporte):
+    """DataFrame del reporte con el ahorro por columna, ordenado por bytes recuperados."""
+    df_reporte = pd.DataFrame(reporte)
+    if df_reporte.empty:
+        return df_reporte
+    df_reporte["bytes_ahorrados"] = df_reporte["bytes_antes"] - df_reporte["bytes_despues"]
+    df_reporte["ahorro_pct"] = np.where(
+        df_reporte["bytes_antes"] > 0,
+        df_reporte["bytes_ahorrados"] / df_reporte["bytes_antes"].where(df_reporte["bytes_antes"] > 0, 1) * 100,
+        0.0
+    )
+    return df_reporte.sort_values("bytes_ahorrados", ascending=False)
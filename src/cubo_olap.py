@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import streamlit as st
+from src.perfilado import perfilar
+
+# -----------------------------
+# Constantes y configuraciones
+# -----------------------------
+
+# Dimensiones del cubo: las llaves de agrupación de las páginas y las columnas de los
+# filtros del sidebar. La fecha va a nivel de mes y el SKU queda fuera: con ellos el
+# cubo tendría casi una fila por transacción (ver DIMENSIONES_SKU).
+DIMENSIONES = [
+    "Categoria", "Bodega_Origen", "Ciudad_Destino", "Canal_Venta",
+    "Estado_Envio", "Fecha_Mes", "margen_negativo", "venta_sin_inventario"
+]
+
+# Primer y último día con ventas de cada celda: deciden si un rango de fechas por día
+# la cubre entera o si hay que recalcular ese mes desde las filas (ver filtrar_cubo)
+COLUMNAS_FECHA = ["fecha_min", "fecha_max"]
+
+# Enrollado por SKU para Fuga de Capital y Venta Invisible; se arma desde las filas
+# filtradas, una vez por estado de filtros (ver construir_cubo_sku)
+DIMENSIONES_SKU = ["SKU_ID", "Categoria", "Canal_Venta", "margen_negativo", "venta_sin_inventario"]
+MEDIDAS_SKU = ["n", "ingreso_total", "margen_real", "Cantidad_Vendida", "Precio_Venta_Final"]
+
+# Categoría NPS -> medida de conteo en el cubo (histograma de lealtad sin filas)
+CATEGORIAS_NPS = {"Promotor": "nps_promotor_n", "Pasivo": "nps_pasivo_n", "Detractor": "nps_detractor_n"}
+
+# Fecha pivote para acumular días de Ultima_Revision: valores cercanos a cero
+# mantienen estables las sumas de cuadrados de la correlación Riesgo/NPS.
+PIVOTE_REVISION = pd.Timestamp("2024-01-01")
+
+# -----------------------------
+# Utilidades
+# -----------------------------
+
+def media(suma, conteo):
+    """Promedio a partir de medidas aditivas; NaN si no hay observaciones."""
+    if isinstance(conteo, pd.Series):
+        return suma / conteo.where(conteo != 0)
+    return suma / conteo if conteo else np.nan
+
+
+def correlacion(n, sx, sy, sxx, syy, sxy):
+    """Pearson a partir de sumas suficientes (n, Σx, Σy, Σx², Σy², Σxy)."""
+    cov = n * sxy - sx * sy
+    var_x = n * sxx - sx * sx
+    var_y = n * syy - sy * sy
+    if isinstance(n, pd.Series):
+        denominador = np.sqrt(var_x * var_y)
+        return (cov / denominador.where((n >= 2) & (denominador > 0))).clip(-1, 1)
+    if n < 2 or var_x <= 0 or var_y <= 0:
+        return np.nan
+    return float(np.clip(cov / np.sqrt(var_x * var_y), -1, 1))
+
+
+def mes_venta(fechas):
+    """Primer día del mes de cada fecha (NaT se conserva): la llave Fecha_Mes del cubo."""
+    return pd.to_datetime(fechas).dt.to_period("M").dt.to_timestamp()
+
+
+# -----------------------------
+# Construcción y consultas
+# -----------------------------
+
+@perfilar
+def construir_cubo(df_dss):
+    """
+    Cubo pre-agregado del Dataset Maestro: una fila por combinación observada de
+    DIMENSIONES con medidas aditivas (sumas, conteos y sumas de cuadrados/productos)
+    y el rango de días de cada celda (COLUMNAS_FECHA).
+    Cualquier filtro del sidebar o agrupación de página se resuelve enrollando el cubo.
+    """
+    base = pd.DataFrame(index=df_dss.index)
+    for dim in DIMENSIONES:
+        if dim in df_dss.columns:
+            base[dim] = df_dss[dim]
+    fechas = pd.to_datetime(df_dss["Fecha_Venta"])
+    base["Fecha_Mes"] = mes_venta(fechas)
+    base["margen_negativo"] = df_dss["margen_real"] < 0
+
+    # Conteos y sumas simples
+    base["n"] = 1
+    base["nulos"] = df_dss.isna().sum(axis=1)
+    for col in ["ingreso_total", "margen_real", "Cantidad_Vendida", "Precio_Venta_Final",
+                "Stock_Actual", "NPS_Numerico", "Ticket_Soporte"]:
+        base[col] = df_dss[col]
+    base["Rating_Producto"] = df_dss["Rating_Producto"]
+    base["Rating_Producto_n"] = df_dss["Rating_Producto"].notna().astype(int)
+
+    for categoria, medida in CATEGORIAS_NPS.items():
+        base[medida] = (df_dss["NPS_Categoria"] == categoria).astype(int)
+
+    # Paradoja de fidelidad: medidas restringidas a las filas marcadas
+    paradoja = df_dss["paradoja_fidelidad"].astype(bool)
+    base["paradoja_n"] = paradoja.astype(int)
+    base["paradoja_stock"] = df_dss["Stock_Actual"].where(paradoja, 0)
+    base["paradoja_nps"] = df_dss["NPS_Numerico"].where(paradoja, 0)
+    base["paradoja_ingreso"] = df_dss["ingreso_total"].where(paradoja, 0)
+
+    # Antigüedad de revisión (días desde PIVOTE_REVISION) y sumas para la correlación con NPS
+    dias = (pd.to_datetime(df_dss["Ultima_Revision"]) - PIVOTE_REVISION).dt.days
+    base["revision_n"] = dias.notna().astype(int)
+    base["revision_dias"] = dias.fillna(0).astype(float)
+
+    con_ambos = dias.notna() & df_dss["NPS_Numerico"].notna()
+    x = dias.where(con_ambos, 0).astype(float)
+    y = df_dss["NPS_Numerico"].where(con_ambos, 0).astype(float)
+    base["corr_n"] = con_ambos.astype(int)
+    base["corr_x"] = x
+    base["corr_y"] = y
+    base["corr_xx"] = x * x
+    base["corr_yy"] = y * y
+    base["corr_xy"] = x * y
+
+    dims = [d for d in DIMENSIONES if d in base.columns]
+    grupos = base.assign(fecha=fechas.dt.normalize()).groupby(dims, dropna=False, observed=True, sort=False)
+    cubo = grupos[[c for c in base.columns if c not in dims]].sum(min_count=0)
+    cubo["fecha_min"] = grupos["fecha"].min()
+    cubo["fecha_max"] = grupos["fecha"].max()
+    return cubo.reset_index()
+
+
+@perfilar
+def construir_cubo_sku(df_filas):
+    """
+    Enrollado por SKU (DIMENSIONES_SKU x MEDIDAS_SKU) de filas ya filtradas. Los SKUs no
+    están en el cubo compartido, así que este se arma por estado de filtros y solo para
+    las páginas que muestran SKUs.
+    """
+    base = pd.DataFrame(index=df_filas.index)
+    canal_col = "Canal_Venta" if "Canal_Venta" in df_filas.columns else "Bodega_Origen"
+    for dim in DIMENSIONES_SKU:
+        columna = canal_col if dim == "Canal_Venta" else dim
+        if columna in df_filas.columns:
+            base[columna] = df_filas[columna]
+    base["margen_negativo"] = df_filas["margen_real"] < 0
+    base["n"] = 1
+    for col in MEDIDAS_SKU[1:]:
+        base[col] = df_filas[col]
+
+    dims = [c for c in base.columns if c not in MEDIDAS_SKU]
+    return base.groupby(dims, dropna=False, observed=True, sort=False).sum(min_count=0).reset_index()
+
+
+@st.cache_resource(max_entries=2)
+def obtener_cubo(_df_dss, version_datos):
+    # Se construye una vez por versión del dataset; el DataFrame no se hashea
+    return construir_cubo(_df_dss)
+
+
+def resolver_cubo(df_filtrado, cubo=None):
+    """Cubo ya filtrado si la app lo entrega; si no (uso aislado de una página), se arma desde las filas."""
+    return cubo if cubo is not None else construir_cubo(df_filtrado)
+
+
+def filtrar_cubo(cubo, estado_filtros, filas=None):
+    """
+    Aplica al cubo el mismo estado canónico de filtros que crear_sidebar_filtros
+    (ver cache_filtros.clave_filtros): (selecciones, rango ISO, solo_negativos).
+    El rango es por día y el cubo por mes: las celdas que el rango cubre enteras
+    (según COLUMNAS_FECHA) salen del cubo; los meses que corta se recalculan con
+    construir_cubo sobre `filas()`, las filas ya filtradas, que solo se pide en ese caso.
+    """
+    if estado_filtros is None:
+        return cubo
+
+    selecciones, rango, solo_negativos = estado_filtros
+    mascara = np.ones(len(cubo), dtype=bool)
+
+    for col, seleccion in selecciones:
+        if seleccion and col in cubo.columns:
+            mascara &= cubo[col].isin(seleccion).to_numpy()
+
+    if solo_negativos:
+        mascara &= cubo["margen_negativo"].to_numpy(dtype=bool)
+
+    if rango is None:
+        return cubo[mascara]
+
+    inicio = pd.Timestamp(rango[0])
+    fin = pd.Timestamp(rango[1]) + pd.Timedelta(days=1)
+    dentro = ((cubo["fecha_min"] >= inicio) & (cubo["fecha_max"] < fin)).to_numpy()
+    fuera = (cubo["fecha_min"].isna() | (cubo["fecha_max"] < inicio) | (cubo["fecha_min"] >= fin)).to_numpy()
+    cortados = mascara & ~dentro & ~fuera
+    if not cortados.any():
+        return cubo[mascara & dentro]
+
+    if filas is None:
+        raise ValueError("El rango de fechas corta meses del cubo: se necesitan las filas filtradas")
+    meses = cubo.loc[cortados, "Fecha_Mes"].unique()
+    df_filas = filas()
+    bordes = construir_cubo(df_filas[mes_venta(df_filas["Fecha_Venta"]).isin(meses).to_numpy()])
+    completos = cubo[mascara & dentro & ~cubo["Fecha_Mes"].isin(meses).to_numpy()]
+    return pd.concat([completos, bordes], ignore_index=True)
+
+
+def enrollar(cubo, dimensiones, medidas=None):
+    """
+    Roll-up del cubo a `dimensiones` sumando las medidas. Igual que un groupby
+    sobre las filas: las llaves nulas se descartan y el resultado queda ordenado.
+    """
+    if medidas is None:
+        medidas = [c for c in cubo.columns if c not in DIMENSIONES + COLUMNAS_FECHA]
+    return cubo.groupby(dimensiones, observed=True)[medidas].sum()
@@ -1,37 +1,143 @@
 ﻿# -*- coding: utf-8 -*-
+import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import streamlit as st
 from src.inventario import procesar_inventario
 from src.transacciones import procesar_transacciones
 from src.feedback import procesar_feedback
+from src.transacciones import limpiar_transacciones
+from src.cache_columnar import (
+    ARCHIVO_METRICAS, clave_cache, leer_cache, guardar_cache, anexar_tabla, leer_json, guardar_json
+)
+from src.ingesta_incremental import (
+    ARCHIVO_ESTADO, LectorPrefijo, capturar_csv, leer_filas_nuevas, prefijo_sin_cambios
+)
+from src.compactacion import ARCHIVO_REPORTE, compactar_dataset
+from src.perfilado import en_hilo, perfilar
 
 pd.set_option('future.no_silent_downcasting', True)
 
-@st.cache_data
-def cargar_datos():
-    # 1. Carga de archivos individuales con sus respectivas métricas de salud
-    df_inv, met_inv = procesar_inventario("data/inventario_central_v2.csv")
-    df_feed, met_feed = procesar_feedback("data/feedback_clientes_v2.csv")
-    df_trans, met_trans = procesar_transacciones("data/transacciones_logistica_v2.csv", df_inv, df_feed)
-    
+RUTA_INVENTARIO = "data/inventario_central_v2.csv"
+RUTA_FEEDBACK = "data/feedback_clientes_v2.csv"
+RUTA_TRANSACCIONES = "data/transacciones_logistica_v2.csv"
+
+# Un hilo por archivo fuente, sin pasar de los núcleos disponibles
+HILOS_CARGA = min(3, os.cpu_count() or 1)
+
+def firma_fuentes():
+    """
+    (tamaño, mtime) de los CSV fuente. Es barata de calcular en cada rerun y se pasa
+    a cargar_datos para que st.cache_data detecte archivos modificados o anexados.
+    """
+    return tuple(
+        (os.path.getsize(r), os.path.getmtime(r)) if os.path.exists(r) else None
+        for r in (RUTA_INVENTARIO, RUTA_FEEDBACK, RUTA_TRANSACCIONES)
+    )
+
+@st.cache_data(max_entries=2)
+def cargar_datos(firma=None):
+    # `firma` solo forma parte de la clave de st.cache_data (ver firma_fuentes)
+
+    # 0. Arranque en caliente: tablas limpias persistidas en formato columnar.
+    # La entrada depende de inventario y feedback; las transacciones se ingieren
+    # en modo append: solo las filas escritas después del último offset.
+    clave = clave_cache([RUTA_INVENTARIO, RUTA_FEEDBACK])
+    estado_guardado = leer_json(clave, ARCHIVO_ESTADO)
+    lectura = leer_filas_nuevas(RUTA_TRANSACCIONES, estado_guardado)
+
+    if lectura is not None:
+        df_raw_nuevo, estado = lectura
+        tablas = ["dss"] if df_raw_nuevo.empty else ["dss", "inventario", "feedback"]
+        # Solo los lotes confirmados en el estado guardado: un lote escrito por un anexo
+        # interrumpido antes de guardar el estado se vuelve a generar (y se sobrescribe)
+        en_cache = leer_cache(clave, tablas=tablas, lotes=estado_guardado.get("lotes_anexados", 0))
+
+        if en_cache is not None and all(t in en_cache[0] for t in tablas):
+            frames, metricas_calidad = en_cache
+            df_dss = frames["dss"]
+            if not df_raw_nuevo.empty:
+                df_dss = anexar_transacciones(clave, df_dss, df_raw_nuevo, frames, metricas_calidad, estado)
+            if estado.get("lotes_anexados", 0):
+                # Umbral Q3 de stock: estadística global, se recalcula sobre el histórico + lotes.
+                # Al concatenar lotes las categóricas vuelven a object: se compacta de nuevo
+                df_dss, _ = compactar_dataset(calcular_paradoja_fidelidad(df_dss))
+            reporte_memoria = leer_json(clave, ARCHIVO_REPORTE) or []
+            return df_dss, construir_health_scores(metricas_calidad), metricas_calidad, reporte_memoria
+
+    # 1. Carga de archivos individuales con sus respectivas métricas de salud.
+    # Las tres limpiezas son independientes: corren en paralelo (el parseo con
+    # pyarrow y buena parte de pandas liberan el GIL) y el arranque queda acotado
+    # por el archivo más lento en lugar de la suma de los tres.
+    estado = capturar_csv(RUTA_TRANSACCIONES)
+    with ThreadPoolExecutor(max_workers=HILOS_CARGA) as pool:
+        futuro_inv = pool.submit(en_hilo(procesar_inventario), RUTA_INVENTARIO)
+        futuro_feed = pool.submit(en_hilo(procesar_feedback), RUTA_FEEDBACK)
+        futuro_trans = pool.submit(en_hilo(procesar_transacciones), RUTA_TRANSACCIONES)
+        df_inv, met_inv = futuro_inv.result()
+        df_feed, met_feed = futuro_feed.result()
+        df_trans, met_trans = futuro_trans.result()
+    if not prefijo_sin_cambios(RUTA_TRANSACCIONES, estado):
+        # Se anexaron filas durante el parseo: se reparsea solo la porción con huella
+        with LectorPrefijo(RUTA_TRANSACCIONES, estado["offset"]) as prefijo:
+            df_trans, met_trans = procesar_transacciones(prefijo)
+
     # 2. Consolidación en un único Dataset Maestro para el DSS
     df_dss = crear_dataset_consolidado(df_trans, df_inv, df_feed)
-    
-    # 3. Diccionarios de salud para las pestañas de Resumen y Salud del Dato
-    health_scores = {
+
+    # 3. Compactación: categóricas y enteros chicos (reporte de bytes por columna)
+    df_dss, reporte_memoria = compactar_dataset(df_dss)
+
+    metricas_calidad = {
+        "inventario": met_inv,
+        "transacciones": met_trans,
+        "feedback": met_feed
+    }
+
+    guardado = guardar_cache(clave, {
+        "inventario": df_inv,
+        "feedback": df_feed,
+        "transacciones": df_trans,
+        "dss": df_dss
+    }, metricas_calidad)
+    if guardado:
+        guardar_json(clave, ARCHIVO_REPORTE, reporte_memoria)
+        guardar_json(clave, ARCHIVO_ESTADO, estado)
+
+    # 4. Diccionarios de salud para las pestañas de Resumen y Salud del Dato
+    health_scores = construir_health_scores(metricas_calidad)
+
+    return df_dss, health_scores, metricas_calidad, reporte_memoria
+
+def anexar_transacciones(clave, df_dss, df_raw_nuevo, frames, metricas_calidad, estado):
+    """
+    Limpia y consolida solo las transacciones nuevas, las persiste como un lote más
+    de la caché y las agrega al Dataset Maestro. El estado de ingesta se guarda al
+    final: si algo falla antes, el lote se vuelve a procesar en la próxima carga.
+    """
+    df_trans_nuevo = limpiar_transacciones(df_raw_nuevo, formato_fecha=estado.get("formato_fecha"))
+    df_dss_nuevo = crear_dataset_consolidado(df_trans_nuevo, frames["inventario"], frames["feedback"])
+
+    lote = estado["lotes_anexados"]
+    if anexar_tabla(clave, "transacciones", df_trans_nuevo, lote) and anexar_tabla(clave, "dss", df_dss_nuevo, lote):
+        met_trans = metricas_calidad.setdefault("transacciones", {})
+        met_trans["total_transacciones"] = met_trans.get("total_transacciones", 0) + len(df_trans_nuevo)
+        guardar_json(clave, ARCHIVO_METRICAS, metricas_calidad)
+        guardar_json(clave, ARCHIVO_ESTADO, estado)
+
+    return pd.concat([df_dss, df_dss_nuevo], ignore_index=True)
+
+def construir_health_scores(metricas_calidad):
+    met_inv = metricas_calidad.get("inventario", {})
+    met_trans = metricas_calidad.get("transacciones", {})
+    met_feed = metricas_calidad.get("feedback", {})
+    return {
         "Inventario": {"Antes": met_inv.get("health_score_antes", 0), "Despues": met_inv.get("health_score_despues", 0)},
         "Transacciones": {"Antes": met_trans.get("health_score_antes", 0), "Despues": met_trans.get("health_score_despues", 0)},
         "Feedback": {"Antes": met_feed.get("health_score_antes", 0), "Despues": met_feed.get("health_score_despues", 0)}
     }
-    
-    metricas_calidad = {
-        "inventario": met_inv, 
-        "transacciones": met_trans, 
-        "feedback": met_feed
-    }
-    
-    return df_dss, health_scores, metricas_calidad
 
+@perfilar
 def crear_dataset_consolidado(df_trans, df_inv, df_feed):
     # Usamos una copia para no alterar el dataframe original
     df_trabajo = df_trans.copy()
@@ -84,6 +190,11 @@ def crear_dataset_consolidado(df_trans, df_inv, df_feed):
         df_final["brecha_entrega"] = 0
 
     # --- 7. Lógica de la Paradoja de Fidelidad ---
+    return calcular_paradoja_fidelidad(df_final)
+
+def calcular_paradoja_fidelidad(df_final):
+    # Stock alto (> Q3 global) con NPS bajo (< 7). Depende del Q3 de todo el dataset,
+    # por eso se recalcula tras anexar transacciones nuevas.
     stock_q3 = df_final["Stock_Actual"].quantile(0.75) if len(df_final) > 0 else 0
     df_final["paradoja_fidelidad"] = (df_final["Stock_Actual"] > stock_q3) & (df_final["NPS_Numerico"] < 7)
 
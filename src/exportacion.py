@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+import gzip
+import hashlib
+import os
+import tempfile
+
+import streamlit as st
+
+from src.cache_columnar import DIRECTORIO_CACHE
+from src.cache_filtros import CLAVE_SESION
+from src.perfilado import perfilar
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# -----------------------------
+# Constantes y configuraciones
+# -----------------------------
+
+DIRECTORIO_EXPORTES = os.path.join(DIRECTORIO_CACHE, "exportes")
+MAX_ARCHIVOS = int(os.environ.get("TECHLOG_EXPORTES_MAX", 16))
+TAMANO_BLOQUE = 100_000
+
+# formato -> (etiqueta, extensión, mime)
+FORMATOS = {
+    "csv": ("CSV", ".csv", "text/csv"),
+    "csv.gz": ("CSV comprimido (gzip)", ".csv.gz", "application/gzip"),
+    "parquet": ("Parquet", ".parquet", "application/vnd.apache.parquet")
+}
+
+# -----------------------------
+# Escritura por bloques
+# -----------------------------
+
+def _escribir_csv(df, f):
+    for inicio in range(0, max(len(df), 1), TAMANO_BLOQUE):
+        df.iloc[inicio:inicio + TAMANO_BLOQUE].to_csv(f, index=False, header=(inicio == 0))
+
+
+def _escribir_parquet(df, ruta):
+    # Un row group por bloque: solo un bloque convertido a Arrow a la vez
+    esquema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(ruta, esquema) as escritor:
+        for inicio in range(0, len(df), TAMANO_BLOQUE):
+            bloque = df.iloc[inicio:inicio + TAMANO_BLOQUE]
+            escritor.write_table(pa.Table.from_pandas(bloque, schema=esquema, preserve_index=False))
+
+
+@perfilar
+def escribir_exportacion(df, formato, ruta):
+    """
+    Escribe `df` en `ruta` por bloques de TAMANO_BLOQUE filas: la memoria extra
+    es la de un bloque serializado, no la del archivo completo. El CSV lleva BOM
+    (utf-8-sig) para que Excel respete las tildes.
+    """
+    if formato == "csv":
+        with open(ruta, "w", encoding="utf-8-sig", newline="") as f:
+            _escribir_csv(df, f)
+    elif formato == "csv.gz":
+        with gzip.open(ruta, "wt", encoding="utf-8-sig", newline="", compresslevel=6) as f:
+            _escribir_csv(df, f)
+    elif formato == "parquet":
+        _escribir_parquet(df, ruta)
+    else:
+        raise ValueError(f"Formato de exportación desconocido: {formato}")
+    return ruta
+
+# -----------------------------
+# Caché por estado de filtros
+# -----------------------------
+
+def formatos_disponibles():
+    return [f for f in FORMATOS if f != "parquet" or pq is not None]
+
+
+def _clave_activa():
+    try:
+        return st.session_state.get(CLAVE_SESION)
+    except Exception:
+        return None
+
+
+def _podar(directorio):
+    """Deja solo los MAX_ARCHIVOS exportes usados más recientemente."""
+    archivos = [os.path.join(directorio, a) for a in os.listdir(directorio) if not a.startswith(".")]
+    archivos.sort(key=os.path.getmtime, reverse=True)
+    for ruta in archivos[MAX_ARCHIVOS:]:
+        try:
+            os.remove(ruta)
+        except OSError:
+            pass
+
+
+def obtener_exportacion(df, formato, clave=None):
+    """
+    Ruta del archivo exportado para el estado de filtros `clave` (por defecto el de
+    la sesión: versión de datos + filtros). Se escribe una sola vez por clave y
+    formato y se comparte entre botones y sesiones. Sin clave se escribe un temporal.
+    """
+    clave = _clave_activa() if clave is None else clave
+    extension = FORMATOS[formato][1]
+
+    if clave is None:
+        descriptor, ruta = tempfile.mkstemp(suffix=extension)
+        os.close(descriptor)
+        return escribir_exportacion(df, formato, ruta)
+
+    os.makedirs(DIRECTORIO_EXPORTES, exist_ok=True)
+    huella = hashlib.blake2b(repr(clave).encode("utf-8"), digest_size=16).hexdigest()
+    ruta = os.path.join(DIRECTORIO_EXPORTES, huella + extension)
+
+    if os.path.exists(ruta):
+        os.utime(ruta)  # Marca de uso para la poda LRU
+        return ruta
+
+    # Escritura atómica: otra sesión nunca ve un archivo a medias
+    descriptor, temporal = tempfile.mkstemp(dir=DIRECTORIO_EXPORTES, prefix=".", suffix=extension)
+    os.close(descriptor)
+    try:
+        escribir_exportacion(df, formato, temporal)
+        os.replace(temporal, ruta)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+    _podar(DIRECTORIO_EXPORTES)
+    return ruta
+
+# -----------------------------
+# Componente de descarga
+# -----------------------------
+
+def boton_exportacion(df, nombre_archivo, clave_widget, contenedor=None, ayuda=None):
+    """
+    Selector de formato + "Preparar" + descarga. El archivo solo se genera cuando
+    se pide (no en cada rerun) y queda listo mientras no cambien los filtros.
+    """
+    contenedor = contenedor or st
+    disponibles = formatos_disponibles()
+    formato = contenedor.selectbox(
+        "Formato", disponibles, format_func=lambda f: FORMATOS[f][0], key=f"{clave_widget}_formato", help=ayuda
+    )
+
+    clave_preparada = f"{clave_widget}_preparado"
+    pedido = (_clave_activa(), formato)
+    if contenedor.button("⚙️ Preparar descarga", key=f"{clave_widget}_preparar"):
+        st.session_state[clave_preparada] = pedido
+
+    if st.session_state.get(clave_preparada) != pedido:
+        return
+
+    ruta = obtener_exportacion(df, formato)
+    etiqueta, extension, mime = FORMATOS[formato]
+    with open(ruta, "rb") as f:
+        contenedor.download_button(
+            f"💾 Descargar {etiqueta} ({os.path.getsize(ruta) / 1024 / 1024:,.1f} MB)",
+            data=f, file_name=nombre_archivo + extension, mime=mime, key=f"{clave_widget}_descargar"
+        )
+    if pedido[0] is None:
+        os.remove(ruta)  # Temporal fuera de la app: ya se entregó al botón
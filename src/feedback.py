@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 import numpy as np
 import pandas as pd
+from src.lectura_csv import leer_csv
+from src.perfilado import perfilar
+from src.salud import calcular_health_score
 
 pd.set_option('future.no_silent_downcasting', True)
 
@@ -27,9 +30,64 @@ def normalizar_nps_dinamico(valor):
     except:
         return 5.0
 
+def _a_flotante(valores):
+    """
+    Convierte una Serie a float64 con la misma semántica que float(valor):
+    lo no convertible queda como NaN. Los textos se convierten con astype(float),
+    que redondea igual que float(); pd.to_numeric solo detecta cuáles se pueden
+    convertir (su parser rápido difiere en el último bit). El resto pasa por la
+    conversión escalar.
+    """
+    if pd.api.types.is_numeric_dtype(valores) or pd.api.types.is_bool_dtype(valores):
+        return valores.to_numpy(dtype=float, na_value=np.nan)
+    try:
+        return valores.astype(float).to_numpy(dtype=float, na_value=np.nan)
+    except (TypeError, ValueError):
+        pass
+
+    def _convertir(v):
+        try:
+            return float(v)
+        except (TypeError, ValueError):
+            return np.nan
+
+    numeros = np.full(len(valores), np.nan)
+    convertibles = pd.to_numeric(valores, errors="coerce").notna().to_numpy()
+    try:
+        numeros[convertibles] = valores[convertibles].astype(float).to_numpy(dtype=float, na_value=np.nan)
+    except (TypeError, ValueError):
+        numeros[convertibles] = valores[convertibles].map(_convertir).to_numpy(dtype=float)
+    pendientes = ~convertibles & valores.notna().to_numpy()
+    if pendientes.any():
+        numeros[pendientes] = valores[pendientes].map(_convertir).to_numpy(dtype=float)
+    return numeros
+
+def normalizar_nps_vectorizado(valores):
+    """
+    Versión vectorizada de normalizar_nps_dinamico sobre una Serie completa.
+    Mismos tramos: (10, ∞) -> 5 + n/20, (-∞, 0) -> 5 + n/25, [0, 10] -> n, resto -> 5.0
+    """
+    n = _a_flotante(valores)
+    resultado = np.select(
+        [n > 10, n < 0, (n >= 0) & (n <= 10)],
+        [5 + (n / 20), 5 + (n / 25), n],
+        default=5.0
+    )
+    return pd.Series(resultado, index=valores.index, name=valores.name)
+
+def categorizar_nps(nps_numerico):
+    """Promotor (>= 9), Pasivo (>= 7) o Detractor, en una sola pasada vectorizada."""
+    categorias = np.select(
+        [nps_numerico >= 9, nps_numerico >= 7],
+        ["Promotor", "Pasivo"],
+        default="Detractor"
+    )
+    return pd.Series(categorias, index=nps_numerico.index, dtype=object)
+
+@perfilar
 def procesar_feedback(ruta_csv):
     try:
-        df_feedback = pd.read_csv(ruta_csv)
+        df_feedback = leer_csv(ruta_csv)
     except Exception as e:
         return pd.DataFrame(), {"error": str(e)}
 
@@ -40,12 +98,10 @@ def procesar_feedback(ruta_csv):
     salud_antes = calcular_health_score(df_feedback)
 
     # 3. Transformación y Normalización de NPS
-    df_feedback["NPS_Numerico"] = df_feedback["Satisfaccion_NPS"].apply(normalizar_nps_dinamico)
+    df_feedback["NPS_Numerico"] = normalizar_nps_vectorizado(df_feedback["Satisfaccion_NPS"])
 
     # 4. Categorización NPS
-    df_feedback["NPS_Categoria"] = df_feedback["NPS_Numerico"].apply(
-        lambda x: "Promotor" if x >= 9 else ("Pasivo" if x >= 7 else "Detractor")
-    )
+    df_feedback["NPS_Categoria"] = categorizar_nps(df_feedback["NPS_Numerico"])
 
     # 5. Limpieza de Rating_Producto (Tratamiento de Outliers y Mediana)
     df_feedback["Rating_Producto"] = pd.to_numeric(df_feedback["Rating_Producto"], errors='coerce')
@@ -84,12 +140,3 @@ def procesar_feedback(ruta_csv):
 
     return df_feedback, metricas
 
-def calcular_health_score(df):
-    if df.empty: return (0, 0, 0)
-    total_celdas = df.size
-    total_nulos = df.isna().sum().sum()
-    porcentaje_nulos = total_nulos / total_celdas if total_celdas > 0 else 0
-    duplicados = df.duplicated().sum()
-    porcentaje_duplicados = duplicados / len(df) if len(df) > 0 else 0
-    score = 100 * (1 - (0.7 * porcentaje_nulos + 0.3 * porcentaje_duplicados))
-    return round(score, 2), round(porcentaje_nulos * 100, 2), round(porcentaje_duplicados * 100, 2)
\ No newline at end of file
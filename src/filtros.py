@@ -1,8 +1,85 @@
 ﻿# -*- coding: utf-8 -*-
 import streamlit as st
 import pandas as pd
+import numpy as np
+from src.cache_filtros import CLAVE_SESION, clave_filtros, obtener_cache_filtros
+from src.perfilado import perfilar
 
-def crear_sidebar_filtros(df_dss):
+COLUMNAS_FILTRO = ["Categoria", "Ciudad_Destino", "Estado_Envio"]
+
+def construir_indice_filtros(df_dss):
+    """
+    Índice que se arma una sola vez por dataset para que cada clic en el sidebar
+    cueste una máscara combinada y una única selección de filas:
+    - columnas de filtro factorizadas (códigos enteros + valores únicos)
+    - fechas válidas ordenadas (ns) con sus filas, para búsqueda binaria del rango
+    - bandera precalculada de margen negativo
+    """
+    indice = {"n": len(df_dss), "columnas": {}}
+
+    for col in COLUMNAS_FILTRO:
+        if col in df_dss.columns:
+            codigos, valores = pd.factorize(df_dss[col])
+            indice["columnas"][col] = {
+                "codigos": codigos,
+                "valores": pd.Index(valores),
+                "opciones": sorted(valores.tolist())
+            }
+
+    if "Fecha_Venta" in df_dss.columns:
+        fechas = pd.to_datetime(df_dss["Fecha_Venta"]).to_numpy(dtype="datetime64[ns]")
+        filas_validas = np.flatnonzero(~np.isnat(fechas))
+        orden = filas_validas[np.argsort(fechas[filas_validas], kind="stable")]
+        indice["fechas_ordenadas"] = fechas[orden]
+        indice["filas_por_fecha"] = orden
+
+    if "margen_real" in df_dss.columns:
+        indice["margen_negativo"] = (df_dss["margen_real"] < 0).to_numpy()
+
+    return indice
+
+@st.cache_resource(max_entries=2)
+def obtener_indice_filtros(_df_dss, version_datos):
+    # `version_datos` (firma de las fuentes) identifica el dataset; el DataFrame no se hashea
+    indice = construir_indice_filtros(_df_dss)
+    indice["version_datos"] = version_datos
+    return indice
+
+def mascara_filtros(indice, selecciones, rango_fechas=None, solo_negativos=False):
+    """
+    Máscara booleana de filas que cumplen todos los filtros.
+    `selecciones` = {columna: valores elegidos}; una lista vacía no filtra.
+    `rango_fechas` = (fecha_inicio, fecha_fin) inclusivo por día calendario.
+    """
+    mascara = np.ones(indice["n"], dtype=bool)
+
+    for col, seleccion in selecciones.items():
+        if not seleccion or col not in indice["columnas"]:
+            continue
+        info = indice["columnas"][col]
+        # Tabla de pertenencia por código; la última posición atiende el código -1 (nulo)
+        pertenece = np.zeros(len(info["valores"]) + 1, dtype=bool)
+        pertenece[:-1] = info["valores"].isin(seleccion)
+        mascara &= pertenece[info["codigos"]]
+
+    if rango_fechas is not None and "fechas_ordenadas" in indice:
+        inicio = np.datetime64(pd.Timestamp(rango_fechas[0]), "ns")
+        fin = np.datetime64(pd.Timestamp(rango_fechas[1]) + pd.Timedelta(days=1), "ns")
+        desde, hasta = np.searchsorted(indice["fechas_ordenadas"], [inicio, fin], side="left")
+        en_rango = np.zeros(indice["n"], dtype=bool)
+        en_rango[indice["filas_por_fecha"][desde:hasta]] = True
+        mascara &= en_rango
+
+    if solo_negativos and "margen_negativo" in indice:
+        mascara &= indice["margen_negativo"]
+
+    return mascara
+
+@perfilar
+def crear_sidebar_filtros(df_dss, indice=None):
+
+    if indice is None:
+        indice = construir_indice_filtros(df_dss)
 
     st.sidebar.title("🎛️ Panel de Control")
     st.sidebar.markdown("---")
@@ -10,49 +87,42 @@ def crear_sidebar_filtros(df_dss):
     # Filtros principales
     st.sidebar.subheader("🔍 Filtros de Negocio")
     
-    df_filtrado = df_dss.copy()
+    selecciones = {}
+    rango_seleccionado = None
     
     # 1. Filtro por Categoría (Incluye 'no Catalogado' de la Venta Invisible)
-    if "Categoria" in df_dss.columns:
+    if "Categoria" in indice["columnas"]:
         # Obtenemos todas las categorías únicas
-        categorias = sorted(df_dss["Categoria"].unique().tolist())
-        cat_sel = st.sidebar.multiselect(
+        categorias = indice["columnas"]["Categoria"]["opciones"]
+        selecciones["Categoria"] = st.sidebar.multiselect(
             "Categoría de Producto",
             options=categorias,
             default=categorias  # Mostramos TODO por defecto para no sesgar el Resumen Ejecutivo
         )
-        if cat_sel:
-            df_filtrado = df_filtrado[df_filtrado["Categoria"].isin(cat_sel)]
     
     # 2. Filtro por Ciudad Destino
-    if "Ciudad_Destino" in df_dss.columns:
-        ciudades = sorted(df_dss["Ciudad_Destino"].dropna().unique().tolist())
-        city_sel = st.sidebar.multiselect(
+    if "Ciudad_Destino" in indice["columnas"]:
+        ciudades = indice["columnas"]["Ciudad_Destino"]["opciones"]
+        selecciones["Ciudad_Destino"] = st.sidebar.multiselect(
             "Ciudad Destino",
             options=ciudades,
             default=ciudades 
         )
-        if city_sel:
-            df_filtrado = df_filtrado[df_filtrado["Ciudad_Destino"].isin(city_sel)]
 
     # 3. Filtro por Estado de Envío
-    if "Estado_Envio" in df_dss.columns:
-        estados = sorted(df_dss["Estado_Envio"].dropna().unique().tolist())
-        estado_sel = st.sidebar.multiselect(
+    if "Estado_Envio" in indice["columnas"]:
+        estados = indice["columnas"]["Estado_Envio"]["opciones"]
+        selecciones["Estado_Envio"] = st.sidebar.multiselect(
             "Estado de Envío",
             options=estados,
             default=estados
         )
-        if estado_sel:
-            df_filtrado = df_filtrado[df_filtrado["Estado_Envio"].isin(estado_sel)]
     
     # 4. Filtro por Rango de Fechas
-    if "Fecha_Venta" in df_dss.columns:
+    if "fechas_ordenadas" in indice and len(indice["fechas_ordenadas"]) > 0:
         st.sidebar.subheader("📅 Período de Análisis")
-        # Aseguramos que las fechas estén en formato datetime
-        df_dss["Fecha_Venta"] = pd.to_datetime(df_dss["Fecha_Venta"])
-        fecha_min = df_dss["Fecha_Venta"].min().date()
-        fecha_max = df_dss["Fecha_Venta"].max().date()
+        fecha_min = pd.Timestamp(indice["fechas_ordenadas"][0]).date()
+        fecha_max = pd.Timestamp(indice["fechas_ordenadas"][-1]).date()
         
         rango_fechas = st.sidebar.date_input(
             "Seleccione el rango",
@@ -63,19 +133,30 @@ def crear_sidebar_filtros(df_dss):
         
         # Validación para evitar errores si el usuario solo selecciona una fecha
         if isinstance(rango_fechas, tuple) and len(rango_fechas) == 2:
-            df_filtrado = df_filtrado[
-                (df_filtrado["Fecha_Venta"].dt.date >= rango_fechas[0]) &
-                (df_filtrado["Fecha_Venta"].dt.date <= rango_fechas[1])
-            ]
+            rango_seleccionado = rango_fechas
     
     # 5. Segmentación por Rentabilidad
     st.sidebar.markdown("---")
     st.sidebar.subheader("💸 Filtros de Margen")
     solo_negativos = st.sidebar.checkbox("Mostrar solo Margen Negativo")
-    if solo_negativos:
-        df_filtrado = df_filtrado[df_filtrado["margen_real"] < 0]
+
+    # Una sola máscara combinada y una única copia de las filas seleccionadas.
+    # Las filas de cada estado de filtros quedan en la caché LRU (clave canónica + versión del dataset)
+    def _filas():
+        filas = np.flatnonzero(mascara_filtros(indice, selecciones, rango_seleccionado, solo_negativos))
+        return filas.astype(np.int32) if indice["n"] < np.iinfo(np.int32).max else filas
+
+    version_datos = indice.get("version_datos")
+    if version_datos is None:
+        st.session_state[CLAVE_SESION] = None
+        filas = _filas()
+    else:
+        clave = (version_datos, clave_filtros(selecciones, rango_seleccionado, solo_negativos))
+        st.session_state[CLAVE_SESION] = clave
+        filas = obtener_cache_filtros().obtener_o_calcular(("filas",) + clave, _filas)
+    df_filtrado = df_dss.take(filas)
 
     st.sidebar.markdown("---")
     st.sidebar.caption(f"Visualizando {len(df_filtrado):,} de {len(df_dss):,} registros")
     
-    return df_filtrado
\ No newline at end of file
+    return df_filtrado
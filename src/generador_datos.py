@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+Generador de datos sucios con el esquema de los CSV v2 a cualquier escala.
+
+Reproduce los defectos que atienden los limpiadores (lead times "25-30 días",
+categorías "smart-phone"/"???", stock negativo, NPS en escalas mezcladas,
+tickets "Sí"/"1.0", tiempos de entrega 999, ciudades "BOG"/"Ventas_Web",
+SKUs huérfanos y feedback duplicado) y escribe por bloques: la memoria usada
+no depende del tamaño del archivo.
+
+Uso:
+    python -m src.generador_datos --transacciones 5000000 --salida data_sintetica
+    python -m src.generador_datos --transacciones 100000 --tasa tasa_tiempo_999=0.05
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Constantes y configuraciones
+# -----------------------------
+
+TAMANO_BLOQUE = 250_000
+
+ARCHIVO_INVENTARIO = "inventario_central_v2.csv"
+ARCHIVO_FEEDBACK = "feedback_clientes_v2.csv"
+ARCHIVO_TRANSACCIONES = "transacciones_logistica_v2.csv"
+
+# Proporciones medidas sobre los archivos de data/ (10.000 transacciones)
+PARAMETROS_POR_DEFECTO = {
+    "inventario_por_transaccion": 0.25,
+    "feedback_por_transaccion": 0.40,
+    "huerfanos_por_transaccion": 0.05,      # SKUs distintos fuera del catálogo
+    "tasa_skus_huerfanos": 0.175,           # transacciones que apuntan a un SKU huérfano
+    "tasa_ids_feedback_repetidos": 0.125,   # filas extra que reutilizan un Feedback_ID
+    "tasa_feedback_duplicado": 0.01,        # filas idénticas a la anterior
+    "tasa_stock_vacio": 0.04,
+    "tasa_stock_negativo": 0.024,
+    "tasa_costo_atipico": 0.004,
+    "tasa_cantidad_negativa": 0.01,
+    "tasa_costo_envio_vacio": 0.083,
+    "tasa_tiempo_999": 0.005,
+    "tasa_rating_99": 0.0067,
+    "tasa_edad_atipica": 0.005,
+    "tasa_nps_escala_10": 0.05
+}
+
+VOCABULARIOS = {
+    "Categoria": ["Laptops", "Monitores", "Smartphones", "Tablets", "Accesorios", "smart-phone", "???", "LAPTOP"],
+    "Lead_Time_Dias": ["25-30 días", "Inmediato", "10", "nan", "5", "3"],
+    "Bodega_Origen": ["norte", "Sur", "BOD-EXT-99", "ZONA_FRANCA", "Norte", "Occidente"],
+    "Estado_Envio": ["Retrasado", "Entregado", "", "Devuelto", "En Camino", "Perdido"],
+    "Ciudad_Destino": ["Ventas_Web", "BOG", "Bogotá", "Cali", "Bucaramanga", "Medellín", "MED", "Barranquilla"],
+    "Canal_Venta": ["Físico", "Online", "WhatsApp", "App"],
+    "Comentario_Texto": ["Excelente", "Lento", "N/A", "Dañado", "---", "No volvería", "Precio justo"],
+    "Recomienda_Marca": ["SI", "NO", "N/A", "Maybe"],
+    "Ticket_Soporte_Abierto": ["Sí", "1", "0", "No", "1.0", "0.0"]
+}
+
+# "1.0"/"0.0" aparecen cuando una exportación leyó la columna como float
+PESOS = {"Ticket_Soporte_Abierto": [0.25, 0.24, 0.24, 0.23, 0.02, 0.02]}
+
+FECHAS_REVISION = ("2024-03-04", "2026-01-31")
+FECHAS_VENTA = ("2024-09-23", "2026-02-04")
+
+# -----------------------------
+# Utilidades
+# -----------------------------
+
+def _elegir(rng, columna, n):
+    valores = np.array(VOCABULARIOS[columna], dtype=object)
+    pesos = PESOS.get(columna)
+    return valores[rng.choice(len(valores), size=n, p=pesos)]
+
+
+def _ids(prefijo, desde, n):
+    return np.char.add(prefijo, np.arange(desde, desde + n).astype(str)).astype(object)
+
+
+def _fechas(rng, rango, formato, n):
+    # Se formatea una vez cada día del rango y se indexa: evita strftime fila a fila
+    dias = pd.date_range(*rango, freq="D").strftime(formato).to_numpy(dtype=object)
+    return dias[rng.integers(0, len(dias), n)]
+
+
+def _con_tasa(rng, n, tasa):
+    return rng.random(n) < tasa
+
+
+# -----------------------------
+# Bloques por archivo
+# -----------------------------
+
+def bloque_inventario(rng, inicio, n, p):
+    stock = rng.integers(0, 2000, n).astype(float)
+    negativo = _con_tasa(rng, n, p["tasa_stock_negativo"])
+    stock[negativo] = -rng.integers(1, 51, negativo.sum())
+    stock[_con_tasa(rng, n, p["tasa_stock_vacio"])] = np.nan
+
+    costo = np.round(rng.uniform(50, 1500, n), 2)
+    atipico = _con_tasa(rng, n, p["tasa_costo_atipico"])
+    costo[atipico] = rng.choice([0.05, 850000.0], size=atipico.sum())
+
+    return pd.DataFrame({
+        "SKU_ID": _ids("PROD-", 1000 + inicio, n),
+        "Categoria": _elegir(rng, "Categoria", n),
+        "Stock_Actual": stock,
+        "Costo_Unitario_USD": costo,
+        "Punto_Reorden": rng.integers(100, 300, n),
+        "Lead_Time_Dias": _elegir(rng, "Lead_Time_Dias", n),
+        "Bodega_Origen": _elegir(rng, "Bodega_Origen", n),
+        "Ultima_Revision": _fechas(rng, FECHAS_REVISION, "%Y-%m-%d", n)
+    })
+
+
+def bloque_transacciones(rng, inicio, n, n_inventario, n_huerfanos, p):
+    huerfano = _con_tasa(rng, n, p["tasa_skus_huerfanos"])
+    sku = np.where(
+        huerfano,
+        1000 + n_inventario + rng.integers(0, n_huerfanos, n),
+        1000 + rng.integers(0, n_inventario, n)
+    )
+
+    cantidad = rng.integers(1, 15, n)
+    cantidad[_con_tasa(rng, n, p["tasa_cantidad_negativa"])] = -5
+
+    costo_envio = np.round(rng.uniform(5, 100, n), 2)
+    costo_envio[_con_tasa(rng, n, p["tasa_costo_envio_vacio"])] = np.nan
+
+    tiempo = rng.integers(1, 30, n)
+    tiempo[_con_tasa(rng, n, p["tasa_tiempo_999"])] = 999
+
+    return pd.DataFrame({
+        "Transaccion_ID": _ids("TRX-", 10000 + inicio, n),
+        "SKU_ID": np.char.add("PROD-", sku.astype(str)).astype(object),
+        "Fecha_Venta": _fechas(rng, FECHAS_VENTA, "%d/%m/%Y", n),
+        "Cantidad_Vendida": cantidad,
+        "Precio_Venta_Final": np.round(rng.uniform(10, 2000, n), 2),
+        "Costo_Envio": costo_envio,
+        "Tiempo_Entrega_Real": tiempo,
+        "Estado_Envio": _elegir(rng, "Estado_Envio", n),
+        "Ciudad_Destino": _elegir(rng, "Ciudad_Destino", n),
+        "Canal_Venta": _elegir(rng, "Canal_Venta", n)
+    })
+
+
+def bloque_feedback(rng, inicio, n, n_transacciones, p):
+    rating = rng.integers(1, 6, n)
+    rating[_con_tasa(rng, n, p["tasa_rating_99"])] = 99
+
+    edad = rng.integers(18, 86, n)
+    edad[_con_tasa(rng, n, p["tasa_edad_atipica"])] = 195
+
+    # NPS en escala -100..100 y una fracción reportada en escala 0..10
+    nps = np.round(rng.uniform(-100, 100, n), 1)
+    escala_10 = _con_tasa(rng, n, p["tasa_nps_escala_10"])
+    nps[escala_10] = np.round(rng.uniform(0, 10, escala_10.sum()), 1)
+
+    df = pd.DataFrame({
+        "Feedback_ID": _ids("FB-", 8000 + inicio, n),
+        "Transaccion_ID": np.char.add("TRX-", (10000 + rng.integers(0, n_transacciones, n)).astype(str)).astype(object),
+        "Rating_Producto": rating,
+        "Rating_Logistica": rng.integers(1, 6, n),
+        "Comentario_Texto": _elegir(rng, "Comentario_Texto", n),
+        "Recomienda_Marca": _elegir(rng, "Recomienda_Marca", n),
+        "Ticket_Soporte_Abierto": _elegir(rng, "Ticket_Soporte_Abierto", n),
+        "Edad_Cliente": edad,
+        "Satisfaccion_NPS": nps
+    })
+
+    # Filas idénticas a la anterior (doble envío del formulario)
+    duplicar = np.flatnonzero(_con_tasa(rng, n, p["tasa_feedback_duplicado"]))
+    duplicar = duplicar[duplicar > 0]
+    df.iloc[duplicar] = df.iloc[duplicar - 1].to_numpy()
+
+    # Filas extra que reutilizan un Feedback_ID ya emitido con contenido distinto
+    n_repetidos = int(round(n * p["tasa_ids_feedback_repetidos"]))
+    if n_repetidos:
+        extra = df.iloc[rng.integers(0, n, n_repetidos)].reset_index(drop=True)
+        extra["Feedback_ID"] = np.char.add("FB-", (8000 + rng.integers(0, inicio + n, n_repetidos)).astype(str)).astype(object)
+        extra["Satisfaccion_NPS"] = np.round(rng.uniform(-100, 100, n_repetidos), 1)
+        df = pd.concat([df, extra], ignore_index=True)
+
+    return df
+
+
+# -----------------------------
+# Funciones principales
+# -----------------------------
+
+def _escribir(ruta, n_filas, tamano_bloque, generar):
+    filas = 0
+    with open(ruta, "w", encoding="utf-8", newline="") as f:
+        for inicio in range(0, n_filas, tamano_bloque):
+            bloque = generar(inicio, min(tamano_bloque, n_filas - inicio))
+            bloque.to_csv(f, index=False, header=(inicio == 0))
+            filas += len(bloque)
+    return filas
+
+
+def generar_datos(directorio, n_transacciones, semilla=42, parametros=None, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Escribe los tres CSV en `directorio` para `n_transacciones` ventas.
+    Inventario y feedback escalan con las proporciones de PARAMETROS_POR_DEFECTO
+    (sobrescribibles con `parametros`). Retorna {archivo: {ruta, filas, bytes}}.
+    """
+    p = dict(PARAMETROS_POR_DEFECTO, **(parametros or {}))
+    rng = np.random.default_rng(semilla)
+    os.makedirs(directorio, exist_ok=True)
+
+    n_inventario = max(1, round(n_transacciones * p["inventario_por_transaccion"]))
+    n_huerfanos = max(1, round(n_transacciones * p["huerfanos_por_transaccion"]))
+    n_feedback = max(1, round(n_transacciones * p["feedback_por_transaccion"]))
+
+    tareas = {
+        "inventario": (ARCHIVO_INVENTARIO, n_inventario,
+                       lambda inicio, n: bloque_inventario(rng, inicio, n, p)),
+        "transacciones": (ARCHIVO_TRANSACCIONES, n_transacciones,
+                          lambda inicio, n: bloque_transacciones(rng, inicio, n, n_inventario, n_huerfanos, p)),
+        "feedback": (ARCHIVO_FEEDBACK, n_feedback,
+                     lambda inicio, n: bloque_feedback(rng, inicio, n, n_transacciones, p))
+    }
+
+    resultado = {}
+    for nombre, (archivo, n_filas, generar) in tareas.items():
+        ruta = os.path.join(directorio, archivo)
+        filas = _escribir(ruta, n_filas, tamano_bloque, generar)
+        resultado[nombre] = {"ruta": ruta, "filas": filas, "bytes": os.path.getsize(ruta)}
+    return resultado
+
+
+def _parsear_tasas(pares):
+    parametros = {}
+    for par in pares or []:
+        clave, _, valor = par.partition("=")
+        if clave not in PARAMETROS_POR_DEFECTO:
+            raise SystemExit(f"Parámetro desconocido: {clave}. Opciones: {', '.join(PARAMETROS_POR_DEFECTO)}")
+        parametros[clave] = float(valor)
+    return parametros
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera CSV sucios con el esquema v2 de TechLogistics")
+    parser.add_argument("--transacciones", type=int, required=True, help="Número de transacciones a generar")
+    parser.add_argument("--salida", default="data_sintetica", help="Directorio de salida")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--bloque", type=int, default=TAMANO_BLOQUE, help="Filas por bloque escrito")
+    parser.add_argument("--tasa", action="append", metavar="CLAVE=VALOR",
+                        help="Sobrescribe una proporción de PARAMETROS_POR_DEFECTO (repetible)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    resultado = generar_datos(args.salida, args.transacciones, args.semilla, _parsear_tasas(args.tasa), args.bloque)
+    segundos = time.perf_counter() - inicio
+
+    total_bytes = sum(r["bytes"] for r in resultado.values())
+    for nombre, r in resultado.items():
+        print(f"{nombre:<14} {r['filas']:>12,} filas {r['bytes'] / 1024 / 1024:>10.1f} MB  {r['ruta']}")
+    print(f"Total: {total_bytes / 1024 / 1024:,.1f} MB en {segundos:.1f} s ({total_bytes / 1024 / 1024 / segundos:,.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
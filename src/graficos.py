@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+import os
+
+import numpy as np
+import plotly.express as px
+import streamlit as st
+
+from src.cache_filtros import CacheLRU, clave_filtros_activa
+from src.perfilado import etapa, perfilado_activo
+
+# -----------------------------
+# Constantes y configuraciones
+# -----------------------------
+
+# Sobre este número de puntos la dispersión se dibuja con WebGL (Scattergl); es el
+# mismo corte del modo "auto" de plotly, fijado aquí para no depender de la versión
+UMBRAL_WEBGL = 1_000
+
+# Tope de puntos enviados al navegador por gráfico de dispersión
+MAX_PUNTOS_DISPERSION = 20_000
+
+# Puntos extremos que se conservan siempre al muestrear (peores pérdidas incluidas)
+PUNTOS_EXTREMOS = 1_000
+
+# Celdas por eje de la grilla usada para estratificar la muestra
+CELDAS_GRILLA = 60
+
+# Caché de figuras: acotada por entradas y por bytes del spec JSON
+MAX_FIGURAS = int(os.environ.get("TECHLOG_CACHE_FIGURAS_ENTRADAS", 128))
+MAX_BYTES_FIGURAS = int(os.environ.get("TECHLOG_CACHE_FIGURAS_MB", 64)) * 1024 * 1024
+
+# -----------------------------
+# Utilidades
+# -----------------------------
+
+def _celdas(valores, n_celdas):
+    """Celda de grilla lineal de cada valor (los nulos quedan en una celda propia)."""
+    valores = np.asarray(valores, dtype=np.float64)
+    finitos = np.isfinite(valores)
+    if not finitos.any():
+        return np.zeros(len(valores), dtype=np.int64)
+    minimo, maximo = valores[finitos].min(), valores[finitos].max()
+    ancho = (maximo - minimo) / n_celdas or 1.0
+    relativos = (np.where(finitos, valores, minimo) - minimo) / ancho
+    celdas = np.clip(relativos.astype(np.int64), 0, n_celdas - 1)
+    return np.where(finitos, celdas, n_celdas)
+
+
+def bytes_figura(fig):
+    """Tamaño del spec JSON que viaja al navegador por cada rerun."""
+    return len(fig.to_json().encode("utf-8"))
+
+
+@st.cache_resource
+def obtener_cache_figuras():
+    """Instancia única por proceso, compartida por todas las sesiones."""
+    return CacheLRU(MAX_FIGURAS, MAX_BYTES_FIGURAS)
+
+# -----------------------------
+# Funciones principales
+# -----------------------------
+
+def figura_memorizada(pagina, grafico, construir, *extra_clave):
+    """
+    Figura `grafico` de `pagina` para el estado de filtros y la versión de datos
+    activos; `construir` (agregación + plotly) solo corre si no está en caché.
+    Retorna (figura, bytes del spec). Fuera de la app se construye directamente.
+    La figura se comparte entre sesiones: no mutarla.
+    """
+    clave_activa = clave_filtros_activa()
+    if clave_activa is None:
+        return construir(), None
+
+    version_datos, estado = clave_activa
+    clave = ("figura", version_datos, estado, pagina, grafico) + extra_clave
+    cache = obtener_cache_figuras()
+    entrada = cache.obtener(clave)
+    if entrada is None:
+        fig = construir()
+        entrada = (fig, bytes_figura(fig))
+        cache.guardar(clave, entrada, tamano=entrada[1])
+    return entrada
+
+
+def mostrar_figura(fig, grafico, tamano=None):
+    """
+    st.plotly_chart de todas las páginas. Con el perfilado activo anota la etapa
+    `grafico:<id>` con los bytes del spec, para seguir el tráfico de cada rerun.
+    """
+    if not perfilado_activo():
+        st.plotly_chart(fig, use_container_width=True)
+        return
+    with etapa(f"grafico:{grafico}") as registro:
+        registro["bytes"] = bytes_figura(fig) if tamano is None else tamano
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def mostrar_grafico(pagina, grafico, construir, *extra_clave):
+    """
+    Muestra la figura memorizada de `pagina`/`grafico` (ver figura_memorizada).
+    `construir` solo puede depender de los filtros, la versión de datos y `extra_clave`.
+    """
+    fig, tamano = figura_memorizada(pagina, grafico, construir, *extra_clave)
+    mostrar_figura(fig, f"{pagina}.{grafico}", tamano)
+
+
+def mostrar_estadisticas_figuras():
+    """Contadores de la caché de figuras en el sidebar."""
+    stats = obtener_cache_figuras().estadisticas()
+    st.sidebar.caption(
+        f"🖼️ Caché de figuras: {stats['aciertos']:,} aciertos / {stats['fallos']:,} fallos "
+        f"({stats['tasa_aciertos']:.0f}%) · {stats['entradas']} entradas · "
+        f"{stats['bytes'] / 1024 / 1024:.1f} MB"
+    )
+
+
+def barras_conteo(conteo, columna, **kwargs):
+    """
+    Histograma de una variable categórica a partir de sus conteos ya agregados
+    (Series categoría -> conteo): el gráfico recibe una barra por categoría y no las filas.
+    """
+    df = conteo[conteo > 0].rename_axis(columna).reset_index(name="Registros")
+    return px.bar(df, x=columna, y="Registros", color=columna, **kwargs)
+
+
+def mapa_calor(df, x, y, z, etiqueta_z=None, **kwargs):
+    """
+    Mapa de calor de la suma de `z` por (x, y), pivotado en el servidor: viaja la matriz
+    y cada etiqueta una sola vez, no una terna (x, y, z) por fila como en density_heatmap.
+    """
+    matriz = df.pivot_table(index=y, columns=x, values=z, aggfunc="sum", observed=True, sort=False)
+    return px.imshow(matriz, aspect="auto", labels={"color": etiqueta_z or z}, **kwargs)
+
+
+def muestrear_dispersion(df, x, y, max_puntos=MAX_PUNTOS_DISPERSION, extremos=PUNTOS_EXTREMOS, semilla=0):
+    """
+    Reduce una dispersión a `max_puntos` conservando su forma:
+    - siempre quedan los `extremos` valores más bajos de `y` (peores pérdidas) y los
+      más altos de `y` y de `x` en cantidades menores;
+    - el resto se reparte por turnos entre las celdas de una grilla sobre (x, y), así las
+      zonas poco pobladas (outliers) entran completas antes que las zonas densas.
+    La muestra es determinista para una misma entrada.
+    """
+    if len(df) <= max_puntos:
+        return df
+
+    posiciones = np.arange(len(df))
+    valores_y = df[y].to_numpy(dtype=np.float64)
+    valores_x = df[x].to_numpy(dtype=np.float64)
+
+    # Extremos: argpartition evita ordenar todos los puntos
+    peores = min(extremos, max_puntos)
+    otros = min(extremos // 4, (max_puntos - peores) // 2)
+    elegidos = np.zeros(len(df), dtype=bool)
+    if peores > 0:
+        elegidos[np.argpartition(np.where(np.isnan(valores_y), np.inf, valores_y), peores - 1)[:peores]] = True
+    if otros > 0:
+        for valores in (valores_y, valores_x):
+            elegidos[np.argpartition(np.where(np.isnan(valores), np.inf, -valores), otros - 1)[:otros]] = True
+
+    # Resto por turnos entre celdas (orden aleatorio fijo dentro de cada celda)
+    cupo = max_puntos - int(elegidos.sum())
+    if cupo > 0:
+        restantes = posiciones[~elegidos]
+        restantes = restantes[np.random.default_rng(semilla).permutation(len(restantes))]
+        celda = (_celdas(valores_x[restantes], CELDAS_GRILLA) * (CELDAS_GRILLA + 1)
+                 + _celdas(valores_y[restantes], CELDAS_GRILLA))
+        por_celda = np.argsort(celda, kind="stable")
+        inicio_celda = np.r_[0, np.flatnonzero(np.diff(celda[por_celda])) + 1]
+        turno = np.empty(len(restantes), dtype=np.int64)
+        turno[por_celda] = np.arange(len(restantes)) - np.repeat(inicio_celda, np.diff(np.r_[inicio_celda, len(restantes)]))
+        elegidos[restantes[np.argsort(turno, kind="stable")[:cupo]]] = True
+
+    return df[elegidos]
+
+
+def dispersion_escalable(df, x, y, max_puntos=MAX_PUNTOS_DISPERSION, extremos=PUNTOS_EXTREMOS, **kwargs):
+    """
+    px.scatter que no crece con los datos: muestrea con muestrear_dispersion por encima
+    de `max_puntos` (quedan exactamente `max_puntos`) y cambia a WebGL por encima de UMBRAL_WEBGL.
+    """
+    muestra = muestrear_dispersion(df, x, y, max_puntos, extremos)
+    modo = "webgl" if len(muestra) > UMBRAL_WEBGL else "svg"
+    return px.scatter(muestra, x=x, y=y, render_mode=modo, **kwargs)
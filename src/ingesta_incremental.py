@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import io
+import os
+
+import pandas as pd
+
+from src.transacciones import inferir_formato_fecha
+
+# -----------------------------
+# Constantes y configuraciones
+# -----------------------------
+
+ARCHIVO_ESTADO = "estado_transacciones.json"
+
+# -----------------------------
+# Utilidades
+# -----------------------------
+
+def _hash_prefijo(ruta, offset=None, tamano_bloque=1 << 20):
+    """
+    Hasher BLAKE2b alimentado por bloques con los primeros `offset` bytes del archivo
+    (la porción ya ingerida), o con todo el archivo si `offset` es None.
+    Retorna (hasher, bytes leídos).
+    """
+    h = hashlib.blake2b(digest_size=16)
+    leidos = 0
+    with open(ruta, "rb") as f:
+        while offset is None or leidos < offset:
+            bloque = f.read(tamano_bloque if offset is None else min(tamano_bloque, offset - leidos))
+            if not bloque:
+                break
+            h.update(bloque)
+            leidos += len(bloque)
+    return h, leidos
+
+
+class LectorPrefijo(io.RawIOBase):
+    """
+    Archivo binario de solo lectura que termina en el byte `limite` aunque el archivo
+    siga creciendo: permite parsear exactamente la porción registrada por capturar_csv
+    sin copiarla a memoria.
+    """
+
+    def __init__(self, ruta, limite):
+        super().__init__()
+        self._archivo = open(ruta, "rb")
+        self._limite = limite
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._archivo.tell()
+
+    def seek(self, posicion, desde=io.SEEK_SET):
+        if desde == io.SEEK_END:
+            posicion, desde = self._limite + posicion, io.SEEK_SET
+        return self._archivo.seek(posicion, desde)
+
+    def readinto(self, destino):
+        restante = self._limite - self._archivo.tell()
+        if restante <= 0:
+            return 0
+        return self._archivo.readinto(memoryview(destino)[:restante])
+
+    def close(self):
+        self._archivo.close()
+        super().close()
+
+
+# -----------------------------
+# Funciones principales
+# -----------------------------
+
+def capturar_csv(ruta_csv):
+    """
+    Registra hasta qué byte se ingirió el CSV y la huella de ese prefijo, leyéndolo
+    por bloques sin guardar el contenido. El parseo posterior lee la ruta directamente
+    (ver prefijo_sin_cambios). Retorna el estado que alimenta a `leer_filas_nuevas`.
+    """
+    h, offset = _hash_prefijo(ruta_csv)
+    muestra = pd.read_csv(ruta_csv, nrows=1000)
+    col_fecha = next((c for c in muestra.columns if c.strip() == "Fecha_Venta"), None)
+    return {
+        "ruta": os.path.abspath(ruta_csv),
+        "offset": offset,
+        "huella_prefijo": h.hexdigest(),
+        "encabezado": list(muestra.columns),
+        # El formato de fecha del archivo completo se reutiliza en cada lote anexado
+        "formato_fecha": inferir_formato_fecha(muestra[col_fecha]) if col_fecha else None,
+        "lotes_anexados": 0
+    }
+
+
+def prefijo_sin_cambios(ruta_csv, estado):
+    """
+    True si el archivo sigue midiendo lo registrado por capturar_csv. Si creció mientras
+    se parseaba, hay que volver a parsear solo el prefijo con LectorPrefijo para no
+    ingerir dos veces las filas anexadas.
+    """
+    try:
+        return os.path.getsize(ruta_csv) == estado["offset"]
+    except OSError:
+        return False
+
+
+def leer_filas_nuevas(ruta_csv, estado):
+    """
+    Devuelve solo las filas escritas después del último offset ingerido.
+    Retorna (df_raw_nuevo, estado_nuevo), o None si el archivo no es una
+    extensión del ya ingerido (se reescribió o truncó) y hay que reprocesarlo completo.
+    Una última línea sin salto de línea se considera en escritura y se deja para la próxima vez.
+    """
+    if estado is None or estado.get("ruta") != os.path.abspath(ruta_csv):
+        return None
+
+    offset = estado.get("offset", 0)
+    try:
+        tamano = os.path.getsize(ruta_csv)
+    except OSError:
+        return None
+
+    if tamano < offset:
+        return None
+    h, _ = _hash_prefijo(ruta_csv, offset)
+    if h.hexdigest() != estado.get("huella_prefijo"):
+        return None
+
+    encabezado = estado["encabezado"]
+    if tamano == offset:
+        return pd.DataFrame(columns=encabezado), estado
+
+    with open(ruta_csv, "rb") as f:
+        f.seek(offset)
+        delta = f.read(tamano - offset)
+
+    fin_completo = delta.rfind(b"\n") + 1
+    delta = delta[:fin_completo]
+    if not delta.strip():
+        return pd.DataFrame(columns=encabezado), estado
+
+    df_nuevo = pd.read_csv(io.BytesIO(delta), header=None, names=encabezado)
+    h.update(delta)
+
+    estado_nuevo = dict(estado)
+    estado_nuevo.update({
+        "offset": offset + fin_completo,
+        "huella_prefijo": h.hexdigest(),
+        "lotes_anexados": estado.get("lotes_anexados", 0) + (0 if df_nuevo.empty else 1)
+    })
+    return df_nuevo, estado_nuevo
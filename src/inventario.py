@@ -2,6 +2,9 @@
 import pandas as pd
 import numpy as np
 import re
+from src.lectura_csv import leer_csv
+from src.perfilado import perfilar
+from src.salud import calcular_health_score
 
 # -----------------------------
 # Constantes y configuraciones
@@ -56,29 +59,23 @@ def select_max_lead_time(value):
         return pd.NA
 
 
-def calcular_health_score(df):
+def extraer_lead_time(serie: pd.Series) -> pd.Series:
     """
-    Calcula Health Score según fórmula: 100 × (1 - (0.7 × % Nulos + 0.3 × % Duplicados))
+    Aplica select_max_lead_time una sola vez por valor distinto y reparte el
+    resultado con los códigos de factorize. El catálogo repite unas pocas
+    decenas de strings ("25-30 días", "inmediato", ...) en miles de SKUs.
     """
-    if df.empty:
-        return 0, 0, 0
-        
-    total_celdas = df.shape[0] * df.shape[1]
-    total_nulos = df.isna().sum().sum()
-    porcentaje_nulos = total_nulos / total_celdas if total_celdas > 0 else 0
-    
-    duplicados = df.duplicated().sum()
-    porcentaje_duplicados = duplicados / len(df) if len(df) > 0 else 0
-    
-    health_score = 100 * (1 - (0.7 * porcentaje_nulos + 0.3 * porcentaje_duplicados))
-    
-    return round(health_score, 2), round(porcentaje_nulos * 100, 2), round(porcentaje_duplicados * 100, 2)
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+    valores = np.empty(len(unicos), dtype=object)
+    valores[:] = [select_max_lead_time(v) for v in unicos]
+    return pd.Series(valores[codigos], index=serie.index, name=serie.name)
 
 
 # -----------------------------
 # Función principal
 # -----------------------------
 
+@perfilar
 def procesar_inventario(inventario_path: str) -> tuple:
     """
     Procesamiento completo del dataset de inventario con auditoría de costos y bodegas.
@@ -86,7 +83,7 @@ def procesar_inventario(inventario_path: str) -> tuple:
     
     # 1. Carga y auditoría inicial
     try:
-        inventario_raw = pd.read_csv(inventario_path)
+        inventario_raw = leer_csv(inventario_path)
     except Exception as e:
         return pd.DataFrame(), {"error": str(e)}
 
@@ -120,7 +117,7 @@ def procesar_inventario(inventario_path: str) -> tuple:
     df_inventario["Categoria"] = df_inventario["Categoria"].replace(CATEGORIAS_NORMALIZADAS)
     
     # Procesamiento de Lead Time
-    df_inventario["Lead_Time_Dias"] = df_inventario["Lead_Time_Dias"].map(select_max_lead_time)
+    df_inventario["Lead_Time_Dias"] = extraer_lead_time(df_inventario["Lead_Time_Dias"])
     
     # Conversión de fecha robusta
     df_inventario["Ultima_Revision"] = pd.to_datetime(df_inventario["Ultima_Revision"], errors="coerce")
@@ -150,6 +147,8 @@ def procesar_inventario(inventario_path: str) -> tuple:
     # 5. Imputación de Lead Time (Mediana por categoría)
     df_inventario["Lead_Time_Dias"] = df_inventario.groupby("Categoria")["Lead_Time_Dias"].transform(lambda x: x.fillna(x.median()))
     df_inventario["Lead_Time_Dias"] = df_inventario["Lead_Time_Dias"].fillna(df_inventario["Lead_Time_Dias"].median())
+    # Tipo numérico explícito (el map deja object con int/float mezclados) para persistir en formato columnar
+    df_inventario["Lead_Time_Dias"] = pd.to_numeric(df_inventario["Lead_Time_Dias"], errors="coerce")
     
     # 6. Métricas de Calidad y Negocio Finales
     health_despues, pct_nulos_despues, pct_dups_despues = calcular_health_score(df_inventario)
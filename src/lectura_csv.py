@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+    pa_csv = None
+
+# -----------------------------
+# Constantes y configuraciones
+# -----------------------------
+
+# Los mismos marcadores de nulo que pd.read_csv reconoce por defecto
+NULOS_PANDAS = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"
+]
+
+# -----------------------------
+# Utilidades
+# -----------------------------
+
+def _como_texto(tabla, columnas):
+    """Vuelve a texto las columnas que pyarrow interpretó como fecha (el motor C las deja como str)."""
+    for nombre in columnas:
+        i = tabla.schema.get_field_index(nombre)
+        tabla = tabla.set_column(i, nombre, tabla.column(i).cast(pa.string()))
+    return tabla
+
+
+def _releer_como_texto(fuente, posicion, columnas):
+    if posicion is not None:
+        fuente.seek(posicion)
+    return pa_csv.read_csv(fuente, convert_options=pa_csv.ConvertOptions(
+        null_values=NULOS_PANDAS, strings_can_be_null=True,
+        column_types={c: pa.string() for c in columnas}
+    ))
+
+# -----------------------------
+# Función principal
+# -----------------------------
+
+def leer_csv(fuente):
+    """
+    pd.read_csv con el parser multihilo de pyarrow, que libera el GIL y permite
+    leer los tres CSV en paralelo. El resultado es el mismo DataFrame que el motor C:
+    - fechas ISO (date32) vuelven a texto: el cast reproduce el valor original
+    - timestamps se releen como texto (su formato original no es recuperable)
+    - nulos de texto como NaN en lugar de None
+    Si pyarrow no está o no puede con el archivo, se usa pd.read_csv.
+    `fuente` es preferentemente una ruta: pyarrow abre y lee el archivo por su cuenta,
+    sin pasar los bytes por Python. También acepta un archivo binario abierto.
+    """
+    if isinstance(fuente, os.PathLike):
+        fuente = os.fspath(fuente)
+    if pa_csv is None:
+        return pd.read_csv(fuente)
+
+    posicion = fuente.tell() if hasattr(fuente, "tell") else None
+    try:
+        tabla = pa_csv.read_csv(fuente, convert_options=pa_csv.ConvertOptions(
+            null_values=NULOS_PANDAS, strings_can_be_null=True
+        ))
+        fechas = [f.name for f in tabla.schema if pa.types.is_date(f.type)]
+        tiempos = [f.name for f in tabla.schema if pa.types.is_timestamp(f.type) or pa.types.is_time(f.type)]
+        if tiempos:
+            tabla = _releer_como_texto(fuente, posicion, tiempos)
+        tabla = _como_texto(tabla, fechas)
+        if len(set(tabla.column_names)) != tabla.num_columns:
+            raise ValueError("encabezados duplicados")  # el motor C los renombra (col.1)
+    except (pa.ArrowInvalid, ValueError):
+        if posicion is not None:
+            fuente.seek(posicion)
+        return pd.read_csv(fuente)
+
+    df = tabla.to_pandas()
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].fillna(np.nan)
+    return df
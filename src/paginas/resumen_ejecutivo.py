@@ -3,34 +3,36 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from src.reportes import generar_reporte_ejecutivo_pdf
+from src.exportacion import boton_exportacion
+from src.analitica import obtener_resumen
+from src.perfilado import perfilar
+from src.graficos import mostrar_grafico
 
-def mostrar_resumen_ejecutivo(df_filtrado, health_scores, metricas_calidad):
+@perfilar
+def mostrar_resumen_ejecutivo(df_filtrado, health_scores, metricas_calidad, cubo=None):
 
     st.header("📈 Resumen Ejecutivo")
     st.markdown("---")
-    
+
+    resumen = obtener_resumen(df_filtrado, cubo)
     # -----------------------------
     # 1. KPIs principales en 4 columnas
     # -----------------------------
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        ingresos_totales = df_filtrado["ingreso_total"].sum()
+        ingresos_totales = resumen.ingresos_totales
         st.metric("💰 Ingresos Totales", f"${ingresos_totales:,.0f}")
     
     with col2:
-        margen_total = df_filtrado["margen_real"].sum()
-        margen_pct = (margen_total / ingresos_totales * 100) if ingresos_totales != 0 else 0
-        st.metric("📊 Margen Neto", f"${margen_total:,.0f}", f"{margen_pct:.1f}%")
+        st.metric("📊 Margen Neto", f"${resumen.margen_total:,.0f}", f"{resumen.margen_pct:.1f}%")
     
     with col3:
-        ventas_sin_inventario = df_filtrado["venta_sin_inventario"].sum()
-        pct_riesgo = (ventas_sin_inventario / len(df_filtrado) * 100) if len(df_filtrado) > 0 else 0
-        st.metric("👻 Ventas Sin Inventario", f"{ventas_sin_inventario:,}", f"{pct_riesgo:.1f}% Riesgo", delta_color="inverse")
+        ventas_sin_inventario = resumen.ventas_sin_inventario
+        st.metric("👻 Ventas Sin Inventario", f"{ventas_sin_inventario:,}", f"{resumen.pct_sin_inventario:.1f}% Riesgo", delta_color="inverse")
     
     with col4:
-        margen_negativo = (df_filtrado["margen_real"] < 0).sum()
-        st.metric("🔴 Transacciones con Pérdida", f"{margen_negativo:,}")
+        st.metric("🔴 Transacciones con Pérdida", f"{resumen.margen_negativo:,}")
     
     st.markdown("---")
     
@@ -60,13 +62,12 @@ def mostrar_resumen_ejecutivo(df_filtrado, health_scores, metricas_calidad):
         }), hide_index=True)
     
     with col_b:
-        df_hs_melted = df_hs.melt(id_vars=["Dataset"], value_vars=["Antes", "Despues"], var_name="Estado", value_name="Score")
-        fig_hs = px.bar(
-            df_hs_melted, x="Dataset", y="Score", color="Estado",
+        mostrar_grafico("resumen_ejecutivo", "health_score", lambda: px.bar(
+            df_hs.melt(id_vars=["Dataset"], value_vars=["Antes", "Despues"], var_name="Estado", value_name="Score"),
+            x="Dataset", y="Score", color="Estado",
             barmode="group", height=300,
             color_discrete_map={"Antes": "#EF553B", "Despues": "#00CC96"}
-        )
-        st.plotly_chart(fig_hs, use_container_width=True)
+        ))
 
     st.markdown("---")
     
@@ -75,30 +76,17 @@ def mostrar_resumen_ejecutivo(df_filtrado, health_scores, metricas_calidad):
     # -----------------------------
     st.subheader("🏆 Top Categorías por Ingresos")
     
-    # Agrupación y cálculo
-    top_categorias = df_filtrado.groupby("Categoria").agg({
-        "ingreso_total": "sum",
-        "margen_real": "sum",
-        "Transaccion_ID": "count"
-    }).rename(columns={
-        "ingreso_total": "Ingresos",
-        "margen_real": "Margen",
-        "Transaccion_ID": "Transacciones"
-    })
-    
-    top_categorias["Margen %"] = (top_categorias["Margen"] / top_categorias["Ingresos"] * 100).round(1)
-    top_df = top_categorias.nlargest(5, "Ingresos").reset_index()
+    top_df = resumen.top_df
     
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        fig_cat = px.bar(
+        mostrar_grafico("resumen_ejecutivo", "categorias", lambda: px.bar(
             top_df, x="Categoria", y="Ingresos", color="Margen %",
             color_continuous_scale="RdYlGn",
             title="Distribución de Ingresos y Rentabilidad",
             hover_data=["Transacciones", "Margen"]
-        )
-        st.plotly_chart(fig_cat, use_container_width=True)
+        ))
         
         # NOTA DE CONSULTORÍA SOBRE EL MARGEN
         if "No Catalogado" in top_df["Categoria"].values:
@@ -123,8 +111,9 @@ def mostrar_resumen_ejecutivo(df_filtrado, health_scores, metricas_calidad):
     col_c1, col_c2, col_c3 = st.columns(3)
     
     with col_c1:
-        csv = df_filtrado.to_csv(index=False).encode('utf-8')
-        st.download_button("📥 Datos Filtrados (CSV)", data=csv, file_name="datos_filtrados.csv", mime="text/csv")
+        # Mismo archivo en caché que la exportación del sidebar (misma clave de filtros)
+        st.markdown("**📥 Datos Filtrados**")
+        boton_exportacion(df_filtrado, nombre_archivo="datos_filtrados", clave_widget="exportar_resumen")
     
     with col_c2:
         metricas_df = pd.DataFrame(metricas_calidad).T
@@ -134,7 +123,7 @@ def mostrar_resumen_ejecutivo(df_filtrado, health_scores, metricas_calidad):
     with col_c3:
         if st.button("📄 Generar Reporte PDF"):
             with st.spinner("Compilando reporte ejecutivo..."):
-                pdf_buffer = generar_reporte_ejecutivo_pdf(df_filtrado, health_scores, metricas_calidad)
+                pdf_buffer = generar_reporte_ejecutivo_pdf(df_filtrado, health_scores, metricas_calidad, cubo)
                 st.download_button("⬇️ Descargar PDF", data=pdf_buffer, file_name="Reporte_Ejecutivo_TechLogistics.pdf", mime="application/pdf")
     
     st.markdown("---")
@@ -1,36 +1,41 @@
 ﻿# -*- coding: utf-8 -*-
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import numpy as np
-from datetime import datetime
+from src.analitica import fecha_referencia_hoy, obtener_riesgo_operativo
+from src.perfilado import perfilar
+from src.graficos import mostrar_grafico
 
-def mostrar_riesgo_operativo(df_filtrado):
+# Colores del semáforo por nivel (umbrales en src.analitica)
+COLORES_SEMAFORO = {
+    "Crítico": 'background-color: #ff4b4b; color: white',      # Rojo
+    "Advertencia": 'background-color: #ffa500; color: black',  # Naranja
+    "Controlado": 'background-color: #28a745; color: white'    # Verde
+}
+
+@perfilar
+def mostrar_riesgo_operativo(df_filtrado, cubo=None):
 
     st.header("⚠️ Riesgo Operativo: Bodegas 'A Ciegas'")
     
     # 1. Preparación de métricas de antigüedad
-    df_filtrado["Ultima_Revision"] = pd.to_datetime(df_filtrado["Ultima_Revision"])
-    # La fecha de referencia debe ser hoy o la máxima del dataset para medir el rezago actual
-    fecha_referencia = pd.to_datetime(datetime.now().date())
-    df_filtrado["dias_sin_revision"] = (fecha_referencia - df_filtrado["Ultima_Revision"]).dt.days
+    # La fecha de referencia es hoy: se mide el rezago actual
+    fecha_referencia = fecha_referencia_hoy()
+    riesgo = obtener_riesgo_operativo(df_filtrado, cubo, fecha_referencia)
     
     # 2. KPIs de Riesgo
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        promedio_dias = df_filtrado['dias_sin_revision'].mean()
+        promedio_dias = riesgo.promedio_dias
         st.metric("📅 Promedio Días Sin Revisión", f"{promedio_dias:.0f} días")
     
     with col2:
-        # Tasa de tickets: Promedio de la columna binaria (0 y 1)
-        tasa_soporte = df_filtrado["Ticket_Soporte"].mean() * 100
+        tasa_soporte = riesgo.tasa_soporte
         st.metric("🎫 Tasa de Tickets de Soporte", f"{tasa_soporte:.1f}%")
         
     with col3:
-        # IMPACTO DE LA CORRECCIÓN: Correlación con NPS completo (incluyendo 5.0)
-        df_corr = df_filtrado.dropna(subset=["dias_sin_revision", "NPS_Numerico"])
-        correlacion = df_corr["dias_sin_revision"].corr(df_corr["NPS_Numerico"])
+        correlacion = riesgo.correlacion
         st.metric("📈 Correlación Riesgo/NPS", f"{correlacion:.2f}", 
                   help="Mide si el aumento en días sin revisión baja el NPS. Incluye los NPS 5.0 para mayor precisión estadística.")
 
@@ -39,14 +44,10 @@ def mostrar_riesgo_operativo(df_filtrado):
     # 3. Visualización: El Mapa del Descuido
     st.subheader("🕵️ Relación: Antigüedad de Revisión vs. Incidencias")
     
-    df_bodega = df_filtrado.groupby("Bodega_Origen").agg({
-        "dias_sin_revision": "mean",
-        "Ticket_Soporte": lambda x: x.mean() * 100,
-        "ingreso_total": "sum",
-        "NPS_Numerico": "mean" # Añadimos NPS promedio por bodega para el hover
-    }).reset_index()
+    df_bodega = riesgo.df_bodega
 
-    fig_riesgo = px.scatter(
+    # Los días sin revisión dependen de la fecha de hoy: va en la clave de la figura
+    mostrar_grafico("riesgo_operativo", "riesgo_bodega", lambda: px.scatter(
         df_bodega,
         x="dias_sin_revision",
         y="Ticket_Soporte",
@@ -61,24 +62,18 @@ def mostrar_riesgo_operativo(df_filtrado):
             "NPS_Numerico": "NPS Promedio"
         },
         title="Impacto del Descuido Operativo por Bodega"
-    )
-    st.plotly_chart(fig_riesgo, use_container_width=True)
+    ), fecha_referencia.date().isoformat())
 
     # 4. Semáforo de Riesgo Operativo
     st.subheader("🚥 Semáforo de Auditoría por Bodega")
     
-    # Nota: applymap está siendo depurado en pandas nuevos, usamos map en el Styler
-    def color_semaforo(val):
-        if val > 60: return 'background-color: #ff4b4b; color: white' # Crítico (Rojo)
-        if val > 30: return 'background-color: #ffa500; color: black' # Advertencia (Naranja)
-        return 'background-color: #28a745; color: white' # Controlado (Verde)
+    # El nivel ya viene calculado: la página solo lo traduce a color
+    niveles = riesgo.tabla_semaforo["Nivel"]
+    tabla_final = riesgo.tabla_semaforo.drop(columns="Nivel")
 
-    resumen_auditoria = df_bodega.sort_values("dias_sin_revision", ascending=False)
-    # Seleccionamos columnas relevantes para la tabla
-    tabla_final = resumen_auditoria[["Bodega_Origen", "dias_sin_revision", "Ticket_Soporte", "ingreso_total"]]
-    tabla_final.columns = ["Bodega", "Días Sin Revisión", "% Tickets Soporte", "Ingresos Expuestos"]
-    
-    st.table(tabla_final.style.map(color_semaforo, subset=["Días Sin Revisión"]).format({
+    st.table(tabla_final.style.apply(
+        lambda _: niveles.map(COLORES_SEMAFORO), subset=["Días Sin Revisión"]
+    ).format({
         "% Tickets Soporte": "{:.1f}%",
         "Ingresos Expuestos": "${:,.2f}",
         "Días Sin Revisión": "{:.0f}"
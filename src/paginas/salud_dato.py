@@ -2,8 +2,14 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from src.cache_filtros import memorizar_agregado
+from src.cubo_olap import resolver_cubo
+from src.compactacion import resumen_compactacion
+from src.perfilado import perfilar
+from src.graficos import mostrar_grafico
 
-def mostrar_salud_datos(df, metricas_calidad):
+@perfilar
+def mostrar_salud_datos(df, metricas_calidad, cubo=None, reporte_memoria=None):
     st.header("🔍 Salud del Dato - Auditoría de Calidad")
     st.markdown("---")
     
@@ -27,14 +33,15 @@ def mostrar_salud_datos(df, metricas_calidad):
     with col2:
         st.metric("✅ Health Score Final", f"{avg_despues:.1f}%", delta=f"{avg_despues - avg_antes:.1f}%")
     with col3:
-        nulos = df.isna().sum().sum()
+        nulos = memorizar_agregado("salud_dato", "celdas_vacias", lambda: resolver_cubo(df, cubo)["nulos"].sum())
         st.metric("🕳️ Celdas Vacías", f"{nulos:,}")
 
     # 3. Gráfico Comparativo
-    fig = px.bar(df_hs, x="Módulo", y=["Antes", "Despues"], barmode="group",
-                 title="Mejora de Calidad por Módulo",
-                 color_discrete_map={"Antes": "#FF6B6B", "Despues": "#4ECDC4"})
-    st.plotly_chart(fig, use_container_width=True)
+    mostrar_grafico("salud_dato", "health_score", lambda: px.bar(
+        df_hs, x="Módulo", y=["Antes", "Despues"], barmode="group",
+        title="Mejora de Calidad por Módulo",
+        color_discrete_map={"Antes": "#FF6B6B", "Despues": "#4ECDC4"}
+    ))
 
     # 4. Detalle por Módulo (Tabs)
     t1, t2, t3 = st.tabs(["Feedback", "Inventario", "Transacciones"])
@@ -58,4 +65,25 @@ def mostrar_salud_datos(df, metricas_calidad):
         c1, c2 = st.columns(2)
         c1.metric("🚚 Tiempos 'Outliers'", m.get("tiempos_outliers", 0))
         c2.metric("❌ SKUs No Catalogados", m.get("skus_sin_inventario", 0))
-        st.info("Estrategia: Corrección de tiempos de entrega de 999 días.")
\ No newline at end of file
+        st.info("Estrategia: Corrección de tiempos de entrega de 999 días.")
+
+    # 5. Compactación del Dataset Maestro (memoria por columna)
+    if reporte_memoria:
+        st.markdown("---")
+        st.subheader("🗜️ Memoria del Dataset Maestro")
+        df_mem = resumen_compactacion(reporte_memoria)
+        antes_mb = df_mem["bytes_antes"].sum() / 1024 / 1024
+        despues_mb = df_mem["bytes_despues"].sum() / 1024 / 1024
+
+        c1, c2, c3 = st.columns(3)
+        c1.metric("📦 Antes de Compactar", f"{antes_mb:,.2f} MB")
+        c2.metric("🗜️ Después de Compactar", f"{despues_mb:,.2f} MB")
+        c3.metric("📉 Ahorro", f"{(1 - despues_mb / antes_mb) * 100 if antes_mb else 0:.1f}%")
+
+        st.dataframe(df_mem.set_index("columna").style.format({
+            "bytes_antes": "{:,.0f}",
+            "bytes_despues": "{:,.0f}",
+            "bytes_ahorrados": "{:,.0f}",
+            "ahorro_pct": "{:.1f}%"
+        }), use_container_width=True)
+        st.info("Estrategia: columnas de texto repetitivo como categóricas y enteros en el tipo más chico que los contiene.")
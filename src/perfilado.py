@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+try:
+    import psutil
+except ImportError:  # psutil es opcional: sin él se lee /proc (Linux) o no se mide memoria
+    psutil = None
+
+# -----------------------------
+# Constantes y configuraciones
+# -----------------------------
+
+# Activación: TECHLOG_PERFILADO=1 en el entorno o ?perfilado=1 en la URL de la app
+VARIABLE_ACTIVACION = "TECHLOG_PERFILADO"
+PARAMETRO_URL = "perfilado"
+# Si se define, cada rerun perfilado agrega una línea JSON a este archivo
+VARIABLE_TRAZA = "TECHLOG_PERFILADO_TRAZA"
+
+_VALORES_ACTIVOS = ("1", "true", "si", "sí")
+
+# Traza del rerun en curso. Streamlit ejecuta cada sesión en su propio hilo, así
+# que la traza es por hilo; None significa perfilado apagado.
+_estado = threading.local()
+
+# -----------------------------
+# Utilidades
+# -----------------------------
+
+def _memoria_proceso():
+    """Memoria residente del proceso en bytes, o None si no hay forma de medirla."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _filas(valor):
+    """Filas de un DataFrame (o del primero de una tupla de resultados)."""
+    if isinstance(valor, tuple) and valor:
+        valor = valor[0]
+    return len(valor) if isinstance(valor, (pd.DataFrame, pd.Series)) else None
+
+
+def _filas_entrada(args):
+    # Solo el primer argumento: en procesar_transacciones los demás son tablas de apoyo
+    return _filas(args[0]) if args and not isinstance(args[0], tuple) else None
+
+
+def perfilado_solicitado():
+    """True si el perfilado se pidió por variable de entorno o por parámetro de URL."""
+    if os.environ.get(VARIABLE_ACTIVACION, "").lower() in _VALORES_ACTIVOS:
+        return True
+    try:
+        return str(st.query_params.get(PARAMETRO_URL, "")).lower() in _VALORES_ACTIVOS
+    except Exception:
+        return False
+
+
+def perfilado_activo():
+    return getattr(_estado, "traza", None) is not None
+
+# -----------------------------
+# Registro de etapas
+# -----------------------------
+
+def iniciar_traza(activo=None):
+    """
+    Abre la traza del rerun en curso (o la apaga). Sin argumentos decide con
+    perfilado_solicitado(). Retorna si quedó activa.
+    """
+    if activo is None:
+        activo = perfilado_solicitado()
+    _estado.traza = [] if activo else None
+    _estado.profundidad = 0
+    return activo
+
+
+def obtener_traza():
+    return list(getattr(_estado, "traza", None) or [])
+
+
+@contextmanager
+def etapa(nombre, filas_entrada=None):
+    """
+    Mide un bloque: tiempo de pared, filas y delta de memoria residente.
+    Entrega un dict donde el bloque puede anotar `filas_salida`. Con el perfilado
+    apagado solo cuesta la consulta de la traza.
+    """
+    traza = getattr(_estado, "traza", None)
+    if traza is None:
+        yield {}
+        return
+
+    # Se registra al entrar para que las etapas anidadas queden debajo de su padre
+    registro = {"etapa": nombre, "nivel": _estado.profundidad, "filas_entrada": filas_entrada, "filas_salida": None}
+    traza.append(registro)
+    _estado.profundidad += 1
+    memoria_inicio = _memoria_proceso()
+    inicio = time.perf_counter()
+    try:
+        yield registro
+    except BaseException:
+        registro["error"] = True
+        raise
+    finally:
+        registro["segundos"] = time.perf_counter() - inicio
+        memoria_fin = _memoria_proceso()
+        registro["delta_mb"] = (
+            (memoria_fin - memoria_inicio) / 1024 / 1024 if memoria_inicio is not None and memoria_fin is not None else None
+        )
+        _estado.profundidad -= 1
+
+
+def perfilar(funcion=None, *, nombre=None):
+    """
+    Decorador de etapa: `@perfilar` o `@perfilar(nombre="...")`. Las filas de entrada
+    son las del primer argumento si es un DataFrame; las de salida, las del resultado.
+    """
+    def decorar(f):
+        etiqueta = nombre or f.__name__
+
+        @functools.wraps(f)
+        def envoltura(*args, **kwargs):
+            if getattr(_estado, "traza", None) is None:
+                return f(*args, **kwargs)
+            with etapa(etiqueta, _filas_entrada(args)) as registro:
+                resultado = f(*args, **kwargs)
+                registro["filas_salida"] = _filas(resultado)
+            return resultado
+
+        return envoltura
+
+    return decorar(funcion) if funcion is not None else decorar
+
+def en_hilo(funcion):
+    """
+    Prepara `funcion` para correr en un hilo trabajador (ThreadPoolExecutor): sus
+    etapas se anotan en la traza del hilo que la lanza, al nivel actual.
+    """
+    traza = getattr(_estado, "traza", None)
+    if traza is None:
+        return funcion
+    profundidad = _estado.profundidad
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        _estado.traza, _estado.profundidad = traza, profundidad
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            _estado.traza = None
+
+    return envoltura
+
+# -----------------------------
+# Salida: panel y traza JSON
+# -----------------------------
+
+def traza_json(traza=None):
+    return json.dumps({
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "etapas": obtener_traza() if traza is None else traza
+    }, ensure_ascii=False)
+
+
+def escribir_traza(ruta=None):
+    """Agrega la traza del rerun como una línea JSON (ruta o TECHLOG_PERFILADO_TRAZA)."""
+    ruta = ruta or os.environ.get(VARIABLE_TRAZA)
+    if not ruta or not perfilado_activo():
+        return None
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write(traza_json() + "\n")
+    return ruta
+
+
+def mostrar_panel_rendimiento():
+    """Panel "Performance" del sidebar; solo aparece con el perfilado activo."""
+    if not perfilado_activo():
+        return
+
+    traza = obtener_traza()
+    with st.sidebar.expander("🔬 Performance"):
+        if not traza:
+            st.caption("Sin etapas registradas en este rerun.")
+            return
+
+        tabla = pd.DataFrame([{
+            "Etapa": "· " * r["nivel"] + r["etapa"],
+            "ms": r.get("segundos", 0) * 1000,
+            "Filas entrada": r["filas_entrada"],
+            "Filas salida": r["filas_salida"],
+            "Δ MB": r.get("delta_mb"),
+            "KB gráfico": r["bytes"] / 1024 if r.get("bytes") is not None else None
+        } for r in traza]).astype({"Filas entrada": "Int64", "Filas salida": "Int64"})
+        st.dataframe(tabla, hide_index=True,
+                     column_config={"ms": st.column_config.NumberColumn(format="%.1f"),
+                                    "Δ MB": st.column_config.NumberColumn(format="%.1f"),
+                                    "KB gráfico": st.column_config.NumberColumn(format="%.1f")})
+
+        total = sum(r.get("segundos", 0) for r in traza if r["nivel"] == 0)
+        st.caption(f"Total etapas de primer nivel: {total * 1000:,.0f} ms")
+        st.download_button("💾 Traza JSON", data=traza_json(traza), file_name="traza_perfilado.json",
+                           mime="application/json", key="descarga_traza_perfilado")
@@ -1,34 +1,61 @@
 ﻿# -*- coding: utf-8 -*-
-import pandas as pd
 import numpy as np
 from io import BytesIO
 from datetime import datetime
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-import io
-
-def generar_reporte_ejecutivo_pdf(df_filtrado, health_scores, metricas_calidad, fig_riesgo=None):
+from reportlab.graphics.shapes import Drawing, String
+from reportlab.graphics.charts.barcharts import HorizontalBarChart
+from src.cache_filtros import memorizar_agregado
+from src.analitica import obtener_analisis
+from src.perfilado import perfilar
+
+def _grafico_riesgo(df_bodega):
+    """
+    Días sin revisión por bodega como gráfico vectorial de reportlab: no requiere
+    kaleido ni rasterizar la figura de Plotly.
+    """
+    datos = df_bodega.sort_values("dias_sin_revision").tail(10)
+    dibujo = Drawing(450, 40 + 18 * max(len(datos), 1))
+    if datos.empty:
+        return dibujo
+
+    grafico = HorizontalBarChart()
+    grafico.x, grafico.y = 90, 20
+    grafico.width, grafico.height = 330, 18 * len(datos)
+    grafico.data = [datos["dias_sin_revision"].fillna(0).round(0).tolist()]
+    grafico.categoryAxis.categoryNames = datos["Bodega_Origen"].astype(str).tolist()
+    grafico.categoryAxis.labels.fontSize = 8
+    grafico.valueAxis.valueMin = 0
+    grafico.valueAxis.labels.fontSize = 8
+    grafico.bars[0].fillColor = colors.HexColor('#922b21')
+    grafico.barLabelFormat = '%.0f'
+    grafico.barLabels.fontSize = 7
+    grafico.barLabels.boxAnchor = 'w'
+    grafico.barLabels.dx = 3
+    dibujo.add(grafico)
+    dibujo.add(String(225, dibujo.height - 12, "Días sin revisión por bodega", fontSize=9, textAnchor='middle'))
+    return dibujo
+
+@perfilar
+def generar_reporte_ejecutivo_pdf(df_filtrado, health_scores, metricas_calidad, cubo=None):
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter, leftMargin=40, rightMargin=40)
     styles = getSampleStyleSheet()
     story = []
 
-    # --- Pre-procesamiento Sincronizado con Dashboard ---
-    df = df_filtrado.copy()
-    df['Ultima_Revision'] = pd.to_datetime(df['Ultima_Revision'], errors='coerce')
-    hoy = pd.to_datetime(datetime.now().date())
-    df['Dias_Desde_Revision'] = (hoy - df['Ultima_Revision']).dt.days.fillna(0)
-    
-    # Normalización de texto
-    df["Ciudad_Destino_Norm"] = df["Ciudad_Destino"].astype(str).str.strip().str.upper()
-
-    # Filtro de Outliers (Sin excluir NPS 5.0)
-    df_analisis = df[
-        (df["Tiempo_Entrega"] < 100) & 
-        (df["Tiempo_Entrega"] > 0)
-    ].copy()
+    # --- Agregados compartidos con el Dashboard ---
+    # Los mismos resultados memorizados que dibujan las páginas: el PDF no recalcula
+    # lo que el dashboard ya tiene y nunca se aparta de lo que muestra
+    agregados = obtener_analisis(df_filtrado, cubo)
+    resumen = agregados["resumen"]
+    fuga = agregados["fuga"]
+    crisis = agregados["crisis"]
+    invisible = agregados["invisible"]
+    fidelidad = agregados["fidelidad"]
+    riesgo = agregados["riesgo"]
 
     # --- Estilos de Consultoría ---
     style_title = ParagraphStyle('Title', parent=styles['Title'], fontSize=22, textColor=colors.HexColor('#1f4e78'), spaceAfter=20)
@@ -64,10 +91,10 @@ def generar_reporte_ejecutivo_pdf(df_filtrado, health_scores, metricas_calidad,
 
     # 3. MÉTRICAS GENERALES
     story.append(Paragraph("2. Resumen de Indicadores Clave (KPIs)", style_h2))
-    total_ingresos = df["ingreso_total"].sum()
-    margen_promedio = (df["margen_real"].sum() / total_ingresos * 100) if total_ingresos != 0 else 0
-    nps_global = df_analisis["NPS_Numerico"].mean()
-    tasa_soporte_global = df["Ticket_Soporte"].mean() * 100
+    total_ingresos = resumen.ingresos_totales
+    margen_promedio = resumen.margen_pct
+    nps_global = fidelidad.nps_avg
+    tasa_soporte_global = riesgo.tasa_soporte
 
     data_kpis = [
         [Paragraph("Total Ingresos (USD)", style_kpi_header), Paragraph("Margen Operativo", style_kpi_header), Paragraph("NPS Global", style_kpi_header), Paragraph("Tasa Soporte", style_kpi_header)],
@@ -85,9 +112,12 @@ def generar_reporte_ejecutivo_pdf(df_filtrado, health_scores, metricas_calidad,
 
     # 4. CRISIS LOGÍSTICA
     story.append(Paragraph("3. Crisis Logística y Cuellos de Botella", style_h2))
+    corr_global = crisis.corr_global
     data_log_kpis = [
         [Paragraph("⏳ Tiempo Entrega Prom.", style_kpi_header), Paragraph("🔗 Correlación NPS/Tiempo", style_kpi_header), Paragraph("🚩 Brecha Máxima", style_kpi_header)],
-        [Paragraph("15.0 días", style_kpi_value), Paragraph("-0.01", style_kpi_value), Paragraph("29 días", style_kpi_value)]
+        [Paragraph(f"{crisis.tiempo_avg:.1f} días", style_kpi_value),
+         Paragraph(f"{corr_global:.2f}" if not np.isnan(corr_global) else "N/A", style_kpi_value),
+         Paragraph(f"{crisis.brecha_max:.0f} días", style_kpi_value)]
     ]
     t_log = Table(data_log_kpis, colWidths=[1.8*72]*3)
     t_log.setStyle(TableStyle([
@@ -98,27 +128,28 @@ def generar_reporte_ejecutivo_pdf(df_filtrado, health_scores, metricas_calidad,
     story.append(t_log)
     story.append(Spacer(1, 10))
 
-    filtro_canal = df_analisis["Ciudad_Destino_Norm"].str.contains("CANAL DIGITAL|DIGITAL", na=False)
-    registros_canal_digital = df_analisis[filtro_canal].shape[0] 
+    registros_canal_digital = crisis.registros_canal_digital
     story.append(Paragraph(f"<b>HALLAZGO DE TRAZABILIDAD:</b> Se identificaron <b>{registros_canal_digital} registros</b> con ciudad de destino <b>CANAL DIGITAL</b>. Al normalizar los datos, este volumen revela una carencia crítica de control geográfico sobre el gasto logístico.", style_body))
 
-    story.append(Paragraph("⚠️ <b>ACCIÓN INMEDIATA:</b> Se requiere el <b>cambio de operador logístico</b> para la ruta <b>Zona Franca - Barranquilla</b>.", style_alerta))
+    ruta_peor = crisis.ruta_peor
+    if ruta_peor is not None:
+        story.append(Paragraph(f"⚠️ <b>ACCIÓN INMEDIATA:</b> Se requiere el <b>cambio de operador logístico</b> para la ruta <b>{ruta_peor['Bodega_Origen']} - {ruta_peor['Ciudad_Destino']}</b>.", style_alerta))
     story.append(Spacer(1, 10))
 
     # 5. RIESGOS FINANCIEROS Y VENTA INVISIBLE
     story.append(Paragraph("4. Riesgos Financieros y Administrativos", style_h2))
-    ingreso_riesgo = 16899923.80
-    porcentaje_riesgo = 27.3
-    skus_no_catalogados = 754
-    transacciones_afectadas = 2286
+    ingreso_riesgo = invisible.ingreso_riesgo
+    porcentaje_riesgo = invisible.pct_ingreso_riesgo
+    skus_no_catalogados = invisible.skus_huerfanos
+    transacciones_afectadas = invisible.transacciones_afectadas
 
-    story.append(Paragraph(f"<b>Diagnóstico de Venta Invisible:</b> Impacto financiero de <b>USD ${ingreso_riesgo:,.2f}</b> ({porcentaje_riesgo}% del total) por SKUs no catalogados.", style_body))
+    story.append(Paragraph(f"<b>Diagnóstico de Venta Invisible:</b> Impacto financiero de <b>USD ${ingreso_riesgo:,.2f}</b> ({porcentaje_riesgo:.1f}% del total) por SKUs no catalogados.", style_body))
     
     data_inv = [
         ["Métrica de Riesgo", "Valor Detectado"],
         ["Ingreso en Riesgo (USD)", f"${ingreso_riesgo:,.2f}"],
         ["SKUs No Catalogados", str(skus_no_catalogados)],
-        ["Transacciones Afectadas", str(transacciones_afectadas)]
+        ["Transacciones Afectadas", f"{transacciones_afectadas:,}"]
     ]
     t_inv = Table(data_inv, colWidths=[2.5*72, 1.5*72])
     t_inv.setStyle(TableStyle([
@@ -129,21 +160,20 @@ def generar_reporte_ejecutivo_pdf(df_filtrado, health_scores, metricas_calidad,
     ]))
     story.append(t_inv)
     
-    df_perdida = df[df["margen_real"] < 0]
-    total_fuga = abs(df_perdida["margen_real"].sum())
+    total_fuga = abs(fuga.total_fuga)
     story.append(Paragraph(f"• <b>Fuga de Capital:</b> Pérdida directa de <b>USD ${total_fuga:,.2f}</b> en márgenes negativos.", style_body))
 
     # 6. DIAGNÓSTICO DE FIDELIDAD
     story.append(Paragraph("5. Diagnóstico de Fidelidad y Paradoja de Inventario", style_h2))
-    nps_avg_fid = 5.09
-    casos_paradoja = 1844
-    rating_prod = 2.99
+    nps_avg_fid = fidelidad.nps_avg
+    casos_paradoja = fidelidad.casos_paradoja
+    rating_prod = fidelidad.rating_prod
 
     story.append(Paragraph(f"Se ha detectado una <b>paradoja crítica</b> en la gestión de stock: existen <b>{casos_paradoja} instancias</b> de productos con alta disponibilidad (Stock > Q3) pero sentimiento negativo del cliente (NPS < 7).", style_body))
     
     data_fid = [
         [Paragraph("NPS Promedio", style_kpi_header), Paragraph("Rating Producto", style_kpi_header), Paragraph("Casos Paradoja", style_kpi_header)],
-        [Paragraph(f"{nps_avg_fid}/10", style_kpi_value), Paragraph(f"{rating_prod}/5", style_kpi_value), Paragraph(f"{casos_paradoja}", style_kpi_value)]
+        [Paragraph(f"{nps_avg_fid:.2f}/10", style_kpi_value), Paragraph(f"{rating_prod:.2f}/5", style_kpi_value), Paragraph(f"{casos_paradoja}", style_kpi_value)]
     ]
     t_fid = Table(data_fid, colWidths=[1.8*72]*3)
     t_fid.setStyle(TableStyle([
@@ -155,21 +185,21 @@ def generar_reporte_ejecutivo_pdf(df_filtrado, health_scores, metricas_calidad,
     story.append(Spacer(1, 10))
 
     story.append(Paragraph("<b>Explicación de la Paradoja:</b>", style_body))
-    story.append(Paragraph(f"• <b>Calidad Deficiente:</b> El Rating de producto de <b>{rating_prod}/5</b> indica que el estancamiento de inventario se debe primordialmente a una <b>baja percepción de calidad</b> del SKU. El mercado está rechazando activamente estos productos.", style_body))
+    story.append(Paragraph(f"• <b>Calidad Deficiente:</b> El Rating de producto de <b>{rating_prod:.2f}/5</b> indica que el estancamiento de inventario se debe primordialmente a una <b>baja percepción de calidad</b> del SKU. El mercado está rechazando activamente estos productos.", style_body))
     story.append(Paragraph("• <b>Hipótesis de Sobrecosto:</b> Para categorías con Rating aceptable pero NPS bajo, el cliente valora el producto pero percibe un desbalance entre costo y beneficio (sobreprecio), lo que frena la rotación.", style_body))
 
     # 7. RIESGO OPERATIVO: GESTIÓN A CIEGAS (SECCIÓN ACTUALIZADA)
     story.append(Paragraph("6. Riesgo Operativo: Bodegas 'A Ciegas'", style_h2))
     
-    promedio_dias_sin_revision = 349
-    tasa_tickets_soporte = 18.8
-    correlacion_nps_riesgo = 0.01
+    promedio_dias_sin_revision = riesgo.promedio_dias
+    tasa_tickets_soporte = riesgo.tasa_soporte
+    correlacion_nps_riesgo = riesgo.correlacion
 
-    story.append(Paragraph(f"El análisis de riesgo operativo revela que el sistema de almacenamiento opera con un rezago crítico de auditoría, con un promedio de <b>{promedio_dias_sin_revision} días sin revisión</b> física de stock. Este descuido administrativo tiene una incidencia directa en la <b>tasa de soporte del {tasa_tickets_soporte}%</b>.", style_body))
+    story.append(Paragraph(f"El análisis de riesgo operativo revela que el sistema de almacenamiento opera con un rezago crítico de auditoría, con un promedio de <b>{promedio_dias_sin_revision:.0f} días sin revisión</b> física de stock. Este descuido administrativo tiene una incidencia directa en la <b>tasa de soporte del {tasa_tickets_soporte:.1f}%</b>.", style_body))
 
     data_ops = [
         [Paragraph("Promedio Días Sin Revisión", style_kpi_header), Paragraph("Tasa Tickets Soporte", style_kpi_header), Paragraph("Correlación Riesgo/NPS", style_kpi_header)],
-        [Paragraph(f"{promedio_dias_sin_revision} días", style_kpi_value), Paragraph(f"{tasa_tickets_soporte}%", style_kpi_value), Paragraph(f"{correlacion_nps_riesgo}", style_kpi_value)]
+        [Paragraph(f"{promedio_dias_sin_revision:.0f} días", style_kpi_value), Paragraph(f"{tasa_tickets_soporte:.1f}%", style_kpi_value), Paragraph(f"{correlacion_nps_riesgo:.2f}", style_kpi_value)]
     ]
     t_ops = Table(data_ops, colWidths=[1.8*72]*3)
     t_ops.setStyle(TableStyle([
@@ -181,13 +211,10 @@ def generar_reporte_ejecutivo_pdf(df_filtrado, health_scores, metricas_calidad,
     story.append(Spacer(1, 10))
 
     story.append(Paragraph("<b>Top 5 Bodegas en Riesgo Crítico:</b>", style_body))
-    data_bodegas = [
-        ["Bodega", "Días Sin Revisión", "% Tickets Soporte", "Ingresos Expuestos"],
-        ["OCCIDENTE", "358", "20.0%", "$7,499,527.64"],
-        ["BOD-EXT-99", "355", "18.2%", "$8,753,852.21"],
-        ["ZONA_FRANCA", "352", "18.3%", "$8,517,312.66"],
-        ["Norte", "348", "19.1%", "$17,170,676.81"],
-        ["Sur", "335", "18.9%", "$9,223,412.62"]
+    top_bodegas = riesgo.tabla_semaforo.head(5)
+    data_bodegas = [["Bodega", "Días Sin Revisión", "% Tickets Soporte", "Ingresos Expuestos"]] + [
+        [str(bodega), f"{dias:.0f}", f"{tickets:.1f}%", f"${ingresos:,.2f}"]
+        for bodega, dias, tickets, ingresos in top_bodegas.iloc[:, :4].itertuples(index=False)
     ]
     t_bodegas = Table(data_bodegas, colWidths=[1.2*72, 1.2*72, 1.1*72, 1.5*72])
     t_bodegas.setStyle(TableStyle([
@@ -200,18 +227,13 @@ def generar_reporte_ejecutivo_pdf(df_filtrado, health_scores, metricas_calidad,
     ]))
     story.append(t_bodegas)
     
-    story.append(Paragraph(f"<b>Diagnóstico de Gestión:</b> Las bodegas como <b>OCCIDENTE</b> y <b>BOD-EXT-99</b> operan prácticamente 'a ciegas'. La falta de revisión genera inconsistencias que disparan los tickets de soporte, degradando la confianza operativa.", style_body))
-
-    if fig_riesgo:
-        try:
-            img_bytes = fig_riesgo.to_image(format="png", width=600, height=350)
-            img_buffer = io.BytesIO(img_bytes)
-            img_pdf = Image(img_buffer, width=450, height=250)
-            img_pdf.hAlign = 'CENTER'
-            story.append(img_pdf)
-        except:
-            story.append(Spacer(1, 5))
+    if len(top_bodegas) >= 2:
+        story.append(Paragraph(f"<b>Diagnóstico de Gestión:</b> Las bodegas como <b>{top_bodegas.iloc[0]['Bodega']}</b> y <b>{top_bodegas.iloc[1]['Bodega']}</b> operan prácticamente 'a ciegas'. La falta de revisión genera inconsistencias que disparan los tickets de soporte, degradando la confianza operativa.", style_body))
+
+    # Gráfico vectorial memorizado por estado de filtros (el mismo para todas las descargas)
+    story.append(memorizar_agregado("reporte", "grafico_riesgo", lambda: _grafico_riesgo(riesgo.df_bodega),
+                                    datetime.now().date().isoformat()))
 
     doc.build(story)
     buffer.seek(0)
-    return buffer
\ No newline at end of file
+    return buffer
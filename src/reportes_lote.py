@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Generación por lotes del reporte ejecutivo PDF, sin la interfaz de Streamlit.
+
+Carga el dataset consolidado una sola vez (misma caché columnar que la app),
+arma el cubo OLAP y reparte los escenarios (una bodega, una ciudad o un mes)
+entre procesos trabajadores que heredan los datos ya cargados. Cada escenario
+escribe su PDF en el directorio de salida y al final se informa el throughput.
+
+Uso:
+    python -m src.reportes_lote --salida reportes_pdf
+    python -m src.reportes_lote --por bodega mes --procesos 4
+"""
+import argparse
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import streamlit.logger
+
+from src.cubo_olap import construir_cubo
+from src.data_loader import cargar_datos
+from src.reportes import generar_reporte_ejecutivo_pdf
+
+# -----------------------------
+# Constantes y configuraciones
+# -----------------------------
+
+# Dimensión del escenario -> columna del dataset maestro ("Mes" se deriva de Fecha_Venta)
+DIMENSIONES_LOTE = {
+    "bodega": "Bodega_Origen",
+    "ciudad": "Ciudad_Destino",
+    "mes": "Mes"
+}
+
+PROCESOS_POR_DEFECTO = os.cpu_count() or 1
+
+# Datos compartidos con los trabajadores. Con fork se heredan sin copiarse
+# (copy-on-write); con spawn llegan una vez por proceso en el inicializador.
+_datos = {}
+
+# -----------------------------
+# Utilidades
+# -----------------------------
+
+def _silenciar_streamlit():
+    # Fuera de `streamlit run` cada acceso a st.session_state emite una advertencia
+    streamlit.logger.set_log_level("error")
+
+
+def _nombre_archivo(dimension, valor):
+    limpio = re.sub(r"[^0-9A-Za-z_-]+", "_", str(valor)).strip("_") or "vacio"
+    return f"reporte_{dimension}_{limpio}.pdf"
+
+
+def _mascaras(dimension, valor):
+    """Filas del dataset y del cubo que pertenecen al escenario."""
+    if dimension == "mes":
+        return _datos["mes_filas"] == valor, _datos["mes_cubo"] == valor
+    columna = DIMENSIONES_LOTE[dimension]
+    return (_datos["df"][columna] == valor).to_numpy(), (_datos["cubo"][columna] == valor).to_numpy()
+
+
+def _inicializar_trabajador(datos=None):
+    _silenciar_streamlit()
+    if datos is not None:
+        _datos.update(datos)
+
+# -----------------------------
+# Funciones principales
+# -----------------------------
+
+def preparar_datos():
+    """Dataset maestro, métricas de calidad, cubo OLAP y mes de cada fila (una sola vez)."""
+    df_dss, health_scores, metricas_calidad, _ = cargar_datos()
+    cubo = construir_cubo(df_dss)
+    return {
+        "df": df_dss,
+        "health_scores": health_scores,
+        "metricas_calidad": metricas_calidad,
+        "cubo": cubo,
+        "mes_filas": pd.to_datetime(df_dss["Fecha_Venta"], errors="coerce").dt.to_period("M").to_numpy(),
+        "mes_cubo": cubo["Fecha_Mes"].dt.to_period("M").to_numpy()
+    }
+
+
+def listar_escenarios(datos, dimensiones):
+    """(dimensión, valor) por cada valor presente en el dataset, en orden."""
+    escenarios = []
+    for dimension in dimensiones:
+        if dimension == "mes":
+            valores = pd.Series(datos["mes_filas"]).dropna().unique()
+        else:
+            valores = datos["df"][DIMENSIONES_LOTE[dimension]].dropna().unique()
+        escenarios.extend((dimension, valor) for valor in sorted(valores))
+    return escenarios
+
+
+def generar_escenario(escenario, directorio):
+    """Filtra, genera y escribe el PDF de un escenario. Retorna sus métricas."""
+    dimension, valor = escenario
+    inicio = time.perf_counter()
+    mascara_filas, mascara_cubo = _mascaras(dimension, valor)
+    df_filtrado = _datos["df"][mascara_filas]
+
+    buffer = generar_reporte_ejecutivo_pdf(
+        df_filtrado, _datos["health_scores"], _datos["metricas_calidad"], _datos["cubo"][mascara_cubo]
+    )
+    ruta = os.path.join(directorio, _nombre_archivo(dimension, valor))
+    with open(ruta, "wb") as f:
+        f.write(buffer.getbuffer())
+
+    return {
+        "dimension": dimension,
+        "valor": str(valor),
+        "ruta": ruta,
+        "filas": len(df_filtrado),
+        "bytes": os.path.getsize(ruta),
+        "segundos": time.perf_counter() - inicio
+    }
+
+
+def generar_lote(directorio, dimensiones=tuple(DIMENSIONES_LOTE), procesos=PROCESOS_POR_DEFECTO, limite=None):
+    """
+    Genera los reportes de todos los escenarios de `dimensiones` en `directorio`.
+    Con `procesos` = 1 se generan en el proceso actual. Retorna (resultados, segundos).
+    """
+    _silenciar_streamlit()
+    os.makedirs(directorio, exist_ok=True)
+    _datos.update(preparar_datos())
+    escenarios = listar_escenarios(_datos, dimensiones)[:limite]
+
+    inicio = time.perf_counter()
+    if procesos <= 1 or len(escenarios) <= 1:
+        resultados = [generar_escenario(e, directorio) for e in escenarios]
+    else:
+        metodos = multiprocessing.get_all_start_methods()
+        contexto = multiprocessing.get_context("fork" if "fork" in metodos else "spawn")
+        datos_iniciales = None if contexto.get_start_method() == "fork" else dict(_datos)
+        # Lotes de escenarios por tarea para no pagar un viaje entre procesos por PDF
+        tamano_tarea = max(1, len(escenarios) // (procesos * 4))
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto,
+                                 initializer=_inicializar_trabajador, initargs=(datos_iniciales,)) as pool:
+            resultados = list(pool.map(generar_escenario, escenarios, [directorio] * len(escenarios),
+                                       chunksize=tamano_tarea))
+    return resultados, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera el reporte ejecutivo PDF por bodega, ciudad y mes")
+    parser.add_argument("--salida", default="reportes_pdf", help="Directorio de salida")
+    parser.add_argument("--por", nargs="+", choices=list(DIMENSIONES_LOTE), default=list(DIMENSIONES_LOTE),
+                        help="Dimensiones de los escenarios")
+    parser.add_argument("--procesos", type=int, default=PROCESOS_POR_DEFECTO, help="Procesos trabajadores")
+    parser.add_argument("--limite", type=int, help="Máximo de reportes (pruebas rápidas)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    resultados, segundos = generar_lote(args.salida, args.por, args.procesos, args.limite)
+    carga = time.perf_counter() - inicio - segundos
+
+    if not resultados:
+        print("Sin escenarios para generar.")
+        return
+    for dimension in args.por:
+        propios = [r for r in resultados if r["dimension"] == dimension]
+        print(f"{dimension:<8} {len(propios):>5} reportes")
+
+    total_mb = sum(r["bytes"] for r in resultados) / 1024 / 1024
+    total_filas = sum(r["filas"] for r in resultados)
+    mas_lento = max(resultados, key=lambda r: r["segundos"])
+    print(f"Carga y cubo: {carga:.1f} s")
+    print(f"Total: {len(resultados)} reportes ({total_mb:,.1f} MB) en {segundos:.1f} s con {args.procesos} proceso(s)")
+    print(f"Throughput: {len(resultados) / segundos:,.1f} reportes/s, {total_filas / segundos:,.0f} filas/s")
+    print(f"Más lento: {os.path.basename(mas_lento['ruta'])} ({mas_lento['segundos']:.2f} s, {mas_lento['filas']:,} filas)")
+
+
+if __name__ == "__main__":
+    main()
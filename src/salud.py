@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+import os
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Constantes y configuraciones
+# -----------------------------
+
+# Health Score = 100 × (1 - (0.7 × % Nulos + 0.3 × % Duplicados))
+PESO_NULOS = 0.7
+PESO_DUPLICADOS = 0.3
+
+# Filas de la muestra para el modo aproximado; 0 = siempre exacto.
+# Con TECHLOG_SALUD_MUESTRA=1000000 los archivos más grandes se estiman con margen de error.
+FILAS_MUESTRA = int(os.environ.get("TECHLOG_SALUD_MUESTRA", 0))
+CONFIANZA = 0.95
+
+# Hashes de fila distintos que conserva AcumuladorSalud (~16 bytes c/u). Hasta esa
+# cantidad de filas distintas los duplicados son exactos; más allá se estiman.
+MAX_HASHES_LOTES = int(os.environ.get("TECHLOG_SALUD_HASHES", 1_000_000))
+
+# Hash fijo para las celdas nulas (índice -1 de los códigos de factorize)
+HASH_NULO = np.uint64(0x9E3779B97F4A7C15)
+
+# -----------------------------
+# Utilidades
+# -----------------------------
+
+def _mezclar(valores):
+    """Finalizador splitmix64: reparte enteros (códigos de factorize) en todo el rango uint64."""
+    x = valores.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _hash_columna(serie, por_valor):
+    """
+    Hash uint64 por fila de una columna y su máscara de nulos.
+    - numéricas: hash del valor en float64 (un mismo valor hashea igual aunque un
+      lote lo lea como int y otro como float)
+    - resto: un solo factorize. Con `por_valor` se hashean los valores distintos y se
+      reparten con los códigos (estable entre lotes); sin él basta mezclar los códigos,
+      que identifican el valor dentro del mismo DataFrame.
+    """
+    if pd.api.types.is_numeric_dtype(serie.dtype) and not isinstance(serie.dtype, pd.CategoricalDtype):
+        valores = serie.to_numpy(dtype=np.float64, na_value=np.nan)
+        nulos = np.isnan(valores)
+        return np.where(nulos, HASH_NULO, pd.util.hash_array(valores)), nulos
+
+    codigos, unicos = pd.factorize(serie)
+    nulos = codigos < 0
+    if por_valor:
+        hash_unicos = np.append(pd.util.hash_pandas_object(pd.Series(unicos), index=False).to_numpy(), HASH_NULO)
+        return hash_unicos[codigos], nulos
+    return _mezclar(codigos), nulos
+
+
+def recorrer_filas(df, por_valor=False):
+    """
+    Una sola pasada por columnas: nulos por fila y hash de cada fila completa
+    (combinación de los hashes de sus columnas). Dos filas idénticas tienen el
+    mismo hash; una colisión entre filas distintas tiene probabilidad ~n²/2⁶⁴.
+    Con `por_valor` los hashes son comparables entre DataFrames (lectura por lotes).
+    """
+    nulos_fila = np.zeros(len(df), dtype=np.int64)
+    hashes = np.full(len(df), 0x345678, dtype=np.uint64)
+    multiplicador = np.uint64(1000003)
+
+    for i in range(df.shape[1]):
+        hash_columna, nulos = _hash_columna(df.iloc[:, i], por_valor)
+        nulos_fila += nulos
+        hashes ^= hash_columna
+        hashes *= multiplicador
+        multiplicador += np.uint64(82520 + 2 * (df.shape[1] - i))
+
+    return nulos_fila, hashes
+
+
+def _filas_duplicadas(hashes):
+    # Igual que df.duplicated().sum(): filas cuya combinación ya apareció antes
+    return int(len(hashes) - len(pd.unique(hashes)))
+
+
+def _score(pct_nulos, pct_duplicados):
+    return 100 * (1 - (PESO_NULOS * pct_nulos + PESO_DUPLICADOS * pct_duplicados))
+
+
+def _resultado(score, pct_nulos, pct_duplicados, filas, filas_evaluadas, margen=0.0, confianza=None):
+    return {
+        "health_score": round(float(score), 2),
+        "pct_nulos": round(float(pct_nulos) * 100, 2),
+        "pct_duplicados": round(float(pct_duplicados) * 100, 2),
+        "filas": int(filas),
+        "filas_evaluadas": int(filas_evaluadas),
+        "margen_error": round(float(margen), 2),
+        "confianza": confianza
+    }
+
+# -----------------------------
+# Funciones principales
+# -----------------------------
+
+def medir_salud(df, muestra=None, confianza=CONFIANZA, semilla=0):
+    """
+    Health Score de un DataFrame con nulos y duplicados medidos en una pasada.
+
+    Con `muestra` menor que las filas del DataFrame se evalúa una muestra uniforme
+    sin reemplazo y se reporta `margen_error` (puntos de score, al nivel `confianza`):
+    - % nulos: media muestral de la fracción nula por fila (con corrección por población finita)
+    - % duplicados: pares idénticos en la muestra escalados por n(n-1)/m(m-1); supone que los
+      duplicados vienen mayormente en pares y acota el error con una aproximación de Poisson
+    """
+    muestra = FILAS_MUESTRA if muestra is None else muestra
+    n, c = df.shape
+    if n == 0 or c == 0:
+        return _resultado(0, 0, 0, n, 0)
+
+    if not muestra or n <= muestra:
+        nulos_fila, hashes = recorrer_filas(df)
+        pct_nulos = nulos_fila.sum() / (n * c)
+        pct_duplicados = _filas_duplicadas(hashes) / n
+        return _resultado(_score(pct_nulos, pct_duplicados), pct_nulos, pct_duplicados, n, n)
+
+    rng = np.random.default_rng(semilla)
+    m = int(muestra)
+    nulos_fila, hashes = recorrer_filas(df.iloc[np.sort(rng.choice(n, m, replace=False))])
+    z = NormalDist().inv_cdf(0.5 + confianza / 2)
+
+    fraccion_nula = nulos_fila / c
+    pct_nulos = fraccion_nula.mean()
+    se_nulos = fraccion_nula.std(ddof=1) / np.sqrt(m) * np.sqrt(1 - m / n)
+
+    repeticiones = pd.Series(hashes).value_counts().to_numpy()
+    pares = float((repeticiones * (repeticiones - 1) // 2).sum())
+    escala = n * (n - 1) / (m * (m - 1)) / n
+    pct_duplicados = min(1.0, pares * escala)
+    se_duplicados = np.sqrt(max(pares, 1.0)) * escala
+
+    margen = 100 * z * np.sqrt((PESO_NULOS * se_nulos) ** 2 + (PESO_DUPLICADOS * se_duplicados) ** 2)
+    return _resultado(_score(pct_nulos, pct_duplicados), pct_nulos, pct_duplicados, n, m, margen, confianza)
+
+
+def calcular_health_score(df, muestra=None):
+    """
+    Calcula Health Score según fórmula: 100 × (1 - (0.7 × % Nulos + 0.3 × % Duplicados))
+    Retorna (score, % nulos, % duplicados).
+    """
+    resultado = medir_salud(df, muestra)
+    return resultado["health_score"], resultado["pct_nulos"], resultado["pct_duplicados"]
+
+
+class AcumuladorSalud:
+    """
+    Health Score de un archivo leído por lotes con memoria acotada. Los nulos se suman
+    exactos; los duplicados se cuentan sobre las filas cuyo hash queda bajo un umbral,
+    guardando cada hash distinto con su conteo. Las copias de una fila comparten hash y
+    entran juntas, así que el conteo dentro de la muestra es exacto.
+    Mientras haya hasta `max_hashes` filas distintas no se descarta nada y el resultado
+    coincide con medir_salud; después el umbral baja hasta conservar `max_hashes` hashes
+    y el % de duplicados se estima en la muestra con `margen_error`.
+    """
+
+    def __init__(self, max_hashes=MAX_HASHES_LOTES):
+        self.filas = 0
+        self.celdas = 0
+        self.nulos = 0
+        self.max_hashes = max_hashes
+        self._umbral = None
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._conteos = np.empty(0, dtype=np.int64)
+
+    def agregar(self, df):
+        nulos_fila, hashes = recorrer_filas(df, por_valor=True)
+        self.filas += len(df)
+        self.celdas += df.size
+        self.nulos += int(nulos_fila.sum())
+
+        # Se mezcla de nuevo para que el umbral elija filas al azar y no por sus valores
+        hashes = _mezclar(hashes)
+        if self._umbral is not None:
+            hashes = hashes[hashes <= self._umbral]
+        unicos, posiciones = np.unique(np.concatenate([self._hashes, hashes]), return_inverse=True)
+        pesos = np.concatenate([self._conteos, np.ones(len(hashes), dtype=np.int64)])
+        conteos = np.bincount(posiciones, weights=pesos, minlength=len(unicos)).astype(np.int64)
+
+        if len(unicos) > self.max_hashes:
+            # np.unique ordena: quedan los hashes más chicos y el umbral pasa a ser el mayor
+            unicos, conteos = unicos[:self.max_hashes], conteos[:self.max_hashes]
+            self._umbral = unicos[-1]
+        self._hashes, self._conteos = unicos, conteos
+
+    def resultado(self, confianza=CONFIANZA):
+        if self.filas == 0 or self.celdas == 0:
+            return _resultado(0, 0, 0, self.filas, 0)
+        pct_nulos = self.nulos / self.celdas
+        if self._umbral is None:
+            pct_duplicados = (self.filas - len(self._hashes)) / self.filas
+            return _resultado(_score(pct_nulos, pct_duplicados), pct_nulos, pct_duplicados, self.filas, self.filas)
+
+        m = int(self._conteos.sum())
+        pct_duplicados = (m - len(self._hashes)) / m
+        se_duplicados = np.sqrt(pct_duplicados * (1 - pct_duplicados) / m * (1 - m / self.filas))
+        margen = 100 * NormalDist().inv_cdf(0.5 + confianza / 2) * PESO_DUPLICADOS * se_duplicados
+        return _resultado(_score(pct_nulos, pct_duplicados), pct_nulos, pct_duplicados,
+                          self.filas, m, margen, confianza)
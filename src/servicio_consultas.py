@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""
+Servicio local HTTP/JSON con los KPIs del dashboard.
+
+Mantiene en memoria el dataset maestro (cargar_datos), el índice de filtros y
+el cubo OLAP, y responde consultas agregadas con la misma semántica de filtros
+que crear_sidebar_filtros. Atiende peticiones concurrentes (un hilo por
+conexión) y guarda cada respuesta serializada en una caché LRU por
+(versión de datos, recurso, estado canónico de filtros).
+
+Objetivo de latencia (LATENCIA_OBJETIVO_MS): p95 de 250 ms. Una respuesta en
+caché cuesta ~2 ms. Con la caché fría, medido sobre 1M de transacciones en un
+núcleo: resumen, fidelidad y riesgo ~0.2 s, venta invisible ~0.35 s, crisis
+~0.65 s, fuga ~1 s y kpis ~1.2 s (sin filtros; con filtros ~0.2-0.3 s). Con los
+datos de data/ todo queda bajo el objetivo. GET /estado reporta p50/p95,
+peticiones sobre el objetivo y aciertos de caché.
+
+Uso:
+    python -m src.servicio_consultas --puerto 8765
+    curl "http://127.0.0.1:8765/kpis?Ciudad_Destino=CALI&desde=2024-01-01&hasta=2024-06-30"
+
+Parámetros de filtro (todos opcionales; ausentes = todas las opciones, igual que el sidebar):
+    Categoria, Ciudad_Destino, Estado_Envio   repetibles o separados por coma
+    desde, hasta                              fechas ISO del rango de Fecha_Venta (inclusivo)
+    solo_negativos                            1 para dejar solo margen negativo
+"""
+import argparse
+import dataclasses
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+import streamlit.logger
+
+from src import analitica
+from src.cache_filtros import CacheLRU, clave_filtros
+from src.cubo_olap import construir_cubo, construir_cubo_sku, filtrar_cubo
+from src.data_loader import cargar_datos, firma_fuentes
+from src.filtros import construir_indice_filtros, mascara_filtros
+
+# -----------------------------
+# Constantes y configuraciones
+# -----------------------------
+
+PUERTO_POR_DEFECTO = 8765
+LATENCIA_OBJETIVO_MS = 250
+MUESTRAS_LATENCIA = 2000  # Ventana de peticiones para p50/p95
+# La matriz de riesgo por SKU tiene una fila por SKU: la API entrega solo los de peor margen
+MAX_SKUS_RIESGO = 1000
+
+# -----------------------------
+# Utilidades
+# -----------------------------
+
+def a_json(valor):
+    """
+    Convierte resultados de la capa analítica a tipos JSON: dataclasses (campos y
+    propiedades), DataFrames como lista de registros, Series como objeto,
+    escalares numpy como Python y NaN/inf como null.
+    """
+    if dataclasses.is_dataclass(valor) and not isinstance(valor, type):
+        salida = {c.name: a_json(getattr(valor, c.name)) for c in dataclasses.fields(valor)}
+        for nombre, atributo in vars(type(valor)).items():
+            if isinstance(atributo, property):
+                salida[nombre] = a_json(getattr(valor, nombre))
+        return salida
+    if isinstance(valor, pd.DataFrame):
+        if not isinstance(valor.index, pd.RangeIndex):
+            valor = valor.reset_index()
+        return [{str(k): a_json(v) for k, v in fila.items()} for fila in valor.to_dict("records")]
+    if isinstance(valor, pd.Series):
+        return {str(k): a_json(v) for k, v in valor.items()}
+    if isinstance(valor, dict):
+        return {str(k): a_json(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [a_json(v) for v in valor]
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float):
+        return valor if np.isfinite(valor) else None
+    if valor is None or isinstance(valor, (bool, int, str)):
+        return valor
+    if valor is pd.NaT or valor is pd.NA:
+        return None
+    return str(valor)  # Timestamp, Period, categorías no textuales
+
+
+def leer_filtros(consulta, indice):
+    """
+    Estado canónico de filtros (clave_filtros) desde los parámetros de la URL.
+    Una columna ausente selecciona todas sus opciones, como el sidebar por defecto.
+    """
+    selecciones = {}
+    for col, info in indice["columnas"].items():
+        valores = [v for crudo in consulta.get(col, []) for v in crudo.split(",") if v]
+        selecciones[col] = valores if col in consulta else info["opciones"]
+
+    rango = None
+    if "fechas_ordenadas" in indice and len(indice["fechas_ordenadas"]) > 0:
+        desde = consulta.get("desde", [None])[0] or pd.Timestamp(indice["fechas_ordenadas"][0]).date()
+        hasta = consulta.get("hasta", [None])[0] or pd.Timestamp(indice["fechas_ordenadas"][-1]).date()
+        rango = (desde, hasta)
+
+    solo_negativos = consulta.get("solo_negativos", ["0"])[0].lower() in ("1", "true", "si", "sí")
+    return clave_filtros(selecciones, rango, solo_negativos)
+
+
+def _percentil(valores, q):
+    return float(np.percentile(valores, q)) if valores else None
+
+# -----------------------------
+# Recursos
+# -----------------------------
+
+def _kpis(filas, cubo):
+    """Los indicadores de cabecera de todas las páginas en una sola respuesta."""
+    resumen = analitica.calcular_resumen(cubo)
+    # Solo los totales de fuga y venta invisible: las páginas completas además enrollan por SKU
+    total_fuga = cubo.loc[cubo["margen_negativo"], "margen_real"].sum()
+    ingreso_invisible = cubo.loc[cubo["venta_sin_inventario"].astype(bool), "ingreso_total"].sum()
+    crisis = analitica.calcular_crisis_logistica(filas)
+    fidelidad = analitica.calcular_fidelidad(cubo)
+    ruta_peor = crisis.ruta_peor
+    return {
+        "registros": resumen.n_registros,
+        "ingresos_totales": resumen.ingresos_totales,
+        "margen_total": resumen.margen_total,
+        "margen_pct": resumen.margen_pct,
+        "fuga_capital": abs(total_fuga),
+        "impacto_fuga_pct": (abs(total_fuga) / resumen.ingresos_totales * 100) if resumen.ingresos_totales > 0 else 0,
+        "ingreso_venta_invisible": ingreso_invisible,
+        "pct_venta_invisible": (ingreso_invisible / resumen.ingresos_totales * 100) if not cubo.empty else 0,
+        "tiempo_entrega_prom": crisis.tiempo_avg,
+        "ruta_critica": None if ruta_peor is None else {
+            "bodega": ruta_peor["Bodega_Origen"],
+            "ciudad": ruta_peor["Ciudad_Destino"],
+            "score_crisis": ruta_peor["score_crisis"]
+        },
+        "nps_promedio": fidelidad.nps_avg
+    }
+
+
+def _fuga(filas, cubo):
+    fuga = analitica.calcular_fuga_capital(construir_cubo_sku(filas))
+    return dataclasses.replace(fuga, df_sku_risk=fuga.df_sku_risk.nsmallest(MAX_SKUS_RIESGO, "margen_real"))
+
+
+# recurso -> cálculo(filas filtradas, cubo filtrado)
+RECURSOS = {
+    "kpis": _kpis,
+    "resumen": lambda filas, cubo: analitica.calcular_resumen(cubo),
+    "fuga": _fuga,
+    "venta_invisible": lambda filas, cubo: analitica.calcular_venta_invisible(cubo, construir_cubo_sku(filas)),
+    "crisis": lambda filas, cubo: analitica.calcular_crisis_logistica(filas),
+    "fidelidad": lambda filas, cubo: analitica.calcular_fidelidad(cubo),
+    "riesgo": lambda filas, cubo: analitica.calcular_riesgo_operativo(cubo, analitica.fecha_referencia_hoy())
+}
+# Solo estos recursos leen filas; el resto se responde desde el cubo sin copiar el dataset
+# (salvo los meses que el rango de fechas corta, ver filtrar_cubo)
+RECURSOS_CON_FILAS = {"kpis", "crisis", "fuga", "venta_invisible"}
+
+# -----------------------------
+# Funciones principales
+# -----------------------------
+
+class ServicioConsultas:
+    """Dataset residente, caché de respuestas y métricas de latencia del servicio."""
+
+    def __init__(self, datos=None, cache=None):
+        if datos is None:
+            version = firma_fuentes()
+            df_dss, health_scores, metricas_calidad, _ = cargar_datos(version)
+            datos = {"df": df_dss, "health_scores": health_scores, "version": version}
+        self.df = datos["df"]
+        self.health_scores = datos.get("health_scores", {})
+        self.version = datos.get("version")
+        self.indice = construir_indice_filtros(self.df)
+        self.cubo = construir_cubo(self.df)
+        self.cache = cache or CacheLRU()
+        self.inicio = datetime.now()
+        self._latencias = deque(maxlen=MUESTRAS_LATENCIA)
+        self._lock = threading.Lock()
+        self._en_curso = {}  # clave -> Lock: peticiones iguales simultáneas calculan una sola vez
+
+    def consultar(self, recurso, consulta):
+        """(cuerpo JSON en bytes, acierto de caché) de `recurso` con los filtros de `consulta`."""
+        estado = leer_filtros(consulta, self.indice)
+        # El día forma parte de la clave: el rezago de riesgo operativo se mide contra hoy
+        clave = ("respuesta", self.version, recurso, estado, datetime.now().date().isoformat())
+        cuerpo = self.cache.obtener(clave)
+        if cuerpo is not None:
+            return cuerpo, True
+
+        with self._lock:
+            lock_clave = self._en_curso.setdefault(clave, threading.Lock())
+        try:
+            with lock_clave:
+                # Otra petición pudo haberla calculado mientras esta esperaba
+                cuerpo = self.cache.obtener(clave)
+                if cuerpo is not None:
+                    return cuerpo, True
+                cuerpo = self._calcular(recurso, estado)
+                self.cache.guardar(clave, cuerpo, len(cuerpo))
+                return cuerpo, False
+        finally:
+            with self._lock:
+                self._en_curso.pop(clave, None)
+
+    def _calcular(self, recurso, estado):
+        selecciones, rango, solo_negativos = estado
+        filas = []
+
+        def _filas():
+            if not filas:
+                filas.append(self.df[mascara_filtros(self.indice, dict(selecciones), rango, solo_negativos)])
+            return filas[0]
+
+        cubo = filtrar_cubo(self.cubo, estado, _filas)
+        resultado = RECURSOS[recurso](_filas() if recurso in RECURSOS_CON_FILAS else None, cubo)
+        return json.dumps({"filtros": a_json(estado), "resultado": a_json(resultado)}, ensure_ascii=False).encode("utf-8")
+
+    def registrar_latencia(self, milisegundos):
+        with self._lock:
+            self._latencias.append(milisegundos)
+
+    def estado(self):
+        with self._lock:
+            latencias = list(self._latencias)
+        return {
+            "filas": len(self.df),
+            "version_datos": a_json(self.version),
+            "activo_desde": self.inicio.isoformat(timespec="seconds"),
+            "latencia_objetivo_ms": LATENCIA_OBJETIVO_MS,
+            "peticiones": len(latencias),
+            "p50_ms": _percentil(latencias, 50),
+            "p95_ms": _percentil(latencias, 95),
+            "sobre_objetivo": sum(m > LATENCIA_OBJETIVO_MS for m in latencias),
+            "cache": self.cache.estadisticas()
+        }
+
+    def opciones(self):
+        fechas = self.indice.get("fechas_ordenadas")
+        return {
+            "columnas": {col: info["opciones"] for col, info in self.indice["columnas"].items()},
+            "fecha_min": str(pd.Timestamp(fechas[0]).date()) if fechas is not None and len(fechas) else None,
+            "fecha_max": str(pd.Timestamp(fechas[-1]).date()) if fechas is not None and len(fechas) else None,
+            "recursos": sorted(RECURSOS) + ["salud", "filtros", "estado"]
+        }
+
+
+class ManejadorConsultas(BaseHTTPRequestHandler):
+    servicio = None  # ServicioConsultas; lo asigna crear_servidor
+
+    def _responder(self, codigo, cuerpo, cache=None, inicio=None):
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        if cache is not None:
+            self.send_header("X-Cache", "HIT" if cache else "MISS")
+        if inicio is not None:
+            self.send_header("X-Tiempo-ms", f"{(time.perf_counter() - inicio) * 1000:.1f}")
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _json(self, codigo, valor):
+        self._responder(codigo, json.dumps(a_json(valor), ensure_ascii=False).encode("utf-8"))
+
+    def do_GET(self):
+        inicio = time.perf_counter()
+        url = urlsplit(self.path)
+        recurso = url.path.strip("/")
+        consulta = parse_qs(url.query)
+
+        if recurso == "estado":
+            return self._json(200, self.servicio.estado())
+        if recurso == "filtros":
+            return self._json(200, self.servicio.opciones())
+        if recurso == "salud":
+            return self._json(200, self.servicio.health_scores)
+        if recurso not in RECURSOS:
+            return self._json(404, {"error": f"Recurso desconocido: {recurso}", "recursos": self.servicio.opciones()["recursos"]})
+
+        try:
+            cuerpo, acierto = self.servicio.consultar(recurso, consulta)
+        except (ValueError, KeyError) as e:
+            return self._json(400, {"error": str(e)})
+        self._responder(200, cuerpo, acierto, inicio)
+        self.servicio.registrar_latencia((time.perf_counter() - inicio) * 1000)
+
+    def log_message(self, formato, *args):
+        pass  # Las latencias se consultan en /estado
+
+
+def crear_servidor(host="127.0.0.1", puerto=PUERTO_POR_DEFECTO, servicio=None):
+    """Servidor listo para serve_forever(); con puerto 0 el sistema elige uno libre (pruebas)."""
+    streamlit.logger.set_log_level("error")  # cargar_datos corre en modo bare de Streamlit
+    manejador = type("Manejador", (ManejadorConsultas,), {"servicio": servicio or ServicioConsultas()})
+    servidor = ThreadingHTTPServer((host, puerto), manejador)
+    servidor.daemon_threads = True
+    return servidor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON con los KPIs del DSS TechLogistics")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=PUERTO_POR_DEFECTO)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    servidor = crear_servidor(args.host, args.puerto)
+    servicio = servidor.RequestHandlerClass.servicio
+    print(f"{len(servicio.df):,} filas cargadas en {time.perf_counter() - inicio:.1f} s")
+    print(f"Escuchando en http://{args.host}:{servidor.server_address[1]}/ (recursos: {', '.join(servicio.opciones()['recursos'])})")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,50 @@
 # -*- coding: utf-8 -*-
+import os
 import pandas as pd
 import numpy as np
+from pandas.tseries.api import guess_datetime_format
+from src.lectura_csv import leer_csv
+from src.perfilado import perfilar
+from src.salud import AcumuladorSalud, calcular_health_score
 
-def procesar_transacciones(ruta_csv, df_inventario, df_feedback):
+def inferir_formato_fecha(fechas):
+    """
+    Formato strftime de la columna de fechas, deducido del primer valor no nulo
+    (la misma regla que usa pd.to_datetime). Permite limpiar lotes parciales
+    del CSV con el formato del archivo completo.
+    """
+    muestra = fechas.dropna()
+    if muestra.empty:
+        return None
+    return guess_datetime_format(str(muestra.iloc[0]))
+
+@perfilar
+def procesar_transacciones(ruta_csv, df_inventario=None, df_feedback=None):
 
     try:
-        df_raw = pd.read_csv(ruta_csv)
+        df_raw = leer_csv(ruta_csv)
     except Exception as e:
         return pd.DataFrame(), {"error": str(e)}
 
-    df_trans = df_raw.copy()
-    
+    # Métricas de salud: archivo crudo vs. tabla limpia
+    salud_antes = calcular_health_score(df_raw)
+    df_trans = limpiar_transacciones(df_raw.copy())
+    salud_despues = calcular_health_score(df_trans)
+
+    metricas = {
+        "health_score_antes": salud_antes[0],
+        "health_score_despues": salud_despues[0],
+        "total_transacciones": len(df_trans)
+    }
+
+    return df_trans, metricas
+
+def limpiar_transacciones(df_trans, formato_fecha=None):
+    """
+    Reglas de limpieza de transacciones sobre un DataFrame crudo (archivo completo
+    o un lote de filas nuevas). `formato_fecha` fija el parseo de Fecha_Venta;
+    si es None se infiere como en pd.to_datetime.
+    """
     # 1. Limpieza de nombres de columnas
     df_trans.columns = [c.strip() for c in df_trans.columns]
     
@@ -38,7 +72,7 @@ def procesar_transacciones(ruta_csv, df_inventario, df_feedback):
         df_trans['Ciudad_Destino'] = df_trans['Ciudad_Destino'].replace(mapeo_ciudades)
 
     # 4. Limpieza de Tipos y Outliers
-    df_trans['Fecha_Venta'] = pd.to_datetime(df_trans['Fecha_Venta'], errors='coerce')
+    df_trans['Fecha_Venta'] = pd.to_datetime(df_trans['Fecha_Venta'], errors='coerce', format=formato_fecha)
     
     # Convertimos a numérico y gestionamos el outlier '999' detectado en el CSV maestro
     df_trans['Tiempo_Entrega'] = pd.to_numeric(df_trans['Tiempo_Entrega'], errors='coerce')
@@ -47,14 +81,85 @@ def procesar_transacciones(ruta_csv, df_inventario, df_feedback):
     df_trans['Precio_Venta_Final'] = pd.to_numeric(df_trans['Precio_Venta_Final'], errors='coerce').fillna(0)
     df_trans['Costo_Envio'] = pd.to_numeric(df_trans['Costo_Envio'], errors='coerce').fillna(0)
 
-    # Métricas de salud
-    salud_antes = (100, 0, 0)
-    salud_despues = (100, 0, 0)
+    return df_trans
+
+
+def procesar_transacciones_streaming(ruta_csv, ruta_salida, tamano_chunk=100_000):
+    """
+    Variante por lotes de procesar_transacciones para archivos que no caben en memoria.
+    Lee el CSV en chunks de `tamano_chunk` filas, aplica limpiar_transacciones a cada uno
+    y los escribe en un Parquet (`ruta_salida`). La memoria pico depende del tamaño del
+    chunk, no del archivo: el Health Score usa AcumuladorSalud, que guarda a lo sumo
+    MAX_HASHES_LOTES hashes de fila y por encima de eso estima el % de duplicados.
+    Retorna (ruta_salida, metricas).
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        return None, {"error": str(e)}
+
+    escritor = None
+    esquema = None
+    formato_fecha = None
+    total = 0
+    salud_antes = AcumuladorSalud()
+    salud_despues = AcumuladorSalud()
+
+    try:
+        lector = pd.read_csv(ruta_csv, chunksize=tamano_chunk)
+    except Exception as e:
+        return None, {"error": str(e)}
+
+    try:
+        for chunk in lector:
+            if esquema is None:
+                # El formato de fecha se fija con el primer chunk para que todos los lotes
+                # se interpreten igual que con el archivo completo
+                col_fecha = next((c for c in chunk.columns if c.strip() == "Fecha_Venta"), None)
+                formato_fecha = inferir_formato_fecha(chunk[col_fecha]) if col_fecha else None
+
+            salud_antes.agregar(chunk)
+            df_chunk = limpiar_transacciones(chunk, formato_fecha=formato_fecha)
+            salud_despues.agregar(df_chunk)
+
+            if esquema is None:
+                esquema = _esquema_transacciones(df_chunk, pa)
+                escritor = pq.ParquetWriter(ruta_salida, esquema)
+
+            escritor.write_table(pa.Table.from_pandas(df_chunk, schema=esquema, preserve_index=False))
+            total += len(df_chunk)
+    except Exception as e:
+        if escritor is not None:
+            escritor.close()
+            escritor = None
+            os.remove(ruta_salida)  # No dejar un Parquet a medio escribir
+        return None, {"error": str(e)}
+    finally:
+        if escritor is not None:
+            escritor.close()
 
     metricas = {
-        "health_score_antes": salud_antes[0],
-        "health_score_despues": salud_despues[0],
-        "total_transacciones": len(df_trans)
+        "health_score_antes": salud_antes.resultado()["health_score"],
+        "health_score_despues": salud_despues.resultado()["health_score"],
+        "total_transacciones": total
     }
 
-    return df_trans, metricas
\ No newline at end of file
+    return ruta_salida, metricas
+
+
+def _esquema_transacciones(df_chunk, pa):
+    """
+    Esquema Arrow fijo para todos los chunks. Las columnas vacías en el primero se tratan
+    como texto y las enteras se declaran float64: que el primer chunk solo traiga enteros
+    no impide que uno posterior traiga decimales o nulos.
+    """
+    esquema = pa.Schema.from_pandas(df_chunk, preserve_index=False)
+    campos = []
+    for campo in esquema:
+        if pa.types.is_null(campo.type):
+            campo = pa.field(campo.name, pa.string())
+        elif pa.types.is_integer(campo.type):
+            campo = pa.field(campo.name, pa.float64())
+        campos.append(campo)
+    return pa.schema(campos, metadata=esquema.metadata)
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+import streamlit.logger
+
+from src.compactacion import compactar_dataset
+from src.data_loader import crear_dataset_consolidado
+from src.feedback import procesar_feedback
+from src.inventario import procesar_inventario
+from src.transacciones import procesar_transacciones
+
+DIRECTORIO_DATOS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+@pytest.fixture(scope="session")
+def df_dss():
+    """Dataset Maestro compacto de los CSV del repositorio, sin pasar por la caché en disco."""
+    # Fuera de `streamlit run` cada acceso a st.session_state emite una advertencia
+    streamlit.logger.set_log_level("error")
+    df_inv, _ = procesar_inventario(os.path.join(DIRECTORIO_DATOS, "inventario_central_v2.csv"))
+    df_feed, _ = procesar_feedback(os.path.join(DIRECTORIO_DATOS, "feedback_clientes_v2.csv"))
+    df_trans, _ = procesar_transacciones(os.path.join(DIRECTORIO_DATOS, "transacciones_logistica_v2.csv"))
+    df, _ = compactar_dataset(crear_dataset_consolidado(df_trans, df_inv, df_feed))
+    return df
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.cache_filtros import CacheLRU, clave_filtros, estimar_bytes
+
+# -----------------------------
+# Desalojo LRU
+# -----------------------------
+
+def test_desaloja_por_cantidad_de_entradas():
+    cache = CacheLRU(max_entradas=3, max_bytes=10_000)
+    for clave in "abc":
+        cache.guardar(clave, clave, tamano=1)
+    assert cache.obtener("a") == "a"  # "a" pasa a ser la más reciente
+
+    cache.guardar("d", "d", tamano=1)
+    assert cache.obtener("b") is None
+    assert [cache.obtener(c) for c in "acd"] == ["a", "c", "d"]
+    stats = cache.estadisticas()
+    assert stats["entradas"] == 3 and stats["desalojos"] == 1 and stats["bytes"] == 3
+
+
+def test_desaloja_por_bytes():
+    cache = CacheLRU(max_entradas=100, max_bytes=100)
+    cache.guardar("a", "a", tamano=40)
+    cache.guardar("b", "b", tamano=40)
+    cache.obtener("a")
+    cache.guardar("c", "c", tamano=40)  # 120 bytes: sale la menos usada ("b")
+
+    assert cache.obtener("b") is None
+    assert cache.obtener("a") == "a" and cache.obtener("c") == "c"
+    assert cache.estadisticas()["bytes"] == 80
+
+    cache.guardar("d", "d", tamano=100)  # ocupa toda la caché
+    assert [cache.obtener(c) for c in "acd"] == [None, None, "d"]
+    assert cache.estadisticas()["bytes"] == 100
+
+
+def test_resultado_mas_grande_que_la_cache_no_se_guarda():
+    cache = CacheLRU(max_entradas=10, max_bytes=50)
+    cache.guardar("a", "a", tamano=10)
+    cache.guardar("grande", "x", tamano=51)
+    assert cache.obtener("grande") is None and cache.obtener("a") == "a"
+
+
+def test_reemplazar_una_clave_actualiza_los_bytes():
+    cache = CacheLRU(max_entradas=10, max_bytes=100)
+    cache.guardar("a", 1, tamano=60)
+    cache.guardar("a", 2, tamano=30)
+    assert cache.obtener("a") == 2 and cache.estadisticas()["bytes"] == 30
+
+
+def test_obtener_o_calcular_calcula_una_vez():
+    cache = CacheLRU(max_entradas=10, max_bytes=10_000)
+    llamadas = []
+
+    def calcular():
+        llamadas.append(1)
+        return np.arange(10)
+
+    cache.obtener_o_calcular("k", calcular)
+    cache.obtener_o_calcular("k", calcular)
+    assert len(llamadas) == 1
+    assert cache.estadisticas()["aciertos"] == 1 and cache.estadisticas()["fallos"] == 1
+
+
+def test_estimar_bytes_de_arrays_y_dataframes():
+    assert estimar_bytes(np.zeros(1_000)) == 8_000
+    df = pd.DataFrame({"a": np.zeros(1_000)})
+    assert estimar_bytes(df) >= 8_000
+    assert estimar_bytes({"x": np.zeros(1_000), "y": [np.zeros(500)]}) > 12_000
+
+# -----------------------------
+# Clave canónica de filtros
+# -----------------------------
+
+def test_estados_equivalentes_comparten_clave():
+    fecha = datetime.date(2025, 1, 31)
+    a = clave_filtros({"Ciudad": ["B", "A"], "Categoria": ["x"]}, (fecha, fecha), 1)
+    b = clave_filtros({"Categoria": ["x"], "Ciudad": ["A", "B"]}, ("2025-01-31", pd.Timestamp(fecha)), True)
+    assert a == b
+    assert a != clave_filtros({"Categoria": ["x"], "Ciudad": ["A"]}, (fecha, fecha), True)
+    assert clave_filtros({}, None, False) == ((), None, False)
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+
+from src.compactacion import ENTERO_MINIMO, compactar_columna, compactar_dataset
+
+# -----------------------------
+# Enteros
+# -----------------------------
+
+def test_enteros_chicos_no_bajan_de_int32():
+    for serie in [pd.Series([0, 1, 100]), pd.Series([0.0, 1.0, 100.0]), pd.Series([-5, 30_000], dtype=np.int16)]:
+        compacta = compactar_columna(serie)
+        assert compacta.dtype == ENTERO_MINIMO
+        # La aritmética elemento a elemento no desborda como en int8 (100 * 100 = 16)
+        assert (compacta * compacta).tolist() == (serie.astype(np.int64) ** 2).tolist()
+
+
+def test_enteros_fuera_de_int32_quedan_en_int64():
+    serie = pd.Series([0.0, float(2 ** 40)])
+    assert compactar_columna(serie).dtype == np.int64
+
+
+def test_floats_con_decimales_o_nulos_no_cambian():
+    for serie in [pd.Series([1.5, 2.0]), pd.Series([1.0, np.nan])]:
+        assert compactar_columna(serie) is serie
+
+
+def test_medidas_del_dataset_maestro(df_dss):
+    # df_dss ya pasó por compactar_dataset: las medidas enteras quedan en int32 o más
+    for col in ["Cantidad_Vendida", "Tiempo_Entrega", "Stock_Actual", "Ticket_Soporte", "brecha_entrega"]:
+        assert df_dss[col].dtype.itemsize >= np.dtype(ENTERO_MINIMO).itemsize
+    compacto, reporte = compactar_dataset(df_dss)
+    assert {r["columna"] for r in reporte} == set(df_dss.columns)
+    pd.testing.assert_frame_equal(compacto, df_dss)
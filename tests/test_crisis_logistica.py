@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analitica import calcular_crisis_logistica
+
+# -----------------------------
+# Utilidades
+# -----------------------------
+
+def _analisis_anterior(df):
+    """Filas del análisis tal como las preparaba el bucle por ciudad: ciudad normalizada y sin canal digital."""
+    df_log = df.dropna(subset=["Tiempo_Entrega", "NPS_Numerico"]).copy()
+    df_log["Ciudad_Destino"] = df_log["Ciudad_Destino"].astype(str).str.strip().str.upper()
+    df_analisis = df_log[(df_log["Tiempo_Entrega"] < 100) & (df_log["Tiempo_Entrega"] > 0)]
+    if df_analisis.empty:
+        df_analisis = df_log[df_log["Tiempo_Entrega"] < 100]
+    digital = df_analisis["Ciudad_Destino"].str.contains("CANAL DIGITAL|DIGITAL", na=False)
+    return df_analisis, df_analisis[~digital], int(digital.sum())
+
+
+def _corr_por_grupo(df, claves):
+    return {
+        clave: grupo["Tiempo_Entrega"].corr(grupo["NPS_Numerico"])
+        for clave, grupo in df.groupby(claves, observed=True)
+    }
+
+
+def _comparar(df):
+    crisis = calcular_crisis_logistica(df)
+    df_analisis, df_geo, digitales = _analisis_anterior(df)
+
+    assert crisis.registros_canal_digital == digitales
+    assert crisis.tiempo_avg == pytest.approx(df_analisis["Tiempo_Entrega"].mean(), nan_ok=True)
+    assert crisis.corr_global == pytest.approx(df_analisis["Tiempo_Entrega"].corr(df_analisis["NPS_Numerico"]), nan_ok=True)
+
+    # Rutas: medias, conteo y correlación de cada (bodega, ciudad) contra su groupby por filas
+    esperadas = df_geo.groupby(["Bodega_Origen", "Ciudad_Destino"], observed=True).agg({
+        "NPS_Numerico": "mean", "Tiempo_Entrega": "mean", "Transaccion_ID": "count"
+    })
+    rutas = crisis.df_rutas.set_index(["Bodega_Origen", "Ciudad_Destino"]).sort_index()
+    pd.testing.assert_frame_equal(
+        rutas[["NPS_Numerico", "Tiempo_Entrega", "Transaccion_ID"]], esperadas.sort_index(),
+        check_dtype=False, check_categorical=False, check_index_type=False, rtol=1e-9
+    )
+    corr_rutas = _corr_por_grupo(df_geo, ["Bodega_Origen", "Ciudad_Destino"])
+    for ruta, corr in rutas["Correlacion"].items():
+        assert corr == pytest.approx(corr_rutas[ruta], abs=1e-9, nan_ok=True)
+
+    # Ciudades: las que el bucle anterior reportaba (>= 2 filas y correlación definida)
+    esperadas_ciudad = {
+        ciudad: corr for ciudad, corr in _corr_por_grupo(df_geo, "Ciudad_Destino").items()
+        if (df_geo["Ciudad_Destino"] == ciudad).sum() >= 2 and not np.isnan(corr)
+    }
+    if crisis.df_corr_city is None:
+        assert not esperadas_ciudad
+        return
+    por_ciudad = crisis.df_corr_city.set_index("Ciudad")["Correlacion"]
+    assert set(por_ciudad.index) == set(esperadas_ciudad)
+    for ciudad, corr in esperadas_ciudad.items():
+        assert por_ciudad[ciudad] == pytest.approx(corr, abs=1e-9)
+    assert por_ciudad.is_monotonic_increasing
+
+# -----------------------------
+# Agrupación única vs. corr por grupo
+# -----------------------------
+
+def test_dataset_maestro(df_dss):
+    _comparar(df_dss)
+
+
+def test_subconjuntos(df_dss):
+    _comparar(df_dss[df_dss["margen_real"] < 0])
+    ciudad = df_dss["Ciudad_Destino"].dropna().iloc[0]
+    _comparar(df_dss[df_dss["Ciudad_Destino"] == ciudad])
+    _comparar(df_dss.iloc[:0])
+
+
+def test_ciudades_sin_normalizar_y_canal_digital():
+    rng = np.random.default_rng(21)
+    n = 600
+    df = pd.DataFrame({
+        "Tiempo_Entrega": rng.integers(-5, 120, n).astype(float),
+        "NPS_Numerico": rng.integers(1, 6, n).astype(float),
+        "Ciudad_Destino": rng.choice(["Cali", "cali ", " CALI", "Bogota", "Canal Digital", "digital", "sin dato"], n),
+        "Bodega_Origen": rng.choice(["Norte", "Sur", None], n),
+        "Transaccion_ID": np.where(rng.random(n) < 0.9, np.arange(n).astype(str), None),
+        "brecha_entrega": rng.integers(-3, 10, n)
+    })
+    df.loc[df.index % 11 == 0, "NPS_Numerico"] = np.nan
+    df.loc[df["Ciudad_Destino"] == "sin dato", "Ciudad_Destino"] = np.nan  # nulos como los lee read_csv
+    # Una ruta de una sola fila y una ciudad con tiempo constante (correlación indefinida)
+    df.loc[0, ["Ciudad_Destino", "Bodega_Origen", "Tiempo_Entrega", "NPS_Numerico"]] = ["Pasto", "Norte", 10.0, 3.0]
+    df.loc[1:3, ["Ciudad_Destino", "Tiempo_Entrega"]] = ["Tunja", 7.0]
+    _comparar(df)
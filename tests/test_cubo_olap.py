@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import analitica
+from src.cache_filtros import clave_filtros
+from src.cubo_olap import (
+    COLUMNAS_FECHA, DIMENSIONES, MEDIDAS_SKU, construir_cubo, construir_cubo_sku, enrollar, filtrar_cubo
+)
+from src.filtros import construir_indice_filtros, mascara_filtros
+
+MEDIDAS = ["n", "ingreso_total", "margen_real", "Cantidad_Vendida", "Stock_Actual", "NPS_Numerico", "Ticket_Soporte"]
+
+# -----------------------------
+# Utilidades
+# -----------------------------
+
+@pytest.fixture(scope="module")
+def cubo(df_dss):
+    return construir_cubo(df_dss)
+
+
+@pytest.fixture(scope="module")
+def indice(df_dss):
+    return construir_indice_filtros(df_dss)
+
+
+def _sumas_filas(df, dimension):
+    return df.assign(n=1).groupby(dimension, observed=True)[MEDIDAS].sum()
+
+
+def _estados(indice):
+    """Estados de filtros: completo, rangos que cortan meses, mes exacto, un día y vacío."""
+    todas = {col: info["opciones"] for col, info in indice["columnas"].items()}
+    fechas = indice["fechas_ordenadas"]
+    fecha_min, fecha_max = pd.Timestamp(fechas[0]).date(), pd.Timestamp(fechas[-1]).date()
+    return [
+        (todas, (fecha_min, fecha_max), False),
+        (todas, None, False),
+        ({**todas, "Categoria": todas["Categoria"][:3]}, ("2025-03-17", "2025-08-09"), False),
+        ({**todas, "Ciudad_Destino": todas["Ciudad_Destino"][:4]}, ("2025-02-01", "2025-06-30"), True),
+        (todas, ("2025-05-05", "2025-05-05"), False),
+        ({**todas, "Categoria": []}, ("2030-01-01", "2030-01-02"), False),
+    ]
+
+# -----------------------------
+# Construcción y enrollado
+# -----------------------------
+
+def test_cubo_agrega_por_debajo_de_las_filas(df_dss, cubo):
+    assert cubo["n"].sum() == len(df_dss)
+    assert len(cubo) < len(df_dss)
+    assert "SKU_ID" not in cubo.columns and "Fecha_Mes" in cubo.columns
+    assert not cubo.duplicated(subset=[d for d in DIMENSIONES if d in cubo.columns]).any()
+
+
+@pytest.mark.parametrize("dimension", ["Categoria", "Bodega_Origen", "Ciudad_Destino", "Canal_Venta", "Estado_Envio"])
+def test_enrollado_coincide_con_sumas_por_fila(df_dss, cubo, dimension):
+    pd.testing.assert_frame_equal(
+        enrollar(cubo, dimension, MEDIDAS), _sumas_filas(df_dss, dimension),
+        check_dtype=False, check_categorical=False, rtol=1e-9
+    )
+
+
+def test_enrollado_por_defecto_no_suma_fechas(cubo):
+    assert not set(COLUMNAS_FECHA) & set(enrollar(cubo, "Categoria").columns)
+
+
+def test_rango_de_dias_de_cada_celda(df_dss, cubo):
+    fechas = pd.to_datetime(df_dss["Fecha_Venta"]).dt.normalize()
+    assert cubo["fecha_min"].min() == fechas.min() and cubo["fecha_max"].max() == fechas.max()
+    meses = cubo.dropna(subset=["fecha_min"])
+    assert (meses["fecha_min"].dt.to_period("M") == meses["Fecha_Mes"].dt.to_period("M")).all()
+    assert (meses["fecha_max"].dt.to_period("M") == meses["Fecha_Mes"].dt.to_period("M")).all()
+
+
+def test_cubo_sku_coincide_con_sumas_por_fila(df_dss):
+    cubo_sku = construir_cubo_sku(df_dss)
+    assert "Fecha_Mes" not in cubo_sku.columns
+    pd.testing.assert_frame_equal(
+        enrollar(cubo_sku, "SKU_ID", MEDIDAS_SKU),
+        df_dss.assign(n=1).groupby("SKU_ID", observed=True)[MEDIDAS_SKU].sum(),
+        check_dtype=False, check_categorical=False, rtol=1e-9
+    )
+
+# -----------------------------
+# Filtros sobre el cubo
+# -----------------------------
+
+def test_filtrar_cubo_equivale_a_cubo_de_las_filas(df_dss, cubo, indice):
+    fecha_referencia = pd.Timestamp("2026-01-01")
+    for selecciones, rango, solo_negativos in _estados(indice):
+        filas = df_dss[mascara_filtros(indice, selecciones, rango, solo_negativos)]
+        filtrado = filtrar_cubo(cubo, clave_filtros(selecciones, rango, solo_negativos), lambda: filas)
+        desde_filas = construir_cubo(filas)
+
+        assert filtrado["n"].sum() == len(filas)
+        for dimension in ["Categoria", "Bodega_Origen", "Ciudad_Destino"]:
+            pd.testing.assert_frame_equal(
+                enrollar(filtrado, dimension, MEDIDAS), enrollar(desde_filas, dimension, MEDIDAS),
+                check_dtype=False, check_categorical=False, rtol=1e-9
+            )
+        riesgo = analitica.calcular_riesgo_operativo(filtrado, fecha_referencia)
+        esperado = analitica.calcular_riesgo_operativo(desde_filas, fecha_referencia)
+        assert riesgo.promedio_dias == pytest.approx(esperado.promedio_dias, nan_ok=True)
+        assert riesgo.correlacion == pytest.approx(esperado.correlacion, nan_ok=True)
+        assert analitica.calcular_fidelidad(filtrado).conteo_nps.equals(analitica.calcular_fidelidad(desde_filas).conteo_nps)
+
+
+def test_rango_que_cubre_meses_enteros_no_lee_filas(cubo, indice):
+    todas = {col: info["opciones"] for col, info in indice["columnas"].items()}
+    fechas = indice["fechas_ordenadas"]
+    estado = clave_filtros(todas, (pd.Timestamp(fechas[0]).date(), pd.Timestamp(fechas[-1]).date()))
+    assert len(filtrar_cubo(cubo, estado)) > 0
+
+
+def test_rango_que_corta_meses_exige_filas(cubo, indice):
+    todas = {col: info["opciones"] for col, info in indice["columnas"].items()}
+    with pytest.raises(ValueError):
+        filtrar_cubo(cubo, clave_filtros(todas, ("2025-03-17", "2025-08-09")))
+
+
+def test_venta_invisible_por_mes_coincide_con_filas(df_dss, cubo):
+    invisible = analitica.calcular_venta_invisible(cubo, construir_cubo_sku(df_dss))
+    sin_inventario = df_dss[df_dss["venta_sin_inventario"]]
+    por_mes = sin_inventario.groupby(pd.to_datetime(sin_inventario["Fecha_Venta"]).dt.to_period("M"))["ingreso_total"].sum()
+    np.testing.assert_allclose(invisible.df_tiempo["ingreso_total"].to_numpy(), por_mes.to_numpy(), rtol=1e-9)
+    assert invisible.skus_huerfanos == sin_inventario["SKU_ID"].nunique()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.feedback import categorizar_nps, normalizar_nps_dinamico, normalizar_nps_vectorizado
+
+# -----------------------------
+# Utilidades
+# -----------------------------
+
+def _categoria_anterior(x):
+    # Lambda que usaba procesar_feedback antes de vectorizar la categorización
+    return "Promotor" if x >= 9 else ("Pasivo" if x >= 7 else "Detractor")
+
+
+def _referencia(valores):
+    return np.array([normalizar_nps_dinamico(v) for v in valores], dtype=float)
+
+
+def _comparar(valores):
+    serie = pd.Series(valores)
+    vectorizado = normalizar_nps_vectorizado(serie)
+    np.testing.assert_array_equal(vectorizado.to_numpy(dtype=float), _referencia(valores))
+    assert vectorizado.index.equals(serie.index)
+
+# -----------------------------
+# Normalización de NPS
+# -----------------------------
+
+@pytest.mark.parametrize("escala", [(-100, 100), (0, 10)])
+def test_valores_aleatorios_coinciden_con_la_funcion_escalar(escala):
+    rng = np.random.default_rng(20240101)
+    flotantes = rng.uniform(*escala, 2_000)
+    enteros = rng.integers(escala[0], escala[1] + 1, 2_000)
+    _comparar(flotantes)
+    _comparar(enteros)
+    # Leídos del CSV llegan como texto
+    _comparar([str(v) for v in flotantes[:500]] + [str(v) for v in enteros[:500]])
+
+
+def test_bordes_de_escala():
+    _comparar([-100, 0, 1, 10, 100, -100.0, 0.0, 1.0, 10.0, 100.0, 10.0001, -0.0001])
+    _comparar(["-100", "0", "1", "10", "100"])
+
+
+def test_textos_no_convertibles_usan_5():
+    valores = ["", "N/A", "diez", "9 puntos", " 7 ", "1e1", "1_000", "nan", "inf", "-inf", "0x10"]
+    _comparar(valores)
+    assert normalizar_nps_vectorizado(pd.Series(["N/A", "diez"])).tolist() == [5.0, 5.0]
+
+
+def test_nulos_booleanos_e_infinitos():
+    _comparar([np.nan, None, True, False, np.inf, -np.inf, 3, "8"])
+    _comparar([True, False, True])
+    _comparar([np.nan, np.inf, -np.inf, 50.0])
+    assert normalizar_nps_vectorizado(pd.Series([None, np.nan], dtype=object)).tolist() == [5.0, 5.0]
+
+
+def test_serie_vacia():
+    assert normalizar_nps_vectorizado(pd.Series([], dtype=object)).empty
+
+# -----------------------------
+# Categorización
+# -----------------------------
+
+def test_categorias_en_los_umbrales():
+    valores = pd.Series([6.999, 7.0, 7.001, 8.999, 9.0, 9.001, 10.0, 1.0, 5.0, np.nan, -np.inf, np.inf],
+                        index=range(10, 22))
+    categorias = categorizar_nps(valores)
+    assert categorias.tolist() == [_categoria_anterior(x) for x in valores]
+    assert categorias.index.equals(valores.index)
+
+
+def test_categorias_sobre_nps_normalizado():
+    rng = np.random.default_rng(7)
+    nps = normalizar_nps_vectorizado(pd.Series(rng.uniform(-100, 100, 2_000)))
+    assert categorizar_nps(nps).tolist() == nps.apply(_categoria_anterior).tolist()
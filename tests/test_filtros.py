@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.filtros import COLUMNAS_FILTRO, construir_indice_filtros, mascara_filtros
+
+# -----------------------------
+# Utilidades
+# -----------------------------
+
+def _mascara_anterior(df, selecciones, rango_fechas=None, solo_negativos=False):
+    """Filtros encadenados que usaba crear_sidebar_filtros antes del índice precalculado."""
+    mascara = pd.Series(True, index=df.index)
+    for col, seleccion in selecciones.items():
+        if seleccion:
+            mascara &= df[col].isin(seleccion)
+    if rango_fechas is not None:
+        fechas = pd.to_datetime(df["Fecha_Venta"]).dt.date
+        inicio, fin = (pd.Timestamp(f).date() for f in rango_fechas)
+        mascara &= (fechas >= inicio) & (fechas <= fin)
+    if solo_negativos:
+        mascara &= df["margen_real"] < 0
+    return mascara.to_numpy()
+
+
+def _comparar(df, indice, selecciones, rango_fechas=None, solo_negativos=False):
+    np.testing.assert_array_equal(
+        mascara_filtros(indice, selecciones, rango_fechas, solo_negativos),
+        _mascara_anterior(df, selecciones, rango_fechas, solo_negativos)
+    )
+
+
+@pytest.fixture(scope="module")
+def indice(df_dss):
+    return construir_indice_filtros(df_dss)
+
+# -----------------------------
+# Índice vs. máscara booleana
+# -----------------------------
+
+def test_sin_filtros_y_todo_seleccionado(df_dss, indice):
+    todas = {col: info["opciones"] for col, info in indice["columnas"].items()}
+    _comparar(df_dss, indice, {})
+    _comparar(df_dss, indice, todas)
+    _comparar(df_dss, indice, {col: [] for col in todas})
+
+
+def test_selecciones_aleatorias(df_dss, indice):
+    rng = np.random.default_rng(11)
+    fechas = pd.to_datetime(df_dss["Fecha_Venta"]).dropna()
+    for _ in range(40):
+        selecciones = {}
+        for col in COLUMNAS_FILTRO:
+            opciones = indice["columnas"][col]["opciones"]
+            selecciones[col] = list(rng.choice(opciones, rng.integers(0, len(opciones) + 1), replace=False))
+        desde, hasta = sorted(rng.choice(fechas.to_numpy(), 2))
+        rango = (pd.Timestamp(desde).date(), pd.Timestamp(hasta).date()) if rng.random() < 0.7 else None
+        _comparar(df_dss, indice, selecciones, rango, bool(rng.random() < 0.3))
+
+
+def test_rangos_en_los_bordes(df_dss, indice):
+    fechas = pd.to_datetime(df_dss["Fecha_Venta"]).dropna()
+    un_dia = fechas.iloc[0].date()
+    _comparar(df_dss, indice, {}, (un_dia, un_dia))
+    _comparar(df_dss, indice, {}, (fechas.min().date(), fechas.max().date()))
+    _comparar(df_dss, indice, {}, ("1990-01-01", "1990-12-31"))
+    _comparar(df_dss, indice, {}, ("2030-01-01", "2030-12-31"), True)
+
+
+def test_nulos_y_valores_desconocidos():
+    df = pd.DataFrame({
+        "Categoria": ["A", None, "B", "A", "C"],
+        "Ciudad_Destino": pd.Categorical(["X", "Y", None, "X", "Y"]),
+        "Estado_Envio": ["ok", "ok", "ok", None, "ko"],
+        "Fecha_Venta": pd.to_datetime(["2025-01-01", None, "2025-01-03", "2025-01-03", "2025-02-01"]),
+        "margen_real": [1.0, -2.0, -3.0, 0.0, np.nan]
+    })
+    indice = construir_indice_filtros(df)
+    _comparar(df, indice, {"Categoria": ["A", "Z"]})
+    _comparar(df, indice, {"Ciudad_Destino": ["Y"], "Estado_Envio": ["ok"]}, solo_negativos=True)
+    _comparar(df, indice, {"Categoria": ["A", "B", "C"]}, ("2025-01-01", "2025-01-03"))
+    _comparar(df, indice, {}, ("2025-01-02", "2025-01-31"), True)
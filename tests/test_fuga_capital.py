@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analitica import calcular_fuga_capital
+from src.cubo_olap import construir_cubo_sku, enrollar, media
+
+# -----------------------------
+# Utilidades
+# -----------------------------
+
+def _fuga_anterior(cubo):
+    """Cálculo previo a la pasada única: un enrollado por nivel y por canal, más el orden completo de SKUs."""
+    cubo_perdida = cubo[cubo["margen_negativo"]]
+    canal_col = "Canal_Venta" if "Canal_Venta" in cubo.columns else "Bodega_Origen"
+
+    df_sku_risk = enrollar(cubo, ["SKU_ID", "Categoria"], ["margen_real", "ingreso_total", "Cantidad_Vendida"]).reset_index()
+    df_sku_risk["size_burbuja"] = df_sku_risk["Cantidad_Vendida"].fillna(0).abs() + 0.1
+
+    df_canal = enrollar(cubo, canal_col, ["margen_real", "ingreso_total"]).reset_index()
+    df_canal["%_Margen"] = df_canal.apply(lambda x: (x["margen_real"] / x["ingreso_total"] * 100) if x["ingreso_total"] > 0 else 0, axis=1)
+
+    fuga_por_canal = None
+    top_fugas = None
+    if not cubo_perdida.empty:
+        fuga_por_canal = enrollar(cubo_perdida, canal_col, ["margen_real"]).reset_index()
+        fuga_por_canal["margen_real"] = fuga_por_canal["margen_real"].abs()
+        fuga_por_canal = fuga_por_canal.sort_values("margen_real", ascending=False)
+
+        top_fugas = cubo_perdida.groupby("SKU_ID", observed=True).agg({
+            "Categoria": "first", "margen_real": "sum", "Cantidad_Vendida": "sum",
+            "Precio_Venta_Final": "sum", "n": "sum"
+        })
+        top_fugas["Precio_Venta_Final"] = media(top_fugas["Precio_Venta_Final"], top_fugas.pop("n"))
+        top_fugas = top_fugas.sort_values("margen_real").head(10)
+
+    return {
+        "total_fuga": cubo_perdida["margen_real"].sum(),
+        "skus_perdida": cubo_perdida["SKU_ID"].nunique(),
+        "df_sku_risk": df_sku_risk,
+        "df_canal": df_canal,
+        "fuga_por_canal": fuga_por_canal,
+        "top_fugas": top_fugas
+    }
+
+
+def _comparar(df):
+    cubo_sku = construir_cubo_sku(df)
+    fuga = calcular_fuga_capital(cubo_sku)
+    esperado = _fuga_anterior(cubo_sku)
+    opciones = dict(check_dtype=False, check_categorical=False, check_index_type=False, rtol=1e-9)
+
+    assert fuga.total_fuga == pytest.approx(esperado["total_fuga"], rel=1e-9)
+    assert fuga.skus_perdida == esperado["skus_perdida"]
+    assert fuga.ingresos_totales == pytest.approx(cubo_sku["ingreso_total"].sum(), rel=1e-9)
+    pd.testing.assert_frame_equal(fuga.df_canal, esperado["df_canal"], **opciones)
+
+    llaves = ["SKU_ID", "Categoria"]
+    pd.testing.assert_frame_equal(
+        fuga.df_sku_risk.sort_values(llaves).reset_index(drop=True),
+        esperado["df_sku_risk"].sort_values(llaves).reset_index(drop=True), **opciones
+    )
+
+    if esperado["fuga_por_canal"] is None:
+        assert fuga.fuga_por_canal is None and fuga.top_fugas is None
+        return
+    pd.testing.assert_frame_equal(
+        fuga.fuga_por_canal.reset_index(drop=True), esperado["fuga_por_canal"].reset_index(drop=True), **opciones
+    )
+    # Los empates en el margen pueden ordenarse distinto: se comparan los montos en orden y las filas por SKU
+    np.testing.assert_allclose(fuga.top_fugas["margen_real"].to_numpy(), esperado["top_fugas"]["margen_real"].to_numpy(), rtol=1e-9)
+    comunes = fuga.top_fugas.index.intersection(esperado["top_fugas"].index)
+    pd.testing.assert_frame_equal(
+        fuga.top_fugas.loc[comunes], esperado["top_fugas"].loc[comunes, fuga.top_fugas.columns], **opciones
+    )
+
+# -----------------------------
+# Pasada única vs. enrollado por canal
+# -----------------------------
+
+def test_dataset_maestro(df_dss):
+    _comparar(df_dss)
+
+
+def test_subconjuntos(df_dss):
+    _comparar(df_dss[df_dss["margen_real"] < 0])
+    _comparar(df_dss[df_dss["margen_real"] >= 0])
+    canal = df_dss["Canal_Venta"].dropna().iloc[0]
+    _comparar(df_dss[df_dss["Canal_Venta"] == canal])
+    _comparar(df_dss.iloc[:0])
+
+
+def test_sku_con_varias_categorias_y_nulos():
+    df = pd.DataFrame({
+        "SKU_ID": ["A", "A", "A", "B", "B", None, "C", "D"],
+        "Categoria": ["x", "y", "x", "x", None, "x", "y", "y"],
+        "Canal_Venta": ["web", "web", "tienda", None, "web", "web", "tienda", "tienda"],
+        "margen_real": [-10.0, -5.0, 3.0, -7.0, -1.0, -20.0, 4.0, -2.0],
+        "ingreso_total": [100.0, 50.0, 30.0, 70.0, 10.0, 200.0, 40.0, 0.0],
+        "Cantidad_Vendida": [1, 2, 3, 4, np.nan, 6, 7, 8],
+        "Precio_Venta_Final": [10.0, 20.0, 30.0, 40.0, 50.0, 60.0, 70.0, 80.0],
+        "venta_sin_inventario": [False, True, False, False, False, True, False, False]
+    })
+    _comparar(df)
+    fuga = calcular_fuga_capital(construir_cubo_sku(df))
+    # "A" consolida sus dos categorías con pérdida en una sola fila del top
+    assert fuga.top_fugas.loc["A", "margen_real"] == -15.0 and fuga.top_fugas.loc["A", "Categoria"] == "x"
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import src.data_loader as data_loader
+from src.cache_columnar import clave_cache, leer_json
+from src.ingesta_incremental import ARCHIVO_ESTADO, capturar_csv, leer_filas_nuevas
+
+DIRECTORIO_DATOS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+# -----------------------------
+# Utilidades
+# -----------------------------
+
+@pytest.fixture
+def carpeta_datos(tmp_path, monkeypatch):
+    """Copia de los CSV en un directorio temporal; la caché relativa (.cache/dss) queda ahí."""
+    shutil.copytree(DIRECTORIO_DATOS, tmp_path / "data")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def _cargar():
+    data_loader.cargar_datos.clear()
+    return data_loader.cargar_datos()[0]
+
+
+def _anexar_filas(n, desde=0):
+    """Anexa al CSV de transacciones `n` filas existentes con Transaccion_ID nuevos."""
+    ruta = data_loader.RUTA_TRANSACCIONES
+    df = pd.read_csv(ruta, dtype=str, keep_default_na=False).iloc[desde:desde + n].copy()
+    df["Transaccion_ID"] = [f"TRX-NUEVA-{desde + i}" for i in range(n)]
+    with open(ruta, "a", encoding="utf-8", newline="") as f:
+        df.to_csv(f, header=False, index=False)
+
+
+def _estado_guardado():
+    return leer_json(clave_cache([data_loader.RUTA_INVENTARIO, data_loader.RUTA_FEEDBACK]), ARCHIVO_ESTADO)
+
+# -----------------------------
+# Lectura de filas nuevas
+# -----------------------------
+
+def test_solo_lee_lo_anexado(carpeta_datos):
+    estado = capturar_csv(data_loader.RUTA_TRANSACCIONES)
+    nuevo, estado_igual = leer_filas_nuevas(data_loader.RUTA_TRANSACCIONES, estado)
+    assert nuevo.empty and estado_igual == estado
+
+    _anexar_filas(30)
+    nuevo, estado_nuevo = leer_filas_nuevas(data_loader.RUTA_TRANSACCIONES, estado)
+    assert nuevo["Transaccion_ID"].tolist() == [f"TRX-NUEVA-{i}" for i in range(30)]
+    assert estado_nuevo["lotes_anexados"] == 1
+    assert estado_nuevo["offset"] == os.path.getsize(data_loader.RUTA_TRANSACCIONES)
+
+
+def test_linea_incompleta_queda_para_la_proxima(carpeta_datos):
+    estado = capturar_csv(data_loader.RUTA_TRANSACCIONES)
+    with open(data_loader.RUTA_TRANSACCIONES, "a", encoding="utf-8") as f:
+        f.write("TRX-PARCIAL,PROD-1")
+    nuevo, estado_nuevo = leer_filas_nuevas(data_loader.RUTA_TRANSACCIONES, estado)
+    assert nuevo.empty and estado_nuevo["offset"] == estado["offset"]
+
+
+def test_archivo_reescrito_obliga_a_reprocesar(carpeta_datos):
+    estado = capturar_csv(data_loader.RUTA_TRANSACCIONES)
+    with open(data_loader.RUTA_TRANSACCIONES, "r+b") as f:
+        f.seek(len(f.readline()))
+        f.write(b"X")
+    assert leer_filas_nuevas(data_loader.RUTA_TRANSACCIONES, estado) is None
+
+# -----------------------------
+# Anexos en cargar_datos
+# -----------------------------
+
+def test_anexo_coincide_con_carga_completa(carpeta_datos):
+    _cargar()
+    _anexar_filas(50)
+    incremental = _cargar()
+
+    shutil.rmtree(carpeta_datos / ".cache")
+    completo = _cargar()
+    assert len(incremental) == len(completo)
+    pd.testing.assert_frame_equal(incremental, completo, check_categorical=False)
+
+
+def test_anexo_interrumpido_no_duplica_filas(carpeta_datos, monkeypatch):
+    base = _cargar()
+    _anexar_filas(50)
+
+    # El lote se escribe pero el proceso cae antes de guardar el estado de ingesta
+    guardar_json = data_loader.guardar_json
+    monkeypatch.setattr(data_loader, "guardar_json",
+                        lambda clave, archivo, contenido: archivo != ARCHIVO_ESTADO and guardar_json(clave, archivo, contenido))
+    _cargar()
+    assert _estado_guardado()["lotes_anexados"] == 0
+    monkeypatch.setattr(data_loader, "guardar_json", guardar_json)
+
+    reintento = _cargar()
+    assert len(reintento) == len(base) + 50
+    assert reintento["Transaccion_ID"].astype(str).str.startswith("TRX-NUEVA-").sum() == 50
+    assert _estado_guardado()["lotes_anexados"] == 1
+
+    # Arranque en caliente posterior: el lote confirmado se lee una sola vez
+    assert len(_cargar()) == len(base) + 50
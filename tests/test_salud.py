@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.salud import AcumuladorSalud, medir_salud
+from src.transacciones import procesar_transacciones, procesar_transacciones_streaming
+
+RUTA_TRANSACCIONES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "data", "transacciones_logistica_v2.csv")
+
+# -----------------------------
+# Utilidades
+# -----------------------------
+
+def _datos_con_duplicados(filas=20_000, semilla=3):
+    """Filas con nulos, texto y números; ~25% son copias exactas de otras filas."""
+    rng = np.random.default_rng(semilla)
+    df = pd.DataFrame({
+        "id": rng.integers(0, filas * 10, filas),
+        "ciudad": rng.choice(["Bogotá", "Cali", "Medellín", None], filas),
+        "monto": np.where(rng.random(filas) < 0.05, np.nan, rng.normal(100, 20, filas).round(2)),
+    })
+    copias = df.sample(frac=0.25, random_state=semilla)
+    return pd.concat([df, copias], ignore_index=True).sample(frac=1.0, random_state=semilla)
+
+
+def _acumular(df, tamano_lote, **kwargs):
+    acumulador = AcumuladorSalud(**kwargs)
+    for inicio in range(0, len(df), tamano_lote):
+        acumulador.agregar(df.iloc[inicio:inicio + tamano_lote])
+    return acumulador
+
+# -----------------------------
+# Lotes vs. DataFrame completo
+# -----------------------------
+
+@pytest.mark.parametrize("tamano_lote", [1, 997, 25_000])
+def test_lotes_coinciden_con_medicion_completa(tamano_lote):
+    df = _datos_con_duplicados(2_000 if tamano_lote == 1 else 20_000)
+    assert _acumular(df, tamano_lote).resultado() == medir_salud(df, muestra=0)
+
+
+def test_lotes_con_tipos_distintos_entre_chunks():
+    # El mismo valor leído como int en un lote y como float en otro cuenta como duplicado
+    df = pd.DataFrame({"a": [1, 2, 3, 1, 2], "b": ["x", "y", "z", "x", "y"]})
+    acumulador = AcumuladorSalud()
+    acumulador.agregar(df.iloc[:3])
+    acumulador.agregar(df.iloc[3:].astype({"a": float}))
+    assert acumulador.resultado() == medir_salud(df, muestra=0)
+
+
+def test_memoria_acotada_estima_dentro_del_margen():
+    df = _datos_con_duplicados()
+    exacto = medir_salud(df, muestra=0)
+    acumulador = _acumular(df, 1_000, max_hashes=3_000)
+    estimado = acumulador.resultado()
+
+    assert len(acumulador._hashes) <= 3_000
+    assert estimado["pct_nulos"] == exacto["pct_nulos"]
+    assert estimado["filas"] == exacto["filas"] and estimado["filas_evaluadas"] < exacto["filas"]
+    assert estimado["margen_error"] > 0
+    assert abs(estimado["health_score"] - exacto["health_score"]) <= 2 * estimado["margen_error"]
+
+
+def test_acumulador_vacio():
+    assert AcumuladorSalud().resultado()["health_score"] == 0
+
+# -----------------------------
+# Transacciones por streaming
+# -----------------------------
+
+@pytest.mark.parametrize("tamano_chunk", [1_000, 3_333])
+def test_streaming_reporta_el_mismo_health_score(tmp_path, tamano_chunk):
+    _, completo = procesar_transacciones(RUTA_TRANSACCIONES)
+    _, streaming = procesar_transacciones_streaming(RUTA_TRANSACCIONES, tmp_path / "t.parquet", tamano_chunk)
+    assert streaming == completo
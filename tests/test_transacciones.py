@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.transacciones import procesar_transacciones, procesar_transacciones_streaming
+
+RUTA_TRANSACCIONES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "data", "transacciones_logistica_v2.csv")
+
+# -----------------------------
+# Utilidades
+# -----------------------------
+
+def _csv_con_enteros_y_luego_decimales(ruta):
+    """Primeras 2.000 filas con cantidades y precios enteros; las siguientes con decimales y vacíos."""
+    df = pd.read_csv(RUTA_TRANSACCIONES, nrows=4_000)
+    primeras = df.index < 2_000
+    df["Cantidad_Vendida"] = pd.to_numeric(df["Cantidad_Vendida"], errors="coerce").fillna(1)
+    df.loc[~primeras, "Cantidad_Vendida"] += 0.5
+    df.loc[df.index % 7 == 3, "Cantidad_Vendida"] = np.nan
+    df.loc[primeras, "Precio_Venta_Final"] = df.loc[primeras, "Precio_Venta_Final"].round()
+    df.loc[primeras, "Tiempo_Entrega_Real"] = df.loc[primeras, "Tiempo_Entrega_Real"].fillna(5)
+    df.loc[primeras & (df.index % 7 == 3), "Cantidad_Vendida"] = 2
+    # Enteros escritos sin ".0" para que el primer chunk se lea como int64
+    for col in ["Cantidad_Vendida", "Precio_Venta_Final", "Tiempo_Entrega_Real"]:
+        df[col] = df[col].astype(object)
+        df.loc[primeras, col] = df.loc[primeras, col].astype(int)
+    df.to_csv(ruta, index=False)
+
+# -----------------------------
+# Streaming por chunks
+# -----------------------------
+
+def test_decimales_despues_de_un_chunk_entero(tmp_path):
+    ruta_csv = tmp_path / "transacciones.csv"
+    ruta_parquet = tmp_path / "transacciones.parquet"
+    _csv_con_enteros_y_luego_decimales(ruta_csv)
+
+    ruta, metricas = procesar_transacciones_streaming(ruta_csv, ruta_parquet, tamano_chunk=1_000)
+    assert "error" not in metricas and ruta == ruta_parquet
+
+    streaming = pq.read_table(ruta_parquet).to_pandas()
+    completo, metricas_completo = procesar_transacciones(str(ruta_csv))
+    assert metricas == metricas_completo
+    for col in ["Cantidad_Vendida", "Precio_Venta_Final", "Tiempo_Entrega"]:
+        np.testing.assert_array_equal(streaming[col].to_numpy(dtype=float), completo[col].to_numpy(dtype=float))
+    assert streaming["Cantidad_Vendida"].iloc[2_000] == completo["Cantidad_Vendida"].iloc[2_000] != int(completo["Cantidad_Vendida"].iloc[2_000])
+
+
+def test_streaming_coincide_con_archivo_completo(tmp_path):
+    ruta_parquet = tmp_path / "transacciones.parquet"
+    _, metricas = procesar_transacciones_streaming(RUTA_TRANSACCIONES, ruta_parquet, tamano_chunk=3_000)
+    streaming = pq.read_table(ruta_parquet).to_pandas()
+    completo, _ = procesar_transacciones(RUTA_TRANSACCIONES)
+
+    assert metricas["total_transacciones"] == len(completo) == len(streaming)
+    pd.testing.assert_frame_equal(streaming, completo, check_dtype=False)